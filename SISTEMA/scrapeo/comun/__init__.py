@@ -0,0 +1,8 @@
+"""
+Utilidades compartidas por los scrapers anuales de PRONABEC (2020-2025)
+
+Cada script anual agrega la carpeta SISTEMA/scrapeo al sys.path y luego
+importa los módulos que necesita, por ejemplo:
+
+    from comun.cache_descargas import descargar_con_cache
+"""
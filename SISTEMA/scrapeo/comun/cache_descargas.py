@@ -0,0 +1,136 @@
+"""
+Caché local de descargas para las Memorias Anuales del PRONABEC
+Guarda cada PDF direccionado por su SHA-256 y revalida con GET condicional
+(ETag / Last-Modified), de modo que una nueva ejecución solo descarga el
+archivo si cambió en el servidor y puede trabajar sin conexión.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+# Carpeta de caché (se puede cambiar con la variable de entorno EASYBECA_CACHE_DIR)
+CACHE_DIR = Path(os.environ.get('EASYBECA_CACHE_DIR', Path(__file__).resolve().parent.parent / '.cache'))
+DIR_DESCARGAS = CACHE_DIR / 'descargas'
+ARCHIVO_INDICE = DIR_DESCARGAS / 'indice.json'
+
+
+def calcular_sha256(ruta: Path) -> str:
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def escribir_atomico(ruta: Path, datos: bytes):
+    """Escribe un archivo en un temporal y luego lo renombra (evita archivos a medias)"""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(datos)
+        os.replace(tmp, ruta)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _ruta_objeto(sha256: str) -> Path:
+    """Ruta del contenido dentro de la caché según su hash"""
+    return DIR_DESCARGAS / 'objetos' / sha256[:2] / f"{sha256}.pdf"
+
+
+def _leer_indice() -> Dict[str, Dict]:
+    """Lee el índice URL -> metadatos de la descarga"""
+    if not ARCHIVO_INDICE.exists():
+        return {}
+    try:
+        with open(ARCHIVO_INDICE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_indice(indice: Dict[str, Dict]):
+    """Guarda el índice de descargas"""
+    datos = json.dumps(indice, ensure_ascii=False, indent=2).encode('utf-8')
+    escribir_atomico(ARCHIVO_INDICE, datos)
+
+
+def _objeto_valido(entrada: Optional[Dict]) -> Optional[Path]:
+    """Devuelve la ruta del contenido cacheado si existe y su hash coincide"""
+    if not entrada:
+        return None
+    ruta = _ruta_objeto(entrada['sha256'])
+    if ruta.exists() and calcular_sha256(ruta) == entrada['sha256']:
+        return ruta
+    return None
+
+
+def obtener_pdf(url: str, timeout: int = 30) -> Path:
+    """
+    Devuelve la ruta local del PDF, descargándolo solo si es necesario.
+
+    - Caché vacía: descarga completa.
+    - Caché caliente: GET condicional; si el servidor responde 304 se usa la copia local.
+    - Sin conexión, o el servidor responde 429/5xx: se usa la copia local si existe.
+    """
+    indice = _leer_indice()
+    entrada = indice.get(url)
+    ruta_local = _objeto_valido(entrada)
+
+    headers = {}
+    if ruta_local:
+        if entrada.get('etag'):
+            headers['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            headers['If-Modified-Since'] = entrada['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        if ruta_local:
+            print(f"Sin conexión ({e.__class__.__name__}); usando copia en caché")
+            return ruta_local
+        raise
+
+    if response.status_code == 304 and ruta_local:
+        print("PDF sin cambios en el servidor; usando copia en caché")
+        return ruta_local
+
+    if ruta_local and (response.status_code == 429 or response.status_code >= 500):
+        print(f"⚠ El servidor respondió {response.status_code}; usando copia en caché")
+        return ruta_local
+
+    response.raise_for_status()
+    contenido = response.content
+    sha256 = hashlib.sha256(contenido).hexdigest()
+    destino = _ruta_objeto(sha256)
+    if not destino.exists():
+        escribir_atomico(destino, contenido)
+
+    indice[url] = {
+        'sha256': sha256,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'tamano': len(contenido),
+        'descargado': datetime.now().isoformat(timespec='seconds'),
+    }
+    _guardar_indice(indice)
+    print(f"PDF descargado y guardado en caché ({len(contenido) / 1024 / 1024:.1f} MB)")
+    return destino
+
+
+def descargar_con_cache(url: str, timeout: int = 30) -> BytesIO:
+    """Igual que obtener_pdf pero devuelve el contenido en un BytesIO"""
+    return BytesIO(obtener_pdf(url, timeout).read_bytes())
@@ -0,0 +1,156 @@
+"""
+Caché persistente de extracciones por página (SQLite)
+Guarda el resultado de pdfplumber (texto, tablas y palabras con sus
+coordenadas) por (sha256 del PDF, página, extractor, ajustes), para que
+iterar sobre el parseo posterior no vuelva a leer el PDF. También guarda el
+índice de relevancia de cada PDF por (sha256, términos).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+import pdfplumber
+
+from comun.cache_descargas import CACHE_DIR
+
+ARCHIVO_CACHE_PAGINAS = CACHE_DIR / 'paginas.sqlite'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    ruta TEXT PRIMARY KEY,
+    tamano INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documentos (
+    sha256 TEXT PRIMARY KEY,
+    total_paginas INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS extracciones (
+    sha256 TEXT NOT NULL,
+    pagina INTEGER NOT NULL,
+    extractor TEXT NOT NULL,
+    ajustes TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (sha256, pagina, extractor, ajustes)
+);
+CREATE TABLE IF NOT EXISTS indices (
+    sha256 TEXT NOT NULL,
+    terminos TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (sha256, terminos)
+);
+"""
+
+
+def clave_ajustes(extractor: str, ajustes: Optional[Dict] = None) -> str:
+    """Serializa los ajustes de un extractor (incluye la versión de pdfplumber)"""
+    datos = {'pdfplumber': pdfplumber.__version__, 'extractor': extractor, 'ajustes': ajustes or {}}
+    return json.dumps(datos, sort_keys=True, ensure_ascii=False)
+
+
+class CachePaginas:
+    """Almacén SQLite de extracciones por página"""
+
+    def __init__(self, ruta: Path = ARCHIVO_CACHE_PAGINAS):
+        Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+        self.conexion = sqlite3.connect(str(ruta))
+        self.conexion.executescript(ESQUEMA)
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def huella(self, pdf_file) -> str:
+        """
+        SHA-256 del PDF. Para rutas se memoriza por (tamaño, mtime), así una
+        ejecución con la caché caliente no lee ningún byte del PDF.
+        """
+        if not isinstance(pdf_file, (str, os.PathLike)):
+            pdf_file.seek(0)
+            sha256 = hashlib.sha256(pdf_file.read()).hexdigest()
+            pdf_file.seek(0)
+            return sha256
+
+        ruta = str(Path(pdf_file).resolve())
+        estado = os.stat(ruta)
+        fila = self.conexion.execute(
+            "SELECT sha256 FROM archivos WHERE ruta = ? AND tamano = ? AND mtime_ns = ?",
+            (ruta, estado.st_size, estado.st_mtime_ns)
+        ).fetchone()
+        if fila:
+            return fila[0]
+
+        h = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(bloque)
+        sha256 = h.hexdigest()
+        with self.conexion:
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO archivos VALUES (?, ?, ?, ?)",
+                (ruta, estado.st_size, estado.st_mtime_ns, sha256)
+            )
+        return sha256
+
+    def total_paginas(self, sha256: str) -> Optional[int]:
+        fila = self.conexion.execute(
+            "SELECT total_paginas FROM documentos WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def guardar_total_paginas(self, sha256: str, total: int):
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO documentos VALUES (?, ?)", (sha256, total))
+
+    def paginas_completas(self, sha256: str, ajustes: Dict[str, str]) -> Set[int]:
+        """Páginas que ya tienen guardados todos los extractores pedidos"""
+        if not ajustes:
+            return set()
+        condiciones = " OR ".join(["(extractor = ? AND ajustes = ?)"] * len(ajustes))
+        parametros = [sha256]
+        for extractor, clave in ajustes.items():
+            parametros.extend([extractor, clave])
+        filas = self.conexion.execute(
+            f"SELECT pagina FROM extracciones WHERE sha256 = ? AND ({condiciones}) "
+            f"GROUP BY pagina HAVING COUNT(*) = {len(ajustes)}",
+            parametros
+        ).fetchall()
+        return {fila[0] for fila in filas}
+
+    def leer_pagina(self, sha256: str, pagina: int, ajustes: Dict[str, str]) -> Dict:
+        """Devuelve {extractor: valor} de una página ya cacheada"""
+        resultado = {}
+        for extractor, clave in ajustes.items():
+            fila = self.conexion.execute(
+                "SELECT valor FROM extracciones WHERE sha256 = ? AND pagina = ? AND extractor = ? AND ajustes = ?",
+                (sha256, pagina, extractor, clave)
+            ).fetchone()
+            resultado[extractor] = json.loads(fila[0])
+        return resultado
+
+    def guardar_pagina(self, sha256: str, pagina: int, ajustes: Dict[str, str], valores: Dict):
+        """Guarda las extracciones de una página"""
+        filas: Iterable = [
+            (sha256, pagina, extractor, clave, json.dumps(valores[extractor], ensure_ascii=False))
+            for extractor, clave in ajustes.items()
+        ]
+        with self.conexion:
+            self.conexion.executemany("INSERT OR REPLACE INTO extracciones VALUES (?, ?, ?, ?, ?)", filas)
+
+    def leer_indice(self, sha256: str, terminos: str) -> Optional[Dict[int, Set[str]]]:
+        """Índice de relevancia {pagina: términos encontrados} ya guardado, o None"""
+        fila = self.conexion.execute(
+            "SELECT valor FROM indices WHERE sha256 = ? AND terminos = ?", (sha256, terminos)
+        ).fetchone()
+        if not fila:
+            return None
+        return {int(p): set(encontrados) for p, encontrados in json.loads(fila[0]).items()}
+
+    def guardar_indice(self, sha256: str, terminos: str, indice: Dict[int, Set[str]]):
+        valor = json.dumps({p: sorted(encontrados) for p, encontrados in indice.items()}, ensure_ascii=False)
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO indices VALUES (?, ?, ?)", (sha256, terminos, valor))
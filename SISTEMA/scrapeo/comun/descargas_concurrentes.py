@@ -0,0 +1,81 @@
+"""
+Descargas HTTP concurrentes con límite de ritmo por host
+Reemplaza las pausas fijas (time.sleep) entre peticiones de los scrapers: cada
+host tiene su propio token bucket, así que las peticiones a un mismo sitio se
+siguen espaciando (por defecto una cada 2 s, como antes) mientras que los
+sitios distintos se consultan en paralelo en un ThreadPoolExecutor. El tiempo
+total pasa a ser el del host más lento en lugar de la suma de todos.
+
+    limitador = LimitadorPorHost(por_segundo=0.5)
+    def obtener(url):
+        limitador.esperar(url)
+        return session.get(url, timeout=30)
+    respuestas = en_paralelo(obtener, {'daad': 'https://www.daad.de/en/', ...})
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Ritmo por defecto: una petición cada 2 s por host, sin ráfagas
+PETICIONES_POR_SEGUNDO = 0.5
+RAFAGA = 1
+HILOS = 8
+
+
+class LimitadorPorHost:
+    """Token bucket por host (esquema + host + puerto), seguro entre hilos"""
+
+    def __init__(self, por_segundo: float = PETICIONES_POR_SEGUNDO, rafaga: int = RAFAGA,
+                 por_host: Optional[Dict[str, float]] = None):
+        self.por_segundo = por_segundo
+        self.rafaga = rafaga
+        # Ritmos particulares, por ejemplo {'www.pronabec.gob.pe': 0.2}
+        self.por_host = {host.lower(): ritmo for host, ritmo in (por_host or {}).items()}
+        self._cubetas: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _ritmo(self, host: str) -> float:
+        return self.por_host.get(host.split(':')[0], self.por_segundo)
+
+    def esperar(self, url: str) -> float:
+        """Reserva un turno para el host de la URL y duerme lo necesario; devuelve los segundos esperados"""
+        partes = urlparse(url)
+        host = partes.netloc.lower()
+        ritmo = self._ritmo(host)
+        clave = f"{partes.scheme}://{host}"
+        with self._lock:
+            ahora = time.monotonic()
+            fichas, ultima = self._cubetas.get(clave, (self.rafaga, ahora))
+            fichas = min(self.rafaga, fichas + (ahora - ultima) * ritmo) - 1
+            self._cubetas[clave] = (fichas, ahora)
+        # Con fichas negativas el turno ya quedó reservado: se duerme fuera del lock
+        espera = -fichas / ritmo if fichas < 0 else 0.0
+        if espera:
+            time.sleep(espera)
+        return espera
+
+
+# Compartido por los scrapers del mismo proceso (varios consultan www.pronabec.gob.pe)
+LIMITADOR_COMPARTIDO = LimitadorPorHost()
+
+
+def en_paralelo(funcion: Callable[[str], Any], urls: Dict[str, str], hilos: int = HILOS) -> Dict[str, Any]:
+    """
+    Llama funcion(url) para cada nombre -> url en un pool de hilos. Devuelve
+    nombre -> resultado en el orden de entrada; si una llamada falla, su valor
+    es la excepción, para que cada scraper la registre como antes.
+    """
+    resultados: Dict[str, Any] = {}
+    if not urls:
+        return resultados
+    with ThreadPoolExecutor(max_workers=max(1, min(hilos, len(urls)))) as pool:
+        futuros = {nombre: pool.submit(funcion, url) for nombre, url in urls.items()}
+        for nombre, futuro in futuros.items():
+            try:
+                resultados[nombre] = futuro.result()
+            except Exception as e:
+                resultados[nombre] = e
+    return resultados
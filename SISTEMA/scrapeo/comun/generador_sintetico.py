@@ -0,0 +1,298 @@
+"""
+Motor de filas sintéticas para los generadores de datasets 2020-2024
+Cada generador describe sus columnas inventadas con una especificación
+declarativa (columna -> regla) y el motor la aplica por bloques con NumPy:
+cada regla sortea todas las filas del bloque de una vez, con una semilla
+reproducible, en lugar de un random.choice por becario.
+
+    especificacion = {
+        'Genero': Eleccion(['Femenino', 'Masculino'], [0.55, 0.45]),
+        'BecasSegunMigracion': SegunColumna('Lugar', {'Lima': Constante('No Migro')},
+                                            defecto=Eleccion(['Migro', 'No Migro'], [0.25, 0.75])),
+    }
+    df = generar_dataframe(especificacion, base=expandir(df_dept, cantidades), semilla=2020)
+
+Las reglas se evalúan en el orden de la especificación, así que una regla
+puede depender de columnas de la base o de columnas definidas antes.
+
+Uso (dataset de estrés con las frecuencias de un dataset existente):
+    python -m comun.generador_sintetico --desde dataset.csv --filas 1000000 --salida estres.csv
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_string_dtype, union_categoricals
+
+TAMANO_BLOQUE = 250_000
+
+
+def _a_arreglo(valores) -> np.ndarray:
+    """Resultado de una regla como arreglo NumPy (los categóricos pasan a object)"""
+    return np.asarray(valores)
+
+
+def _combinar(n: int, partes: List) -> np.ndarray:
+    """Une en un arreglo de n filas los resultados de cada rama [(máscara, valores)]"""
+    arreglos = [(mascara, _a_arreglo(valores)) for mascara, valores in partes]
+    if not arreglos:
+        return np.empty(n, dtype=object)
+    if any(v.dtype.kind in 'OUS' for _, v in arreglos):
+        tipo = object
+    else:
+        tipo = np.result_type(*[v.dtype for _, v in arreglos])
+    resultado = np.empty(n, dtype=tipo)
+    for mascara, valores in arreglos:
+        resultado[mascara] = valores
+    return resultado
+
+
+class Regla:
+    """Regla de una columna: devuelve un valor por cada fila de `filas`"""
+
+    def generar(self, filas: pd.DataFrame, rng: np.random.Generator):
+        raise NotImplementedError
+
+
+class Constante(Regla):
+    """El mismo valor en todas las filas"""
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def generar(self, filas, rng):
+        tipo = object if isinstance(self.valor, str) else None
+        return np.full(len(filas), self.valor, dtype=tipo)
+
+
+class Eleccion(Regla):
+    """Sorteo entre opciones, uniforme o con pesos (no hace falta que sumen 1)"""
+
+    def __init__(self, opciones: Sequence, pesos: Optional[Sequence[float]] = None):
+        if len(opciones) == 0:
+            raise ValueError("Eleccion necesita al menos una opción")
+        if pesos is not None and len(pesos) != len(opciones):
+            raise ValueError("Eleccion: opciones y pesos deben tener el mismo largo")
+        # Opciones repetidas equivalen a una sola con la suma de sus pesos
+        serie = pd.Series(np.ones(len(opciones)) if pesos is None else np.asarray(pesos, dtype=float),
+                          index=pd.Index(list(opciones), dtype=object))
+        agrupado = serie.groupby(level=0, sort=False).sum()
+        self.opciones = list(agrupado.index)
+        self.probabilidades = None
+        if pesos is not None or len(agrupado) != len(opciones):
+            self.probabilidades = (agrupado / agrupado.sum()).to_numpy()
+        self._texto = all(isinstance(o, str) for o in self.opciones)
+
+    def generar(self, filas, rng):
+        n = len(filas)
+        if self.probabilidades is None:
+            codigos = rng.integers(len(self.opciones), size=n)
+        else:
+            codigos = rng.choice(len(self.opciones), size=n, p=self.probabilidades)
+        if self._texto:
+            return pd.Categorical.from_codes(codigos, self.opciones)
+        return np.asarray(self.opciones)[codigos]
+
+
+class Columna(Regla):
+    """Copia de otra columna"""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def generar(self, filas, rng):
+        return filas[self.nombre].to_numpy()
+
+
+class Mapeo(Regla):
+    """Traduce los valores de otra columna con un diccionario; sin defecto conserva el valor original"""
+
+    def __init__(self, columna: str, tabla: Dict, defecto=None):
+        self.columna = columna
+        self.tabla = tabla
+        self.defecto = defecto
+
+    def generar(self, filas, rng):
+        original = pd.Series(np.asarray(filas[self.columna], dtype=object))
+        traducido = original.map(self.tabla)
+        relleno = original if self.defecto is None else self.defecto
+        return traducido.where(traducido.notna(), relleno).to_numpy()
+
+
+class Derivada(Regla):
+    """Función vectorizada funcion(filas, rng) -> un valor por fila"""
+
+    def __init__(self, funcion: Callable[[pd.DataFrame, np.random.Generator], Sequence]):
+        self.funcion = funcion
+
+    def generar(self, filas, rng):
+        return self.funcion(filas, rng)
+
+
+class Condicional(Regla):
+    """Aplica `si` en las filas donde condicion(filas) es True y `no` en el resto"""
+
+    def __init__(self, condicion: Callable[[pd.DataFrame], Sequence[bool]], si: Regla, no: Regla):
+        self.condicion = condicion
+        self.si = si
+        self.no = no
+
+    def generar(self, filas, rng):
+        mascara = np.asarray(self.condicion(filas), dtype=bool)
+        return _combinar(len(filas), [
+            (mascara, self.si.generar(filas[mascara], rng)),
+            (~mascara, self.no.generar(filas[~mascara], rng)),
+        ])
+
+
+class SegunColumna(Regla):
+    """Elige la regla según el valor de otra columna: {valor: regla}, con una regla por defecto"""
+
+    def __init__(self, columna: str, casos: Dict, defecto: Optional[Regla] = None):
+        self.columna = columna
+        self.casos = casos
+        self.defecto = defecto
+
+    def generar(self, filas, rng):
+        valores = np.asarray(filas[self.columna], dtype=object)
+        partes = []
+        cubiertas = np.zeros(len(filas), dtype=bool)
+        for valor, regla in self.casos.items():
+            mascara = valores == valor
+            if mascara.any():
+                partes.append((mascara, regla.generar(filas[mascara], rng)))
+                cubiertas |= mascara
+        if not cubiertas.all():
+            if self.defecto is None:
+                faltantes = sorted(set(map(str, valores[~cubiertas])))
+                raise ValueError(f"SegunColumna('{self.columna}'): valores sin regla: {faltantes[:5]}")
+            partes.append((~cubiertas, self.defecto.generar(filas[~cubiertas], rng)))
+        return _combinar(len(filas), partes)
+
+
+Especificacion = Dict[str, Regla]
+
+
+def expandir(df: pd.DataFrame, cantidades) -> pd.DataFrame:
+    """Repite cada fila de df según cantidades (nombre de columna o secuencia de enteros)"""
+    if isinstance(cantidades, str):
+        cantidades = df[cantidades]
+    repeticiones = np.clip(np.asarray(cantidades, dtype=np.int64), 0, None)
+    return df.loc[df.index.repeat(repeticiones)].reset_index(drop=True)
+
+
+def _categorizar(bloque: pd.DataFrame) -> pd.DataFrame:
+    """Columnas de texto como categóricas: un código por fila en vez de un objeto"""
+    for columna in bloque.columns:
+        tipo = bloque[columna].dtype
+        if not isinstance(tipo, pd.CategoricalDtype) and (tipo == object or is_string_dtype(tipo)):
+            bloque[columna] = pd.Categorical(bloque[columna])
+    return bloque
+
+
+def generar_filas(especificacion: Especificacion, n: Optional[int] = None,
+                  base: Optional[pd.DataFrame] = None, semilla=None,
+                  tamano_bloque: int = TAMANO_BLOQUE,
+                  columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Genera bloques de hasta tamano_bloque filas. Con base, hay una fila por
+    cada fila de base (cuyas columnas quedan disponibles para las reglas);
+    sin base, n filas. semilla puede ser un entero o un np.random.Generator
+    compartido entre varias llamadas.
+    """
+    if base is None and n is None:
+        raise ValueError("generar_filas necesita n o base")
+    rng = np.random.default_rng(semilla)
+    total = len(base) if base is not None else n
+
+    for inicio in range(0, total, tamano_bloque):
+        fin = min(inicio + tamano_bloque, total)
+        if base is not None:
+            bloque = base.iloc[inicio:fin].reset_index(drop=True)
+        else:
+            bloque = pd.DataFrame(index=pd.RangeIndex(fin - inicio))
+        for columna, regla in especificacion.items():
+            bloque[columna] = regla.generar(bloque, rng)
+        bloque = _categorizar(bloque)
+        yield bloque[columnas] if columnas else bloque
+
+
+def concatenar(marcos: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena DataFrames con las mismas columnas conservando las categóricas"""
+    marcos = [m for m in marcos if len(m)] or marcos[:1]
+    if len(marcos) == 1:
+        return marcos[0].reset_index(drop=True)
+    if any(list(m.columns) != list(marcos[0].columns) for m in marcos):
+        return pd.concat(marcos, ignore_index=True)
+
+    resultado = {}
+    for columna in marcos[0].columns:
+        partes = [m[columna] for m in marcos]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in partes):
+            resultado[columna] = union_categoricals([p.array for p in partes])
+        else:
+            resultado[columna] = pd.concat(partes, ignore_index=True)
+    return pd.DataFrame(resultado)
+
+
+def generar_dataframe(especificacion: Especificacion, n: Optional[int] = None,
+                      base: Optional[pd.DataFrame] = None, semilla=None,
+                      tamano_bloque: int = TAMANO_BLOQUE,
+                      columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    """Igual que generar_filas pero devuelve un solo DataFrame"""
+    bloques = list(generar_filas(especificacion, n, base, semilla, tamano_bloque, columnas))
+    if not bloques:
+        vacio = pd.DataFrame(columns=list(base.columns if base is not None else []) + list(especificacion))
+        return vacio[columnas] if columnas else vacio
+    return concatenar(bloques)
+
+
+def escribir_csv(especificacion: Especificacion, ruta, n: Optional[int] = None,
+                 base: Optional[pd.DataFrame] = None, semilla=None,
+                 tamano_bloque: int = TAMANO_BLOQUE,
+                 columnas: Optional[List[str]] = None) -> int:
+    """Escribe las filas bloque a bloque (memoria constante); devuelve cuántas escribió"""
+    escritas = 0
+    for bloque in generar_filas(especificacion, n, base, semilla, tamano_bloque, columnas):
+        bloque.to_csv(ruta, mode='w' if escritas == 0 else 'a', header=escritas == 0,
+                      index=False, encoding='utf-8-sig' if escritas == 0 else 'utf-8')
+        escritas += len(bloque)
+    return escritas
+
+
+def especificacion_desde(df: pd.DataFrame, columnas: Optional[List[str]] = None) -> Especificacion:
+    """Especificación con las frecuencias observadas de cada columna de un dataset existente"""
+    especificacion = {}
+    for columna in columnas or list(df.columns):
+        frecuencias = df[columna].value_counts()
+        if frecuencias.empty:
+            continue
+        especificacion[columna] = Eleccion(list(frecuencias.index), frecuencias.to_numpy())
+    return especificacion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de datasets sintéticos de estrés")
+    parser.add_argument("--desde", required=True, help="CSV o Excel cuyas frecuencias por columna se imitan")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--salida", required=True, help="CSV de salida")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque")
+    args = parser.parse_args()
+
+    origen = Path(args.desde)
+    df = pd.read_excel(origen) if origen.suffix.lower() in ('.xlsx', '.xls') else pd.read_csv(origen)
+    especificacion = especificacion_desde(df)
+
+    inicio = time.perf_counter()
+    escritas = escribir_csv(especificacion, args.salida, n=args.filas, semilla=args.semilla,
+                            tamano_bloque=args.bloque)
+    print(f"✓ {escritas:,} filas en {time.perf_counter() - inicio:.1f} s -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Índice invertido sobre el texto extraído de las Memorias Anuales
+Tokeniza el texto de cada año (texto_extraido.json de 2020,
+texto_completo_2021.txt, texto_completo_pronabec_2023.txt, ...) y guarda
+en SQLite las ocurrencias término -> (año, página, línea), para que buscar
+una palabra o un departamento en todos los años sea una consulta y no una
+lectura completa de los archivos.
+
+Uso:
+    python -m comun.indice_textos construir
+    python -m comun.indice_textos buscar "migración" [--anio 2023]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from comun.cache_descargas import CACHE_DIR
+
+DIR_SCRAPEO = Path(__file__).resolve().parent.parent
+ARCHIVO_INDICE = CACHE_DIR / 'indice_textos.sqlite'
+
+# Texto extraído por año: (ruta, formato)
+FUENTES = {
+    2020: (DIR_SCRAPEO / 'scrapeo_2020' / 'texto_extraido.json', 'json'),
+    2021: (DIR_SCRAPEO / 'scrapeo_2021' / 'texto_completo_2021.txt', 'paginas'),
+    2023: (DIR_SCRAPEO / 'scrapeo_2023' / 'texto_completo_pronabec_2023.txt', 'paginas'),
+    2024: (DIR_SCRAPEO / 'scrapeo_2024' / 'PRONABEC_2024' / 'pronabec_2024_texto_completo.txt', 'plano'),
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS fuentes (
+    anio INTEGER PRIMARY KEY,
+    ruta TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lineas (
+    anio INTEGER NOT NULL,
+    pagina INTEGER NOT NULL,
+    linea INTEGER NOT NULL,
+    texto TEXT NOT NULL,
+    PRIMARY KEY (anio, pagina, linea)
+);
+CREATE TABLE IF NOT EXISTS ocurrencias (
+    termino TEXT NOT NULL,
+    anio INTEGER NOT NULL,
+    pagina INTEGER NOT NULL,
+    linea INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ocurrencias_termino ON ocurrencias (termino, anio);
+"""
+
+SEPARADOR_PAGINA = re.compile(r'^={10,}\nPÁGINA (\d+)\n={10,}\n', re.MULTILINE)
+TOKEN = re.compile(r'\w+')
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes, para que 'migración' y 'MIGRACION' sean el mismo término"""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Términos normalizados de un texto"""
+    return TOKEN.findall(normalizar(texto))
+
+
+def leer_paginas(ruta: Path, formato: str) -> Iterator[Tuple[int, str]]:
+    """Genera (página, texto) según el formato con que cada scraper guardó el texto"""
+    if formato == 'json':
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for pagina in json.load(f):
+                yield pagina['page'], pagina['text']
+        return
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+    if formato == 'plano':
+        yield 1, contenido
+        return
+
+    partes = SEPARADOR_PAGINA.split(contenido)
+    # partes = [prefijo, num1, texto1, num2, texto2, ...]
+    for i in range(1, len(partes), 2):
+        yield int(partes[i]), partes[i + 1]
+
+
+def _conectar(ruta: Path = ARCHIVO_INDICE) -> sqlite3.Connection:
+    Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+    conexion = sqlite3.connect(str(ruta))
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+def construir_indice(fuentes: Dict[int, Tuple[Path, str]] = FUENTES,
+                     ruta_indice: Path = ARCHIVO_INDICE, forzar: bool = False) -> Dict[int, int]:
+    """
+    Indexa el texto de cada año. Los años cuyo archivo no cambió (tamaño y
+    mtime) se omiten salvo forzar=True. Devuelve {año: líneas indexadas}.
+    """
+    conexion = _conectar(ruta_indice)
+    resumen = {}
+    try:
+        for anio, (ruta, formato) in sorted(fuentes.items()):
+            if not Path(ruta).exists():
+                print(f"  {anio}: sin texto extraído ({Path(ruta).name}), se omite")
+                continue
+            estado = os.stat(ruta)
+            fila = conexion.execute("SELECT tamano, mtime_ns FROM fuentes WHERE anio = ?", (anio,)).fetchone()
+            if fila == (estado.st_size, estado.st_mtime_ns) and not forzar:
+                print(f"  {anio}: sin cambios")
+                continue
+
+            lineas = []
+            ocurrencias = []
+            for pagina, texto in leer_paginas(Path(ruta), formato):
+                for n, linea in enumerate(texto.split('\n'), 1):
+                    terminos = set(tokenizar(linea))
+                    if not terminos:
+                        continue
+                    lineas.append((anio, pagina, n, linea.strip()))
+                    ocurrencias.extend((termino, anio, pagina, n) for termino in terminos)
+
+            with conexion:
+                conexion.execute("DELETE FROM lineas WHERE anio = ?", (anio,))
+                conexion.execute("DELETE FROM ocurrencias WHERE anio = ?", (anio,))
+                conexion.executemany("INSERT INTO lineas VALUES (?, ?, ?, ?)", lineas)
+                conexion.executemany("INSERT INTO ocurrencias VALUES (?, ?, ?, ?)", ocurrencias)
+                conexion.execute("INSERT OR REPLACE INTO fuentes VALUES (?, ?, ?, ?)",
+                                 (anio, str(ruta), estado.st_size, estado.st_mtime_ns))
+            resumen[anio] = len(lineas)
+            print(f"  {anio}: {len(lineas)} líneas, {len(ocurrencias)} ocurrencias")
+    finally:
+        conexion.close()
+    return resumen
+
+
+def buscar(consulta: str, anios: Optional[List[int]] = None,
+           ruta_indice: Path = ARCHIVO_INDICE) -> List[Dict]:
+    """
+    Devuelve las líneas que contienen todos los términos de la consulta,
+    como [{'anio', 'pagina', 'linea', 'texto'}], ordenadas por año y página.
+    """
+    terminos = sorted(set(tokenizar(consulta)))
+    if not terminos:
+        return []
+
+    filtro_anio = ""
+    parametros: List = list(terminos)
+    if anios:
+        filtro_anio = f" AND anio IN ({','.join('?' * len(anios))})"
+        parametros.extend(anios)
+    parametros.append(len(terminos))
+
+    conexion = _conectar(ruta_indice)
+    try:
+        filas = conexion.execute(
+            f"""
+            SELECT l.anio, l.pagina, l.linea, l.texto
+            FROM (
+                SELECT anio, pagina, linea FROM ocurrencias
+                WHERE termino IN ({','.join('?' * len(terminos))}){filtro_anio}
+                GROUP BY anio, pagina, linea
+                HAVING COUNT(*) = ?
+            ) o
+            JOIN lineas l USING (anio, pagina, linea)
+            ORDER BY l.anio, l.pagina, l.linea
+            """,
+            parametros
+        ).fetchall()
+    finally:
+        conexion.close()
+
+    return [{'anio': a, 'pagina': p, 'linea': n, 'texto': t} for a, p, n, t in filas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice invertido del texto de las Memorias Anuales")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    p_construir = subparsers.add_parser("construir", help="Indexar (o actualizar) el texto de todos los años")
+    p_construir.add_argument("--forzar", action="store_true", help="Reindexar aunque los archivos no cambien")
+    p_buscar = subparsers.add_parser("buscar", help="Buscar líneas que contengan todos los términos")
+    p_buscar.add_argument("consulta")
+    p_buscar.add_argument("--anio", type=int, action="append", help="Limitar a uno o más años")
+    args = parser.parse_args()
+
+    if args.comando == "construir":
+        print("Construyendo índice de textos...")
+        construir_indice(forzar=args.forzar)
+        print(f"✓ Índice guardado en: {ARCHIVO_INDICE}")
+    else:
+        resultados = buscar(args.consulta, args.anio)
+        print(f"{len(resultados)} coincidencias para '{args.consulta}'")
+        for r in resultados:
+            print(f"  [{r['anio']} · pág. {r['pagina']}] {r['texto'][:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Recorrido de páginas de las Memorias Anuales en una sola pasada
+Abre el PDF una vez y obtiene texto, tablas y palabras de cada página a
+partir del mismo layout ya analizado por pdfplumber. Con workers > 1 el
+rango de páginas se reparte entre procesos y los resultados se devuelven
+en orden de página. Con usar_cache=True las páginas ya extraídas se leen
+de la caché SQLite (comun.cache_paginas) sin abrir el PDF.
+
+indice_relevancia hace una primera pasada barata (texto crudo con pdfium,
+sin análisis de layout) para decidir qué páginas merecen la detección de
+tablas de pdfplumber; con usar_cache=True el índice también se guarda en la
+caché, así que una ejecución caliente no lee ningún byte del PDF.
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+from comun.cache_paginas import CachePaginas, clave_ajustes
+
+
+def _extraer_pagina(page, opciones: Dict) -> Dict:
+    """Aplica las extracciones solicitadas a una página ya abierta"""
+    resultado = {}
+    if opciones['texto']:
+        resultado['texto'] = page.extract_text() or ""
+    if opciones['tablas']:
+        resultado['tablas'] = page.extract_tables(opciones['table_settings'])
+    if opciones['palabras']:
+        resultado['palabras'] = page.extract_words()
+    # Liberar los objetos ya analizados de la página antes de seguir
+    page.close()
+    return resultado
+
+
+def _extraer_rango(tarea: Tuple) -> List[Dict]:
+    """Trabajo de cada proceso: abre el PDF por ruta y procesa un bloque de páginas"""
+    ruta, paginas, opciones = tarea
+    with pdfplumber.open(ruta) as pdf:
+        return [_extraer_pagina(pdf.pages[p - 1], opciones) for p in paginas]
+
+
+def _contar_paginas(pdf_file) -> int:
+    """Número de páginas del PDF"""
+    with pdfplumber.open(pdf_file) as pdf:
+        return len(pdf.pages)
+
+
+def _extraer_secuencial(pdf_file, paginas: List[int], opciones: Dict) -> Iterator[Dict]:
+    """Extrae las páginas indicadas abriendo el PDF una sola vez"""
+    with pdfplumber.open(pdf_file) as pdf:
+        for p in paginas:
+            yield _extraer_pagina(pdf.pages[p - 1], opciones)
+
+
+def _extraer_en_paralelo(pdf_file, paginas: List[int], opciones: Dict,
+                         workers: int) -> Iterator[Dict]:
+    """Reparte las páginas en bloques contiguos entre un ProcessPoolExecutor"""
+    temporal = None
+    if isinstance(pdf_file, (str, os.PathLike)):
+        ruta = str(pdf_file)
+    else:
+        # Los procesos abren el archivo por ruta: un buffer se vuelca a disco una vez
+        pdf_file.seek(0)
+        fd, temporal = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_file.read())
+        ruta = temporal
+
+    try:
+        # Varios bloques por proceso para equilibrar páginas pesadas y livianas
+        tamano = max(1, -(-len(paginas) // (workers * 4)))
+        tareas = [(ruta, paginas[i:i + tamano], opciones) for i in range(0, len(paginas), tamano)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map conserva el orden de las tareas, es decir, el orden de página
+            for bloque in executor.map(_extraer_rango, tareas):
+                yield from bloque
+    finally:
+        if temporal:
+            os.remove(temporal)
+
+
+def _extraer(pdf_file, paginas: List[int], opciones: Dict, workers: int) -> Iterator[Dict]:
+    """Extrae las páginas indicadas, en paralelo si workers > 1"""
+    if not paginas:
+        return iter(())
+    if workers > 1:
+        return _extraer_en_paralelo(pdf_file, paginas, opciones, workers)
+    return _extraer_secuencial(pdf_file, paginas, opciones)
+
+
+def indice_relevancia(pdf_file, terminos: Iterable[str],
+                      usar_cache: bool = False) -> Dict[int, Set[str]]:
+    """
+    Primera pasada rápida: lee solo el texto crudo de cada página (pdfium,
+    sin análisis de layout ni de tablas) y devuelve {pagina: términos encontrados}.
+    Con usar_cache=True el índice se lee o se guarda en la caché de páginas.
+    """
+    terminos = [t.lower() for t in terminos]
+    if not usar_cache:
+        return _calcular_indice(pdf_file, terminos)
+
+    # La clave incluye la versión de pypdfium2, igual que clave_ajustes con pdfplumber
+    clave = json.dumps({'pypdfium2': version('pypdfium2'), 'terminos': sorted(set(terminos))},
+                       sort_keys=True, ensure_ascii=False)
+    cache = CachePaginas()
+    try:
+        sha256 = cache.huella(pdf_file)
+        indice = cache.leer_indice(sha256, clave)
+        if indice is None:
+            indice = _calcular_indice(pdf_file, terminos)
+            cache.guardar_indice(sha256, clave, indice)
+        else:
+            print(f"Índice de relevancia leído de la caché ({len(indice)} páginas)")
+        return indice
+    finally:
+        cache.cerrar()
+
+
+def _calcular_indice(pdf_file, terminos: List[str]) -> Dict[int, Set[str]]:
+    """Recorre el texto crudo de todas las páginas con pdfium"""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        fuente = str(pdf_file)
+    else:
+        pdf_file.seek(0)
+        fuente = pdf_file.read()
+        pdf_file.seek(0)
+
+    indice = {}
+    documento = pdfium.PdfDocument(fuente)
+    try:
+        for i in range(len(documento)):
+            page = documento[i]
+            textpage = page.get_textpage()
+            texto = textpage.get_text_range().lower()
+            textpage.close()
+            page.close()
+            indice[i + 1] = {t for t in terminos if t in texto}
+    finally:
+        documento.close()
+    return indice
+
+
+def recorrer_paginas(pdf_file, texto: bool = True, tablas: bool = True,
+                     palabras: bool = False, workers: int = 1,
+                     usar_cache: bool = False,
+                     table_settings: Optional[Dict] = None,
+                     paginas: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+    """
+    Genera un diccionario por página con las extracciones solicitadas:
+    {'pagina', 'total_paginas', 'texto', 'tablas', 'palabras'}
+
+    pdf_file puede ser una ruta o un buffer (BytesIO). Con workers > 1 la
+    extracción se hace en varios procesos; con usar_cache=True solo se
+    extraen las páginas que no estén en la caché persistente. paginas
+    limita el recorrido a esos números de página (por defecto, todas).
+    """
+    opciones = {'texto': texto, 'tablas': tablas, 'palabras': palabras, 'table_settings': table_settings}
+
+    if not usar_cache:
+        if workers <= 1:
+            with pdfplumber.open(pdf_file) as pdf:
+                total = len(pdf.pages)
+                seleccion = sorted(paginas) if paginas is not None else range(1, total + 1)
+                for p in seleccion:
+                    yield {'pagina': p, 'total_paginas': total, **_extraer_pagina(pdf.pages[p - 1], opciones)}
+            return
+        total = _contar_paginas(pdf_file)
+        seleccion = sorted(paginas) if paginas is not None else list(range(1, total + 1))
+        for p, resultado in zip(seleccion, _extraer(pdf_file, seleccion, opciones, workers)):
+            yield {'pagina': p, 'total_paginas': total, **resultado}
+        return
+
+    ajustes = {}
+    if texto:
+        ajustes['texto'] = clave_ajustes('texto')
+    if tablas:
+        ajustes['tablas'] = clave_ajustes('tablas', table_settings)
+    if palabras:
+        ajustes['palabras'] = clave_ajustes('palabras')
+
+    cache = CachePaginas()
+    try:
+        sha256 = cache.huella(pdf_file)
+        total = cache.total_paginas(sha256)
+        if total is None:
+            total = _contar_paginas(pdf_file)
+            cache.guardar_total_paginas(sha256, total)
+
+        seleccion = sorted(paginas) if paginas is not None else list(range(1, total + 1))
+        completas = cache.paginas_completas(sha256, ajustes)
+        faltantes = [p for p in seleccion if p not in completas]
+        print(f"Caché de páginas: {len(seleccion) - len(faltantes)} en caché, {len(faltantes)} por extraer")
+        nuevas = _extraer(pdf_file, faltantes, opciones, workers)
+
+        for p in seleccion:
+            if p in completas:
+                resultado = cache.leer_pagina(sha256, p, ajustes)
+            else:
+                resultado = next(nuevas)
+                cache.guardar_pagina(sha256, p, ajustes, resultado)
+            yield {'pagina': p, 'total_paginas': total, **resultado}
+    finally:
+        cache.cerrar()
@@ -0,0 +1,101 @@
+"""
+Búsqueda de varios grupos de palabras clave en una sola pasada
+Compila todas las palabras en una única expresión regular (alternancia
+dentro de un lookahead, de mayor a menor longitud) para recorrer el texto
+una sola vez y devolver todas las apariciones, incluso las superpuestas,
+con su categoría y posición.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# (posición, palabra, categoría)
+Coincidencia = Tuple[int, str, str]
+
+
+class BuscadorPalabrasClave:
+    """
+    Clasificador de texto por grupos de palabras clave.
+
+    Las palabras se buscan como subcadenas (igual que `palabra in texto`).
+    Con ignorar_mayusculas=True el texto se pasa a minúsculas antes de
+    buscar, por lo que las palabras deben escribirse en minúsculas.
+    """
+
+    def __init__(self, grupos: Dict[str, Iterable[str]], ignorar_mayusculas: bool = True):
+        self.grupos = {categoria: list(dict.fromkeys(palabras)) for categoria, palabras in grupos.items()}
+        self.ignorar_mayusculas = ignorar_mayusculas
+
+        self._categorias_por_palabra: Dict[str, List[str]] = {}
+        for categoria, palabras in self.grupos.items():
+            for palabra in palabras:
+                if palabra:
+                    self._categorias_por_palabra.setdefault(palabra, []).append(categoria)
+
+        palabras = sorted(self._categorias_por_palabra, key=len, reverse=True)
+        # En cada posición la alternancia devuelve la palabra más larga; las más
+        # cortas que empiezan en el mismo punto son sus prefijos y se agregan aparte
+        self._prefijos = {p: [q for q in palabras if p.startswith(q)] for p in palabras}
+        self._patron = re.compile('(?=(' + '|'.join(map(re.escape, palabras)) + '))') if palabras else None
+
+    def _preparar(self, texto: str) -> str:
+        return texto.lower() if self.ignorar_mayusculas else texto
+
+    def _buscar_preparado(self, texto: str) -> Iterator[Tuple[int, str]]:
+        if self._patron is None:
+            return
+        for match in self._patron.finditer(texto):
+            for palabra in self._prefijos[match.group(1)]:
+                yield match.start(), palabra
+
+    def buscar(self, texto: str) -> List[Coincidencia]:
+        """Todas las apariciones como (posición, palabra, categoría), en orden de posición"""
+        return [
+            (posicion, palabra, categoria)
+            for posicion, palabra in self._buscar_preparado(self._preparar(texto))
+            for categoria in self._categorias_por_palabra[palabra]
+        ]
+
+    def palabras_en(self, texto: str) -> Set[str]:
+        """Conjunto de palabras distintas que aparecen en el texto"""
+        return {palabra for _, palabra in self._buscar_preparado(self._preparar(texto))}
+
+    def categorias(self, texto: str) -> Dict[str, List[Tuple[int, str]]]:
+        """{categoría: [(posición, palabra), ...]} solo con las categorías encontradas"""
+        resultado: Dict[str, List[Tuple[int, str]]] = {}
+        for posicion, palabra, categoria in self.buscar(texto):
+            resultado.setdefault(categoria, []).append((posicion, palabra))
+        return resultado
+
+    def primera_categoria(self, texto: str, default: Optional[str] = None) -> Optional[str]:
+        """Primera categoría (en el orden de declaración de los grupos) con alguna coincidencia"""
+        encontradas = self.categorias(texto)
+        for categoria in self.grupos:
+            if categoria in encontradas:
+                return categoria
+        return default
+
+    def clasificar_lineas(self, texto: str) -> Iterator[Tuple[int, str, Dict[str, List[Tuple[int, str]]]]]:
+        """
+        Recorre el texto una vez y genera (número de línea, línea, categorías)
+        solo para las líneas con coincidencias. Las posiciones son relativas a la
+        línea ya preparada, igual que en buscar: lower() puede alargar el texto
+        (por ejemplo 'İ' pasa a 'i̇'), pero nunca agrega ni quita saltos de línea.
+        """
+        lineas = texto.split('\n')
+        preparado = self._preparar(texto)
+        inicios = []
+        desplazamiento = 0
+        for linea in preparado.split('\n'):
+            inicios.append(desplazamiento)
+            desplazamiento += len(linea) + 1
+
+        por_linea: Dict[int, Dict[str, List[Tuple[int, str]]]] = {}
+        for posicion, palabra in self._buscar_preparado(preparado):
+            n = bisect_right(inicios, posicion) - 1
+            for categoria in self._categorias_por_palabra[palabra]:
+                por_linea.setdefault(n, {}).setdefault(categoria, []).append((posicion - inicios[n], palabra))
+
+        for n in sorted(por_linea):
+            yield n, lineas[n], por_linea[n]
@@ -0,0 +1,59 @@
+"""
+Verificación de BuscadorPalabrasClave (comun.palabras_clave)
+Comprueba que la búsqueda en una pasada coincide con `palabra in texto`,
+que devuelve apariciones superpuestas y que clasificar_lineas ubica cada
+coincidencia en su línea aunque lower() alargue el texto ('İ' pasa a 'i̇').
+
+Uso (desde SISTEMA/scrapeo):
+    python comun/verificar_palabras_clave.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.palabras_clave import BuscadorPalabrasClave
+
+GRUPOS = {
+    'beca': ['beca', 'becario', 'becarios'],
+    'region': ['lima', 'cusco', 'istanbul'],
+    'año': ['2024'],
+}
+
+
+def main():
+    buscador = BuscadorPalabrasClave(GRUPOS)
+    texto = "Becarios de LIMA en 2024\nBeca en Cusco\nsin coincidencias\nistanbul y lima"
+
+    esperadas = {p for palabras in GRUPOS.values() for p in palabras if p in texto.lower()}
+
+    # Cada 'İ' (1 carácter) pasa a 'i̇' (2) con lower(): las posiciones del texto
+    # preparado se desplazan respecto del original en cada línea siguiente
+    alargado = "İİİİ İİİİ İİİİ beca\nİİİİ\nLima\nİSTANBUL y cusco"
+    lineas = {n: (linea, categorias) for n, linea, categorias in buscador.clasificar_lineas(alargado)}
+
+    def linea(n):
+        return lineas.get(n, ('', {}))
+
+    comprobaciones = [
+        ("palabras_en equivale a `in`", buscador.palabras_en(texto) == esperadas),
+        ("apariciones superpuestas (beca, becario, becarios)",
+         [p for _, p, c in buscador.buscar("becarios") if c == 'beca'] == ['becarios', 'becario', 'beca']),
+        ("primera_categoria en orden de declaración", buscador.primera_categoria("Cusco 2024") == 'region'),
+        ("clasificar_lineas con texto sin cambios de longitud",
+         [n for n, _, _ in buscador.clasificar_lineas(texto)] == [0, 1, 3]),
+        ("'İ' no mueve coincidencias de línea", sorted(lineas) == [0, 2, 3]),
+        ("'İ': cada línea conserva su texto original", linea(2)[0] == "Lima" and linea(3)[0].startswith("İSTANBUL")),
+        # 'İSTANBUL'.lower() es 'i̇stanbul' (con punto combinante), así que no coincide con 'istanbul'
+        ("'İ': posiciones dentro de la línea preparada",
+         linea(0)[1] == {'beca': [(27, 'beca')]} and linea(2)[1] == {'region': [(0, 'lima')]}
+         and linea(3)[1] == {'region': [(12, 'cusco')]}),
+    ]
+    print("Verificación de BuscadorPalabrasClave:")
+    for nombre, ok in comprobaciones:
+        print(f"  {'✓' if ok else '✗'} {nombre}")
+    sys.exit(0 if all(ok for _, ok in comprobaciones) else 1)
+
+
+if __name__ == "__main__":
+    main()
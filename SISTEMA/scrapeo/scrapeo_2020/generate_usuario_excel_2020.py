@@ -3,11 +3,19 @@ Genera un Excel `datos_usuario_2020.xlsx` con las columnas solicitadas por el us
 Usa los CSV generados previamente en el workspace (datos de 2020) y completa campos faltantes inventando valores cuando sea necesario.
 También genera `campos_inventados_2020.txt` que lista qué campos se inventaron.
 Genera múltiples filas por registro para tener un dataset más realista.
+Los campos inventados se describen como reglas de comun.generador_sintetico.
 """
 
+import sys
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import random
-import json
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.generador_sintetico import (Columna, Condicional, Constante, Eleccion,
+                                       SegunColumna, concatenar, expandir,
+                                       generar_dataframe)
 
 # Archivos de entrada (generados anteriormente)
 FN_DEPART = 'beca18_por_departamento_2020.csv'
@@ -20,32 +28,33 @@ FN_MODAL = 'becarios_continuadores_por_modalidad_2020.csv'
 out_xlsx = 'datos_usuario_2020.xlsx'
 out_report = 'campos_inventados_2020.txt'
 
-random.seed(2020)
+COLUMNAS = [
+    'NombreBeca','Institucion','Carrera','Lugar','Categoria de becas',
+    'Anio_Convocatoria','Genero','EstratoSocieconomico','BecasSegunMigracion'
+]
+
+# Un solo generador para todas las secciones: el resultado es reproducible
+rng = np.random.default_rng(2020)
+
+DEPARTAMENTOS = ['Lima','Callao','Áncash','Apurímac','Arequipa','Ayacucho','Cajamarca',
+                 'Cusco','Huancavelica','Huánuco','Ica','Junín','La Libertad',
+                 'Lambayeque','Loreto','Madre de Dios','Moquegua','Pasco','Piura',
+                 'Puno','San Martín','Tacna','Tumbes','Ucayali','Amazonas']
 
-# Helper para elegir genero con distribución real (aprox 55% F, 45% M según datos típicos Pronabec)
-def pick_gender():
-    return random.choices(['Femenino', 'Masculino'], weights=[0.55, 0.45])[0]
+# Genero con distribución real (aprox 55% F, 45% M según datos típicos Pronabec)
+GENERO = Eleccion(['Femenino', 'Masculino'], [0.55, 0.45])
 
-# Helper estrato con distribución real (mayoría pobre)
+# Estrato con distribución real (mayoría pobre)
 estratos = ['Pobre', 'Pobre Extremo', 'No pobre']
-def pick_estrato():
-    return random.choices(estratos, weights=[0.60, 0.25, 0.15])[0]
+ESTRATO = Eleccion(estratos, [0.60, 0.25, 0.15])
 
-# Helper migracion (aprox 25% migra)
+# Migracion (aprox 25% migra); estudiar fuera del país -> Migro
 migr_options = ['Migro', 'No Migro']
-def pick_migracion(lugar_estudio, lugares_origen=None):
-    # Si estudia en Lima y es de Lima -> No Migro
-    # Si estudia fuera del país -> Migro
-    # Sino distribución normal
-    if lugar_estudio in ['Lima'] and lugares_origen and 'Lima' in lugares_origen:
-        return 'No Migro'
-    elif lugar_estudio not in ['Lima','Callao','Áncash','Apurímac','Arequipa','Ayacucho','Cajamarca',
-                                 'Cusco','Huancavelica','Huánuco','Ica','Junín','La Libertad',
-                                 'Lambayeque','Loreto','Madre de Dios','Moquegua','Pasco','Piura',
-                                 'Puno','San Martín','Tacna','Tumbes','Ucayali','Amazonas']:
-        return 'Migro'  # país extranjero
-    else:
-        return random.choices(migr_options, weights=[0.25, 0.75])[0]
+MIGRACION = Condicional(
+    lambda f: ~f['Lugar'].isin(DEPARTAMENTOS),
+    Constante('Migro'),  # país extranjero
+    Eleccion(migr_options, [0.25, 0.75])
+)
 
 # Mapeo de instituciones según tipo (usando datos reales del PDF)
 instituciones_universidad = ['Universidad Nacional Mayor de San Marcos', 'Universidad Nacional de Ingeniería',
@@ -55,6 +64,14 @@ instituciones_ist = ['Instituto superior tecnológico', 'SENATI', 'TECSUP',
                      'Instituto Tecnológico']
 instituciones_isp = ['Instituto superior pedagógico', 'Pedagógico Nacional']
 
+# Distribución: 79% universidad, 18% IST, 3% ISP (según PDF); se sortea en la columna auxiliar TipoInstitucion
+TIPO_INSTITUCION = Eleccion(['Universidad', 'IST', 'ISP'], [0.79, 0.18, 0.03])
+INSTITUCION = SegunColumna('TipoInstitucion', {
+    'Universidad': Eleccion(instituciones_universidad),
+    'IST': Eleccion(instituciones_ist),
+    'ISP': Eleccion(instituciones_isp),
+})
+
 # Carreras comunes por área (del PDF)
 carreras_ingenieria = ['Ingeniería Civil', 'Ingeniería Industrial', 'Ingeniería de Sistemas',
                        'Ingeniería Mecánica', 'Ingeniería Electrónica', 
@@ -63,68 +80,49 @@ carreras_ciencias_sociales = ['Administración', 'Contabilidad', 'Economía', 'D
                               'Ciencias Sociales, Comerciales y Derecho']
 carreras_salud = ['Enfermería', 'Medicina', 'Odontología', 'Ciencias de la Salud']
 carreras_educacion = ['Educación Primaria', 'Educación Inicial', 'Educación']
-carreras_otras = ['Agronomía', 'Agropecuaria y Veterinaria', 'Humanidades y Arte',
-                  'Ciencias Naturales, Exactas y de la Computación', 'Servicios']
-
-def pick_carrera_from_area(area):
-    if 'Ingenier' in area:
-        return random.choice(carreras_ingenieria)
-    elif 'Ciencias Sociales' in area or 'Comerciales' in area:
-        return random.choice(carreras_ciencias_sociales)
-    elif 'Salud' in area:
-        return random.choice(carreras_salud)
-    elif 'Educación' in area:
-        return random.choice(carreras_educacion)
-    else:
-        return area  # usar el área tal cual
-
-def pick_institucion(tipo_preferido=None):
-    if tipo_preferido == 'Universidad':
-        return random.choice(instituciones_universidad)
-    elif tipo_preferido == 'Instituto superior tecnológico':
-        return random.choice(instituciones_ist)
-    elif tipo_preferido == 'Instituto superior pedagógico':
-        return random.choice(instituciones_isp)
+
+def contiene(columna, *fragmentos):
+    """Condición vectorizada: la columna contiene alguno de los fragmentos"""
+    patron = '|'.join(fragmentos)
+    return lambda f: f[columna].astype(str).str.contains(patron, regex=True)
+
+# Carrera a partir del área (columna auxiliar Area); otras áreas se usan tal cual
+CARRERA_POR_AREA = Condicional(contiene('Area', 'Ingenier'), Eleccion(carreras_ingenieria),
+    Condicional(contiene('Area', 'Ciencias Sociales', 'Comerciales'), Eleccion(carreras_ciencias_sociales),
+        Condicional(contiene('Area', 'Salud'), Eleccion(carreras_salud),
+            Condicional(contiene('Area', 'Educación'), Eleccion(carreras_educacion),
+                Columna('Area')))))
+
+def cantidad_por_fila(df, columna, defecto, divisor, minimo, maximo):
+    """Registros de muestra por fila: total // divisor acotado a [minimo, maximo]"""
+    if columna in df.columns:
+        total = pd.to_numeric(df[columna].astype(str).str.replace(' ', ''), errors='coerce')
+        total = total.fillna(defecto).astype(int)
     else:
-        # Distribución: 79% universidad, 18% IST, 3% ISP (según PDF)
-        tipo = random.choices(['Universidad', 'IST', 'ISP'], weights=[0.79, 0.18, 0.03])[0]
-        if tipo == 'Universidad':
-            return random.choice(instituciones_universidad)
-        elif tipo == 'IST':
-            return random.choice(instituciones_ist)
-        else:
-            return random.choice(instituciones_isp)
-
-rows = []
-campos_inventados = set()
+        total = pd.Series(defecto, index=df.index)
+    return (total // divisor).clip(minimo, maximo)
+
+def leer_csv(ruta):
+    try:
+        return pd.read_csv(ruta)
+    except Exception as e:
+        return pd.DataFrame()
+
+secciones = []
 
 # Crear registros de muestra - expandir usando totales reales
 
-# 1) Beca 18 por departamento - expandir con registros múltiples
-try:
-    df_dept = pd.read_csv(FN_DEPART)
-except Exception as e:
-    df_dept = pd.DataFrame()
+# 1) Beca 18 por departamento - entre 5-15 registros por departamento (muestra representativa)
+df_dept = leer_csv(FN_DEPART)
 
 print(f"Generando registros de Beca 18 por departamento...")
-for i, r in df_dept.iterrows():
-    lugar = r.get('Departamento')
-    nombre = 'Beca 18'
-    categoria = 'Pregrado'
-    anio = 2020
-    
-    # Obtener total de becarios para este departamento
-    try:
-        total_becarios = int(str(r.get('TotalBecarios', 10)).replace(' ', ''))
-    except:
-        total_becarios = 10
-    
-    # Crear entre 5-15 registros por departamento (muestra representativa)
-    num_registros = min(15, max(5, total_becarios // 100))
-    
-    for j in range(num_registros):
+if not df_dept.empty:
+    base = expandir(df_dept[['Departamento']].rename(columns={'Departamento': 'Lugar'}),
+                    cantidad_por_fila(df_dept, 'TotalBecarios', 10, 100, 5, 15))
+    secciones.append(generar_dataframe({
+        'NombreBeca': Constante('Beca 18'),
         # Carrera: distribuir según proporciones del PDF
-        carrera_area = random.choices(
+        'Area': Eleccion(
             ['Ingeniería, Industria y Construcción',
              'Ciencias Sociales, Comerciales y Derecho',
              'Ciencias de la Salud',
@@ -133,247 +131,111 @@ for i, r in df_dept.iterrows():
              'Agropecuaria y Veterinaria',
              'Humanidades y Arte',
              'Servicios'],
-            weights=[0.534, 0.263, 0.071, 0.047, 0.045, 0.026, 0.011, 0.003]
-        )[0]
-        carrera = pick_carrera_from_area(carrera_area)
-        campos_inventados.add('Carrera')
-        
-        # Institución: distribuir según tipo
-        institucion = pick_institucion()
-        campos_inventados.add('Institucion')
-        
-        genero = pick_gender()
-        campos_inventados.add('Genero')
-        
-        estrato = pick_estrato()
-        campos_inventados.add('EstratoSocieconomico')
-        
-        migr = pick_migracion(lugar)
-        campos_inventados.add('BecasSegunMigracion')
-        
-        rows.append({
-            'NombreBeca': nombre,
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': lugar,
-            'Categoria de becas': categoria,
-            'Anio_Convocatoria': anio,
-            'Genero': genero,
-            'EstratoSocieconomico': estrato,
-            'BecasSegunMigracion': migr
-        })
-
-print(f"  → Generados {len(rows)} registros de Beca 18 por departamento")
-
-# 2) Beca 18 por carrera - crear registros adicionales
-try:
-    df_car = pd.read_csv(FN_CARRERA)
-except Exception as e:
-    df_car = pd.DataFrame()
+            [0.534, 0.263, 0.071, 0.047, 0.045, 0.026, 0.011, 0.003]
+        ),
+        'Carrera': CARRERA_POR_AREA,
+        'TipoInstitucion': TIPO_INSTITUCION,
+        'Institucion': INSTITUCION,
+        'Categoria de becas': Constante('Pregrado'),
+        'Anio_Convocatoria': Constante(2020),
+        'Genero': GENERO,
+        'EstratoSocieconomico': ESTRATO,
+        'BecasSegunMigracion': MIGRACION,
+    }, base=base, semilla=rng, columnas=COLUMNAS))
+    print(f"  → Generados {len(secciones[-1])} registros de Beca 18 por departamento")
+
+# 2) Beca 18 por carrera - registros proporcionales (5-20 por área)
+df_car = leer_csv(FN_CARRERA)
 
 print(f"Generando registros de Beca 18 por carrera...")
-rows_antes = len(rows)
-for i, r in df_car.iterrows():
-    nombre = 'Beca 18'
-    carrera_area = r.get('Carrera') if pd.notna(r.get('Carrera')) else 'Otra'
-    categoria = 'Pregrado'
-    anio = 2020
-    
-    # Obtener total
-    try:
-        total_becarios = int(str(r.get('TotalBecarios', 10)).replace(' ', ''))
-    except:
-        total_becarios = 10
-    
-    # Crear registros proporcionales (5-20 por área)
-    num_registros = min(20, max(5, total_becarios // 500))
-    
-    for j in range(num_registros):
-        carrera = pick_carrera_from_area(carrera_area)
-        
+if not df_car.empty:
+    base = expandir(pd.DataFrame({'Area': df_car['Carrera'].fillna('Otra')}),
+                    cantidad_por_fila(df_car, 'TotalBecarios', 10, 500, 5, 20))
+    secciones.append(generar_dataframe({
+        'NombreBeca': Constante('Beca 18'),
+        'Carrera': CARRERA_POR_AREA,
         # Lugar: distribuir entre departamentos principales
-        lugar = random.choice(['Lima', 'Junín', 'Piura', 'Cusco', 'Arequipa', 
-                              'Ayacucho', 'Cajamarca', 'Lambayeque'])
-        campos_inventados.add('Lugar')
-        
-        institucion = pick_institucion()
-        campos_inventados.add('Institucion')
-        
-        genero = pick_gender()
-        campos_inventados.add('Genero')
-        
-        estrato = pick_estrato()
-        campos_inventados.add('EstratoSocieconomico')
-        
-        migr = pick_migracion(lugar)
-        campos_inventados.add('BecasSegunMigracion')
-        
-        rows.append({
-            'NombreBeca': nombre,
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': lugar,
-            'Categoria de becas': categoria,
-            'Anio_Convocatoria': anio,
-            'Genero': genero,
-            'EstratoSocieconomico': estrato,
-            'BecasSegunMigracion': migr
-        })
-
-print(f"  → Generados {len(rows) - rows_antes} registros adicionales por carrera")
-
-# 3) Becas de posgrado por país
-try:
-    df_pos_pais = pd.read_csv(FN_POS_PAIS)
-except Exception as e:
-    df_pos_pais = pd.DataFrame()
-
-try:
-    df_pos_prog = pd.read_csv(FN_POS_PROG)
-except Exception as e:
-    df_pos_prog = pd.DataFrame()
+        'Lugar': Eleccion(['Lima', 'Junín', 'Piura', 'Cusco', 'Arequipa', 
+                           'Ayacucho', 'Cajamarca', 'Lambayeque']),
+        'TipoInstitucion': TIPO_INSTITUCION,
+        'Institucion': INSTITUCION,
+        'Categoria de becas': Constante('Pregrado'),
+        'Anio_Convocatoria': Constante(2020),
+        'Genero': GENERO,
+        'EstratoSocieconomico': ESTRATO,
+        'BecasSegunMigracion': MIGRACION,
+    }, base=base, semilla=rng, columnas=COLUMNAS))
+    print(f"  → Generados {len(secciones[-1])} registros adicionales por carrera")
+
+# 3) Becas de posgrado por país - 3-8 registros por país
+df_pos_pais = leer_csv(FN_POS_PAIS)
+df_pos_prog = leer_csv(FN_POS_PROG)
 
 print(f"Generando registros de Becas de Posgrado...")
-rows_antes = len(rows)
-for i, r in df_pos_pais.iterrows():
-    pais = r.get('PaisEstudio')
-    nombre = 'Beca Posgrado'
-    lugar = pais  # El país es el lugar de estudio
-    anio = 2020
-    
-    # Obtener total
-    try:
-        total_becarios = int(str(r.get('TotalBecarios', 5)).replace(' ', ''))
-    except:
-        total_becarios = 5
-    
-    # Crear 3-8 registros por país
-    num_registros = min(8, max(3, total_becarios // 10))
-    
-    for j in range(num_registros):
-        # Categoria: 82% Maestría, 18% Doctorado (según PDF)
-        categoria = random.choices(
-            ['Posgrado Maestria', 'Posgrado Doctorado'], 
-            weights=[0.82, 0.18]
-        )[0]
-        
+if not df_pos_pais.empty:
+    # El país es el lugar de estudio
+    base = expandir(df_pos_pais[['PaisEstudio']].rename(columns={'PaisEstudio': 'Lugar'}),
+                    cantidad_por_fila(df_pos_pais, 'TotalBecarios', 5, 10, 3, 8))
+    secciones.append(generar_dataframe({
+        'NombreBeca': Constante('Beca Posgrado'),
+        'Institucion': Constante('Universidad'),  # Posgrado siempre es universidad
         # Carrera para posgrado
-        carrera = random.choice([
+        'Carrera': Eleccion([
             'MBA - Administración', 'Maestría en Educación', 
             'Maestría en Ingeniería', 'Doctorado en Ciencias',
             'Maestría en Salud Pública', 'Maestría en Derecho',
             'Doctorado en Educación', 'Maestría en Economía'
-        ])
-        campos_inventados.add('Carrera')
-        
-        institucion = 'Universidad'  # Posgrado siempre es universidad
-        campos_inventados.add('Institucion')
-        
-        genero = pick_gender()
-        campos_inventados.add('Genero')
-        
-        estrato = pick_estrato()
-        campos_inventados.add('EstratoSocieconomico')
-        
+        ]),
+        # Categoria: 82% Maestría, 18% Doctorado (según PDF)
+        'Categoria de becas': Eleccion(['Posgrado Maestria', 'Posgrado Doctorado'], [0.82, 0.18]),
+        'Anio_Convocatoria': Constante(2020),
+        'Genero': GENERO,
+        'EstratoSocieconomico': ESTRATO,
         # Para posgrado internacional -> siempre "Migro"
-        migr = 'Migro'
-        campos_inventados.add('BecasSegunMigracion')
-        
-        rows.append({
-            'NombreBeca': nombre,
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': lugar,
-            'Categoria de becas': categoria,
-            'Anio_Convocatoria': anio,
-            'Genero': genero,
-            'EstratoSocieconomico': estrato,
-            'BecasSegunMigracion': migr
-        })
-
-print(f"  → Generados {len(rows) - rows_antes} registros de Posgrado")
-
-# 4) Modalidades especiales
-try:
-    df_modal = pd.read_csv(FN_MODAL)
-except Exception as e:
-    df_modal = pd.DataFrame()
+        'BecasSegunMigracion': Constante('Migro'),
+    }, base=base, semilla=rng, columnas=COLUMNAS))
+    print(f"  → Generados {len(secciones[-1])} registros de Posgrado")
+
+# 4) Modalidades especiales - 2-5 registros por modalidad especial
+df_modal = leer_csv(FN_MODAL)
 
 print(f"Generando registros de Becas Especiales...")
-rows_antes = len(rows)
-for i, r in df_modal.iterrows():
-    nombre_beca = r.get('NombreBeca') if pd.notna(r.get('NombreBeca')) else 'Beca Especial'
-    
-    # Skip "Total" row
-    if nombre_beca == 'Total':
-        continue
-    
-    categoria = 'Especiales'
-    anio = 2020
-    
-    # Obtener total
-    try:
-        total_becarios = int(str(r.get('BecariosContinuadores', 3)).replace(' ', ''))
-    except:
-        total_becarios = 3
-    
-    # Crear 2-5 registros por modalidad especial
-    num_registros = min(5, max(2, total_becarios // 50))
-    
-    for j in range(num_registros):
+if not df_modal.empty:
+    df_modal = df_modal.assign(NombreBeca=df_modal['NombreBeca'].fillna('Beca Especial'))
+    df_modal = df_modal[df_modal['NombreBeca'] != 'Total']  # Skip "Total" row
+    base = expandir(df_modal[['NombreBeca']],
+                    cantidad_por_fila(df_modal, 'BecariosContinuadores', 3, 50, 2, 5))
+    es_internacional = contiene('NombreBeca', 'Internacional', 'Francia')
+    es_ecuatoriana = contiene('NombreBeca', 'Ecuatoriana')
+    secciones.append(generar_dataframe({
         # Lugar: mezcla entre Perú y países
-        if 'Internacional' in nombre_beca or 'Francia' in nombre_beca:
-            lugar = random.choice(['Francia', 'España', 'Reino Unido', 'Estados Unidos'])
-            migr = 'Migro'
-        elif 'Ecuatoriana' in nombre_beca:
-            lugar = random.choice(['Ecuador', 'Lima'])
-            migr = 'Migro' if lugar == 'Ecuador' else random.choice(migr_options)
-        else:
-            lugar = random.choice(['Lima', 'Arequipa', 'Cusco', 'Junín'])
-            migr = pick_migracion(lugar)
-        campos_inventados.add('Lugar')
-        campos_inventados.add('BecasSegunMigracion')
-        
+        'Lugar': Condicional(es_internacional, Eleccion(['Francia', 'España', 'Reino Unido', 'Estados Unidos']),
+                     Condicional(es_ecuatoriana, Eleccion(['Ecuador', 'Lima']),
+                         Eleccion(['Lima', 'Arequipa', 'Cusco', 'Junín']))),
+        'BecasSegunMigracion': Condicional(es_internacional, Constante('Migro'),
+                                   Condicional(es_ecuatoriana,
+                                       SegunColumna('Lugar', {'Ecuador': Constante('Migro')},
+                                                    defecto=Eleccion(migr_options)),
+                                       MIGRACION)),
         # Carrera según tipo de beca
-        if 'Arte' in nombre_beca:
-            carrera = random.choice(['Artes Plásticas', 'Música', 'Danza', 'Teatro'])
-        elif 'Maestro' in nombre_beca or 'Educación' in nombre_beca:
-            carrera = random.choice(['Educación Primaria', 'Educación Inicial', 'Educación Secundaria'])
-        elif 'Excelencia' in nombre_beca:
-            carrera = random.choice(['Ingeniería', 'Medicina', 'Derecho', 'Administración'])
-        else:
-            carrera = random.choice(['Varios', 'Ingeniería', 'Ciencias'])
-        campos_inventados.add('Carrera')
-        
-        institucion = pick_institucion()
-        campos_inventados.add('Institucion')
-        
-        genero = pick_gender()
-        campos_inventados.add('Genero')
-        
-        estrato = pick_estrato()
-        campos_inventados.add('EstratoSocieconomico')
-        
-        rows.append({
-            'NombreBeca': nombre_beca,
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': lugar,
-            'Categoria de becas': categoria,
-            'Anio_Convocatoria': anio,
-            'Genero': genero,
-            'EstratoSocieconomico': estrato,
-            'BecasSegunMigracion': migr
-        })
-
-print(f"  → Generados {len(rows) - rows_antes} registros de Becas Especiales")
+        'Carrera': Condicional(contiene('NombreBeca', 'Arte'), Eleccion(['Artes Plásticas', 'Música', 'Danza', 'Teatro']),
+                       Condicional(contiene('NombreBeca', 'Maestro', 'Educación'),
+                                   Eleccion(['Educación Primaria', 'Educación Inicial', 'Educación Secundaria']),
+                           Condicional(contiene('NombreBeca', 'Excelencia'),
+                                       Eleccion(['Ingeniería', 'Medicina', 'Derecho', 'Administración']),
+                               Eleccion(['Varios', 'Ingeniería', 'Ciencias'])))),
+        'TipoInstitucion': TIPO_INSTITUCION,
+        'Institucion': INSTITUCION,
+        'Categoria de becas': Constante('Especiales'),
+        'Anio_Convocatoria': Constante(2020),
+        'Genero': GENERO,
+        'EstratoSocieconomico': ESTRATO,
+    }, base=base, semilla=rng, columnas=COLUMNAS))
+    print(f"  → Generados {len(secciones[-1])} registros de Becas Especiales")
 
 # Crear DataFrame final
-print(f"\nTotal de registros generados: {len(rows)}")
-df_out = pd.DataFrame(rows, columns=[
-    'NombreBeca','Institucion','Carrera','Lugar','Categoria de becas',
-    'Anio_Convocatoria','Genero','EstratoSocieconomico','BecasSegunMigracion'
-])
+df_out = concatenar(secciones) if secciones else pd.DataFrame(columns=COLUMNAS)
+print(f"\nTotal de registros generados: {len(df_out)}")
 
 # Asegurar que Anio sea 2020
 df_out['Anio_Convocatoria'] = 2020
@@ -7,64 +7,56 @@ import requests
 import pdfplumber
 import pandas as pd
 import re
+import sys
 from io import BytesIO
+from pathlib import Path
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import descargar_con_cache
+from comun.paginas_pdf import recorrer_paginas
+from comun.palabras_clave import BuscadorPalabrasClave
+
 # URL del PDF
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/1984259/Memoria%20Anual%20del%20Pronabec%202020.pdf.pdf?v=1625074615"
 
 def download_pdf(url):
-    """Descarga el PDF desde la URL"""
+    """Descarga el PDF desde la URL (o lo toma de la caché local si no cambió)"""
     print(f"Descargando PDF desde: {url}")
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        pdf_file = descargar_con_cache(url, timeout=30)
         print("PDF descargado exitosamente")
-        return BytesIO(response.content)
+        return pdf_file
     except Exception as e:
         print(f"Error al descargar el PDF: {e}")
         return None
 
-def extract_text_from_pdf(pdf_file):
-    """Extrae texto de todas las páginas del PDF"""
-    print("Extrayendo texto del PDF...")
+def extract_text_and_tables_from_pdf(pdf_file):
+    """Extrae texto y tablas de todas las páginas abriendo el PDF una sola vez"""
+    print("Extrayendo texto y tablas del PDF...")
     all_text = []
-    try:
-        with pdfplumber.open(pdf_file) as pdf:
-            print(f"Total de páginas: {len(pdf.pages)}")
-            for i, page in enumerate(pdf.pages):
-                text = page.extract_text()
-                if text:
-                    all_text.append({
-                        'page': i + 1,
-                        'text': text
-                    })
-        print(f"Texto extraído de {len(all_text)} páginas")
-        return all_text
-    except Exception as e:
-        print(f"Error al extraer texto: {e}")
-        return []
-
-def extract_tables_from_pdf(pdf_file):
-    """Extrae todas las tablas del PDF"""
-    print("Extrayendo tablas del PDF...")
     all_tables = []
     try:
-        with pdfplumber.open(pdf_file) as pdf:
-            for i, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                if tables:
-                    for j, table in enumerate(tables):
-                        all_tables.append({
-                            'page': i + 1,
-                            'table_number': j + 1,
-                            'data': table
-                        })
+        for pagina in recorrer_paginas(pdf_file, usar_cache=True):
+            if pagina['pagina'] == 1:
+                print(f"Total de páginas: {pagina['total_paginas']}")
+            if pagina['texto']:
+                all_text.append({
+                    'page': pagina['pagina'],
+                    'text': pagina['texto']
+                })
+            for j, table in enumerate(pagina['tablas']):
+                all_tables.append({
+                    'page': pagina['pagina'],
+                    'table_number': j + 1,
+                    'data': table
+                })
+        print(f"Texto extraído de {len(all_text)} páginas")
         print(f"Se encontraron {len(all_tables)} tablas")
-        return all_tables
+        return all_text, all_tables
     except Exception as e:
-        print(f"Error al extraer tablas: {e}")
-        return []
+        print(f"Error al extraer contenido del PDF: {e}")
+        return [], []
 
 def parse_scholarship_data(tables, text_pages):
     """
@@ -107,14 +99,14 @@ def find_relevant_sections(text_pages):
         '2020', 'beneficiario'
     ]
     
+    buscador = BuscadorPalabrasClave({'relevante': relevant_keywords})
     relevant_sections = []
     
     for page_info in text_pages:
         page = page_info['page']
-        text = page_info['text'].lower()
         
-        # Contar palabras clave
-        keyword_count = sum(1 for keyword in relevant_keywords if keyword in text)
+        # Contar palabras clave distintas (una sola pasada por el texto)
+        keyword_count = len(buscador.palabras_en(page_info['text']))
         
         if keyword_count >= 3:  # Si tiene al menos 3 palabras clave
             relevant_sections.append({
@@ -154,14 +146,8 @@ def main():
         print("No se pudo descargar el PDF. Verifica la URL y tu conexión.")
         return
     
-    # Extraer texto
-    text_pages = extract_text_from_pdf(pdf_file)
-    
-    # Reiniciar el buffer para leer de nuevo
-    pdf_file.seek(0)
-    
-    # Extraer tablas
-    tables = extract_tables_from_pdf(pdf_file)
+    # Extraer texto y tablas en una sola pasada
+    text_pages, tables = extract_text_and_tables_from_pdf(pdf_file)
     
     # Guardar texto crudo para análisis
     if text_pages:
@@ -1,5 +1,13 @@
+import sys
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import random
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.generador_sintetico import (Columna, Condicional, Constante, Derivada,
+                                       Eleccion, SegunColumna, expandir,
+                                       generar_dataframe)
 
 def generar_dataset_ajustado_2021():
     """
@@ -56,187 +64,115 @@ def generar_dataset_ajustado_2021():
     generos = ['Masculino', 'Femenino']
     migracion_opciones = ['Migró', 'No Migró']
     
-    dataset_final = []
+    # Un solo generador para las tres secciones: el resultado es reproducible
+    rng = np.random.default_rng(2021)
+    
+    def reglas_migracion(pesos_lima, pesos_resto):
+        """Migración según el departamento de origen; si migró, probablemente fue a Lima"""
+        return {
+            'BecasSegunMigracion': SegunColumna(
+                'DepartamentoOrigen',
+                {'Lima': Eleccion(migracion_opciones, pesos_lima)},
+                defecto=Eleccion(migracion_opciones, pesos_resto)
+            ),
+            'Lugar': Condicional(lambda f: f['BecasSegunMigracion'] == 'Migró',
+                                 Constante('Lima'), Columna('DepartamentoOrigen')),
+        }
     
     print("\n🔄 Procesando Becarios por Región (Beca 18 - Pregrado)...")
     # Procesar becarios por región (excluyendo "Total")
-    for idx, row in df_region.iterrows():
-        if row['Departamento'] == 'Total':
-            continue
-        
-        departamento = row['Departamento']
-        cantidad_total = row['CantidadBecarios']
-        
-        # Distribuir entre géneros (basado en proporciones del dataset de género)
-        # 57% mujeres, 43% hombres (aproximado)
-        cantidad_mujeres = int(cantidad_total * 0.57)
-        cantidad_hombres = cantidad_total - cantidad_mujeres
-        
-        # Distribuir entre estratos (inventado - basado en criterios de Pronabec)
-        # 40% Pobre Extremo, 50% Pobre, 10% No Pobre
-        distribucion_estratos = {
-            'Pobre Extremo': int(cantidad_total * 0.40),
-            'Pobre': int(cantidad_total * 0.50),
-            'No Pobre': cantidad_total - int(cantidad_total * 0.40) - int(cantidad_total * 0.50)
-        }
-        
-        # Distribuir migración (inventado basado en lógica)
-        # Si es Lima, 80% no migró, 20% migró
-        # Si no es Lima, 60% migró, 40% no migró
-        if departamento == 'Lima':
-            prob_migro = 0.20
-        else:
-            prob_migro = 0.60
-        
-        cantidad_migro = int(cantidad_total * prob_migro)
-        cantidad_no_migro = cantidad_total - cantidad_migro
-        
-        # Crear registros individuales (agrupados para no tener miles de filas)
-        # Generamos registros representativos
-        num_registros = min(cantidad_total, 100)  # Máximo 100 registros por región
-        
-        for i in range(num_registros):
-            # Asignar valores de forma proporcional
-            genero = random.choices(generos, weights=[43, 57])[0]  # 43% H, 57% M
-            estrato = random.choices(estratos, weights=[40, 50, 10])[0]  # 40% PE, 50% P, 10% NP
-            
-            if departamento == 'Lima':
-                migracion = random.choices(migracion_opciones, weights=[20, 80])[0]
-                lugar = departamento  # Estudian en Lima
-            else:
-                migracion = random.choices(migracion_opciones, weights=[60, 40])[0]
-                # Si migró, probablemente fue a Lima
-                if migracion == 'Migró':
-                    lugar = 'Lima'
-                else:
-                    lugar = departamento
-            
-            carrera = random.choice(carreras_pregrado)
-            institucion = random.choice(instituciones_peru)
-            
-            dataset_final.append({
-                'NombreBeca': 'Beca 18',
-                'Institucion': institucion,
-                'Carrera': carrera,
-                'Lugar': lugar,
-                'CategoriaDeBecas': 'Pregrado',
-                'Anio_Convocatoria': 2021,
-                'Genero': genero,
-                'EstratoSocieconomico': estrato,
-                'BecasSegunMigracion': migracion,
-                'DepartamentoOrigen': departamento,
-                'CantidadRepresentada': cantidad_total // num_registros
-            })
-    
-    print(f"✓ Generados {len(dataset_final)} registros de Beca 18")
+    df_region = df_region[df_region['Departamento'] != 'Total']
+    
+    # Crear registros individuales (agrupados para no tener miles de filas)
+    # Generamos registros representativos: máximo 100 registros por región
+    num_registros = df_region['CantidadBecarios'].clip(upper=100)
+    base = expandir(pd.DataFrame({
+        'DepartamentoOrigen': df_region['Departamento'],
+        'CantidadRepresentada': df_region['CantidadBecarios'] // num_registros.clip(lower=1)
+    }), num_registros)
+    
+    # Género: 57% mujeres, 43% hombres (aproximado, según el dataset de género)
+    # Estratos (inventado - basado en criterios de Pronabec): 40% Pobre Extremo, 50% Pobre, 10% No Pobre
+    # Migración (inventado basado en lógica): Lima 20% migró; resto 60% migró
+    df_beca18 = generar_dataframe({
+        'NombreBeca': Constante('Beca 18'),
+        'Institucion': Eleccion(instituciones_peru),
+        'Carrera': Eleccion(carreras_pregrado),
+        **reglas_migracion([20, 80], [60, 40]),
+        'CategoriaDeBecas': Constante('Pregrado'),
+        'Anio_Convocatoria': Constante(2021),
+        'Genero': Eleccion(generos, [43, 57]),
+        'EstratoSocieconomico': Eleccion(estratos, [40, 50, 10]),
+    }, base=base, semilla=rng)
+    
+    print(f"✓ Generados {len(df_beca18)} registros de Beca 18")
     
     print("\n🔄 Procesando Créditos Educativos...")
     # Procesar créditos educativos por región
-    for idx, row in df_creditos.iterrows():
-        if row['Departamento'] == 'Total':
-            continue
-        
-        departamento = row['Departamento']
-        nombre_beca = row['NombreBeca']
-        cantidad = row['CantidadCreditos']
-        
+    df_creditos = df_creditos[df_creditos['Departamento'] != 'Total']
+    
+    # Generar registros representativos: máximo 50 por crédito y región
+    num_registros = df_creditos['CantidadCreditos'].clip(upper=50)
+    base = expandir(pd.DataFrame({
+        'NombreBeca': df_creditos['NombreBeca'],
+        'DepartamentoOrigen': df_creditos['Departamento'],
         # Determinar categoría según tipo de crédito
-        if 'Talento' in nombre_beca:
-            categoria = 'Especiales'
-        else:
-            categoria = 'Pregrado'
-        
-        # Generar registros representativos
-        num_registros = min(cantidad, 50)
-        
-        for i in range(num_registros):
-            genero = random.choices(generos, weights=[42, 58])[0]
-            estrato = random.choices(estratos, weights=[35, 55, 10])[0]
-            
-            if departamento == 'Lima':
-                migracion = random.choices(migracion_opciones, weights=[15, 85])[0]
-                lugar = departamento
-            else:
-                migracion = random.choices(migracion_opciones, weights=[50, 50])[0]
-                lugar = 'Lima' if migracion == 'Migró' else departamento
-            
-            carrera = random.choice(carreras_pregrado)
-            institucion = random.choice(instituciones_peru)
-            
-            dataset_final.append({
-                'NombreBeca': nombre_beca,
-                'Institucion': institucion,
-                'Carrera': carrera,
-                'Lugar': lugar,
-                'CategoriaDeBecas': categoria,
-                'Anio_Convocatoria': 2021,
-                'Genero': genero,
-                'EstratoSocieconomico': estrato,
-                'BecasSegunMigracion': migracion,
-                'DepartamentoOrigen': departamento,
-                'CantidadRepresentada': cantidad // num_registros
-            })
-    
-    print(f"✓ Agregados créditos educativos. Total: {len(dataset_final)} registros")
+        'CategoriaDeBecas': np.where(df_creditos['NombreBeca'].str.contains('Talento'), 'Especiales', 'Pregrado'),
+        'CantidadRepresentada': df_creditos['CantidadCreditos'] // num_registros.clip(lower=1)
+    }), num_registros)
+    
+    df_creditos_final = generar_dataframe({
+        'Institucion': Eleccion(instituciones_peru),
+        'Carrera': Eleccion(carreras_pregrado),
+        **reglas_migracion([15, 85], [50, 50]),
+        'Anio_Convocatoria': Constante(2021),
+        'Genero': Eleccion(generos, [42, 58]),
+        'EstratoSocieconomico': Eleccion(estratos, [35, 55, 10]),
+    }, base=base, semilla=rng)
+    
+    print(f"✓ Agregados créditos educativos. Total: {len(df_beca18) + len(df_creditos_final)} registros")
     
     print("\n🔄 Procesando Becarios en el Extranjero (Posgrado)...")
-    # Procesar becarios en el extranjero
-    for idx, row in df_pais.iterrows():
-        if row['Pais'] == 'Total':
-            continue
-        
-        pais = row['Pais']
-        cantidad = row['CantidadBecarios']
-        
+    # Procesar becarios en el extranjero: un registro por becario
+    df_pais = df_pais[df_pais['Pais'] != 'Total']
+    base = expandir(df_pais[['Pais']].rename(columns={'Pais': 'Lugar'}), df_pais['CantidadBecarios'])
+    
+    # Carreras de posgrado
+    carreras_posgrado = [
+        'MBA', 'Ingeniería de Software', 'Ciencias de Datos', 'Biotecnología',
+        'Gestión Pública', 'Economía Aplicada', 'Física', 'Química',
+        'Ciencias Políticas', 'Relaciones Internacionales', 'Finanzas',
+        'Ingeniería Biomédica', 'Neurociencias', 'Salud Pública'
+    ]
+    
+    df_extranjero = generar_dataframe({
+        'NombreBeca': Constante('Beca Posgrado en el Extranjero'),
+        # Institución del país correspondiente (o genérica si no está en la lista)
+        'Institucion': SegunColumna(
+            'Lugar',
+            {pais: Eleccion(lista) for pais, lista in instituciones_extranjero.items()},
+            defecto=Derivada(lambda f, rng: 'Universidad de ' + f['Lugar'].astype(str))
+        ),
+        'Carrera': Eleccion(carreras_posgrado),
         # Becas en el extranjero son principalmente posgrado
-        categorias_posgrado = ['Posgrado Maestria', 'Posgrado Doctorado']
-        
-        for i in range(cantidad):
-            genero = random.choice(generos)
-            # Becas al extranjero suelen ser para no pobres o pobres (no extremos)
-            estrato = random.choices(['Pobre', 'No Pobre'], weights=[60, 40])[0]
-            
-            # Determinar departamento de origen (proporcional a población)
-            dept_origen = random.choices(
-                ['Lima', 'Arequipa', 'Cusco', 'La Libertad', 'Piura', 'Junín', 'Callao'],
-                weights=[35, 12, 10, 8, 8, 7, 5]
-            )[0]
-            
-            categoria = random.choice(categorias_posgrado)
-            
-            # Carreras de posgrado
-            carreras_posgrado = [
-                'MBA', 'Ingeniería de Software', 'Ciencias de Datos', 'Biotecnología',
-                'Gestión Pública', 'Economía Aplicada', 'Física', 'Química',
-                'Ciencias Políticas', 'Relaciones Internacionales', 'Finanzas',
-                'Ingeniería Biomédica', 'Neurociencias', 'Salud Pública'
-            ]
-            carrera = random.choice(carreras_posgrado)
-            
-            # Seleccionar institución del país correspondiente
-            if pais in instituciones_extranjero:
-                institucion = random.choice(instituciones_extranjero[pais])
-            else:
-                institucion = f"Universidad de {pais}"
-            
-            dataset_final.append({
-                'NombreBeca': 'Beca Posgrado en el Extranjero',
-                'Institucion': institucion,
-                'Carrera': carrera,
-                'Lugar': pais,
-                'CategoriaDeBecas': categoria,
-                'Anio_Convocatoria': 2021,
-                'Genero': genero,
-                'EstratoSocieconomico': estrato,
-                'BecasSegunMigracion': 'Migró',  # Todos migraron al extranjero
-                'DepartamentoOrigen': dept_origen,
-                'CantidadRepresentada': 1
-            })
-    
-    print(f"✓ Agregados becarios extranjero. Total: {len(dataset_final)} registros")
+        'CategoriaDeBecas': Eleccion(['Posgrado Maestria', 'Posgrado Doctorado']),
+        'Anio_Convocatoria': Constante(2021),
+        'Genero': Eleccion(generos),
+        # Becas al extranjero suelen ser para no pobres o pobres (no extremos)
+        'EstratoSocieconomico': Eleccion(['Pobre', 'No Pobre'], [60, 40]),
+        'BecasSegunMigracion': Constante('Migró'),  # Todos migraron al extranjero
+        # Determinar departamento de origen (proporcional a población)
+        'DepartamentoOrigen': Eleccion(
+            ['Lima', 'Arequipa', 'Cusco', 'La Libertad', 'Piura', 'Junín', 'Callao'],
+            [35, 12, 10, 8, 8, 7, 5]
+        ),
+        'CantidadRepresentada': Constante(1),
+    }, base=base, semilla=rng)
     
     # Crear DataFrame final
-    df_final = pd.DataFrame(dataset_final)
+    df_final = pd.concat([df_beca18, df_creditos_final, df_extranjero], ignore_index=True)
+    
+    print(f"✓ Agregados becarios extranjero. Total: {len(df_final)} registros")
     
     # Reordenar columnas según el formato solicitado
     columnas_finales = [
@@ -3,8 +3,13 @@ import pdfplumber
 import pandas as pd
 import re
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.paginas_pdf import recorrer_paginas
+from comun.palabras_clave import BuscadorPalabrasClave
+
 # URL del PDF
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/3157095/Memoria%20Anual%20del%20Pronabec%202021.pdf?v=1653683954"
 PDF_FILE = "Memoria_Pronabec_2021.pdf"
@@ -23,49 +28,36 @@ def download_pdf(url, filename):
         print(f"Error descargando PDF: {e}")
         return False
 
-def extract_text_from_pdf(pdf_path):
-    """Extrae todo el texto del PDF"""
-    print(f"Extrayendo texto del PDF...")
+def extract_text_and_tables_from_pdf(pdf_path):
+    """Extrae texto y tablas del PDF en una sola pasada por las páginas"""
+    print(f"Extrayendo texto y tablas del PDF...")
     text_content = []
+    all_tables = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for i, page in enumerate(pdf.pages):
-                print(f"Procesando página {i+1}/{len(pdf.pages)}")
-                text = page.extract_text()
-                if text:
-                    text_content.append({
-                        'page': i+1,
-                        'text': text
+        for pagina in recorrer_paginas(pdf_path, usar_cache=True):
+            i = pagina['pagina']
+            print(f"Procesando página {i}/{pagina['total_paginas']}")
+            if pagina['texto']:
+                text_content.append({
+                    'page': i,
+                    'text': pagina['texto']
+                })
+            tables = pagina['tablas']
+            if tables:
+                print(f"Encontradas {len(tables)} tabla(s) en página {i}")
+                for j, table in enumerate(tables):
+                    all_tables.append({
+                        'page': i,
+                        'table_number': j+1,
+                        'data': table
                     })
         print(f"Texto extraído de {len(text_content)} páginas")
-        return text_content
-    except Exception as e:
-        print(f"Error extrayendo texto: {e}")
-        return []
-
-def extract_tables_from_pdf(pdf_path):
-    """Extrae todas las tablas del PDF"""
-    print(f"Extrayendo tablas del PDF...")
-    all_tables = []
-    
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for i, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                if tables:
-                    print(f"Encontradas {len(tables)} tabla(s) en página {i+1}")
-                    for j, table in enumerate(tables):
-                        all_tables.append({
-                            'page': i+1,
-                            'table_number': j+1,
-                            'data': table
-                        })
         print(f"Total de tablas extraídas: {len(all_tables)}")
-        return all_tables
+        return text_content, all_tables
     except Exception as e:
-        print(f"Error extrayendo tablas: {e}")
-        return []
+        print(f"Error extrayendo contenido del PDF: {e}")
+        return [], []
 
 def search_keywords_in_text(text_content):
     """Busca palabras clave relacionadas con las becas en el texto"""
@@ -75,20 +67,25 @@ def search_keywords_in_text(text_content):
         'socioeconómico', 'pobre', 'confirmados', '2021'
     ]
     
+    # Una sola pasada por página para todas las palabras clave
+    buscador = BuscadorPalabrasClave({keyword: [keyword] for keyword in keywords})
+    
     results = []
     for page_data in text_content:
-        text = page_data['text'].lower()
+        # Líneas (contexto) donde aparece cada palabra clave
+        lines_by_keyword = {}
+        for _, line, categories in buscador.clasificar_lineas(page_data['text']):
+            for keyword in categories:
+                lines_by_keyword.setdefault(keyword, []).append(line.strip())
+        
+        # Mantener el orden de la lista de palabras clave
         for keyword in keywords:
-            if keyword in text:
-                # Extraer contexto alrededor de la palabra clave
-                lines = page_data['text'].split('\n')
-                for line in lines:
-                    if keyword in line.lower():
-                        results.append({
-                            'page': page_data['page'],
-                            'keyword': keyword,
-                            'context': line.strip()
-                        })
+            for context in lines_by_keyword.get(keyword, []):
+                results.append({
+                    'page': page_data['page'],
+                    'keyword': keyword,
+                    'context': context
+                })
     
     return results
 
@@ -189,15 +186,12 @@ def main():
     else:
         print(f"PDF ya existe: {PDF_FILE}")
     
-    # Extraer texto
-    text_content = extract_text_from_pdf(PDF_FILE)
+    # Extraer texto y tablas (una sola apertura del PDF)
+    text_content, all_tables = extract_text_and_tables_from_pdf(PDF_FILE)
     if not text_content:
         print("No se pudo extraer texto del PDF.")
         return
     
-    # Extraer tablas
-    all_tables = extract_tables_from_pdf(PDF_FILE)
-    
     # Buscar palabras clave
     print("\nBuscando palabras clave relevantes...")
     keywords_results = search_keywords_in_text(text_content)
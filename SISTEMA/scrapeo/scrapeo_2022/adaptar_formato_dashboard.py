@@ -1,14 +1,18 @@
 """
 Script para adaptar los datos extraídos al formato exacto del dashboard
 Genera datos sintéticos para campos no disponibles en el PDF
+(reglas declarativas de comun.generador_sintetico)
 """
 
-import pandas as pd
-import random
+import sys
 from pathlib import Path
 
-# Configurar semilla para reproducibilidad
-random.seed(2022)
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.generador_sintetico import (Constante, Derivada, Eleccion, SegunColumna,
+                                       expandir, generar_dataframe)
 
 print("="*80)
 print("ADAPTANDO DATOS AL FORMATO DEL DASHBOARD")
@@ -116,8 +120,17 @@ distribucion_estrato = [0.25, 0.50, 0.25]  # Mayormente pobres en becas sociales
 migracion = ['Migró', 'No Migró']
 distribucion_migracion = [0.35, 0.65]  # Más personas estudian en su región
 
-# ----- LISTA PARA ALMACENAR DATOS -----
-datos_dashboard = []
+# ----- COLUMNAS DEL DASHBOARD -----
+COLUMNAS = [
+    'NombreBeca', 'Institucion', 'Carrera', 'Lugar', 'CategoriaDeBecas',
+    'Anio_Convocatoria', 'Genero', 'EstratoSocieconomico', 'BecasSegunMigracion'
+]
+
+# Un solo generador para becas nacionales e internacionales
+rng = np.random.default_rng(2022)
+
+GENERO = Eleccion(generos, distribucion_genero)
+ESTRATO = Eleccion(estratos, distribucion_estrato)
 
 print("\n1. Procesando becas nacionales (Pregrado y Especiales)...")
 
@@ -130,113 +143,68 @@ departamentos_peru = df_dept[
 # Agregar Lima y Callao por separado
 departamentos_peru.extend(['Lima', 'Callao'])
 
-for idx, row in df_becas.iterrows():
-    nombre_beca = row['NombreBeca']
-    tipo_beca = row['TipoBeca']
-    
-    # Mapear categoría
-    if tipo_beca == 'Posgrado':
-        # Verificar si es maestría o doctorado en el nombre
-        if 'doctorado' in nombre_beca.lower() or 'doctor' in nombre_beca.lower():
-            categoria = 'Posgrado Doctorado'
-        else:
-            categoria = 'Posgrado Maestria'
-    else:
-        categoria = mapeo_categorias.get(tipo_beca, 'Pregrado')
-    
-    # Determinar número de becarios (usar promedio si no hay datos específicos)
-    try:
-        num_becarios = int(row['CantidadBecasOtorgadas2022']) if pd.notna(row['CantidadBecasOtorgadas2022']) else random.randint(10, 50)
-    except:
-        num_becarios = random.randint(10, 50)
-    
-    # Generar registros individuales
-    for _ in range(num_becarios):
-        # Seleccionar institución según tipo
-        if tipo_beca == 'Posgrado':
-            institucion = random.choice(instituciones_posgrado_nacional)
-            carrera = random.choice(carreras_posgrado)
-        else:
-            institucion = random.choice(instituciones_pregrado)
-            carrera = random.choice(carreras_pregrado)
-        
-        # Seleccionar lugar (departamento del Perú)
-        lugar = random.choice(departamentos_peru)
-        
-        # Generar otros campos
-        genero = random.choices(generos, weights=distribucion_genero)[0]
-        estrato = random.choices(estratos, weights=distribucion_estrato)[0]
-        becas_migracion = random.choices(migracion, weights=distribucion_migracion)[0]
-        
-        datos_dashboard.append({
-            'NombreBeca': nombre_beca,
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': lugar,
-            'CategoriaDeBecas': categoria,
-            'Anio_Convocatoria': 2022,
-            'Genero': genero,
-            'EstratoSocieconomico': estrato,
-            'BecasSegunMigracion': becas_migracion
-        })
-
-print(f"   ✓ Generados {len(datos_dashboard)} registros de becas nacionales")
+# Mapear categoría; en Posgrado se verifica si es maestría o doctorado en el nombre
+es_doctorado = df_becas['NombreBeca'].str.lower().str.contains('doctor')
+categorias = df_becas['TipoBeca'].map(mapeo_categorias).fillna('Pregrado')
+categorias = categorias.mask((df_becas['TipoBeca'] == 'Posgrado') & es_doctorado, 'Posgrado Doctorado')
+
+# Determinar número de becarios (usar un valor aleatorio si no hay datos específicos)
+num_becarios = pd.to_numeric(df_becas['CantidadBecasOtorgadas2022'], errors='coerce')
+num_becarios = num_becarios.fillna(pd.Series(rng.integers(10, 51, size=len(df_becas)), index=df_becas.index))
+
+# Generar registros individuales
+base = expandir(pd.DataFrame({
+    'NombreBeca': df_becas['NombreBeca'],
+    'TipoBeca': df_becas['TipoBeca'],
+    'CategoriaDeBecas': categorias,
+}), num_becarios.astype(int))
+
+df_nacional = generar_dataframe({
+    # Seleccionar institución y carrera según tipo
+    'Institucion': SegunColumna('TipoBeca', {'Posgrado': Eleccion(instituciones_posgrado_nacional)},
+                                defecto=Eleccion(instituciones_pregrado)),
+    'Carrera': SegunColumna('TipoBeca', {'Posgrado': Eleccion(carreras_posgrado)},
+                            defecto=Eleccion(carreras_pregrado)),
+    # Seleccionar lugar (departamento del Perú)
+    'Lugar': Eleccion(departamentos_peru),
+    'Anio_Convocatoria': Constante(2022),
+    'Genero': GENERO,
+    'EstratoSocieconomico': ESTRATO,
+    'BecasSegunMigracion': Eleccion(migracion, distribucion_migracion),
+}, base=base, semilla=rng, columnas=COLUMNAS)
+
+print(f"   ✓ Generados {len(df_nacional)} registros de becas nacionales")
 
 print("\n2. Procesando becas internacionales...")
 
-# Becas internacionales
-becas_internacional_count = 0
-for idx, row in df_internacional.iterrows():
-    pais = row['PaisEstudios']
-    
-    # Excluir la fila de total
-    if pais == 'Total':
-        continue
-    
-    maestrias = int(row['Maestria']) if pd.notna(row['Maestria']) else 0
-    doctorados = int(row['Doctorado']) if pd.notna(row['Doctorado']) else 0
-    
-    # Generar registros para maestrías
-    for _ in range(maestrias):
-        # Institución ficticia del país
-        institucion = f"Universidad de {pais}"
-        carrera = random.choice(carreras_posgrado)
-        
-        datos_dashboard.append({
-            'NombreBeca': 'Beca Generación del Bicentenario',
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': pais,
-            'CategoriaDeBecas': 'Posgrado Maestria',
-            'Anio_Convocatoria': 2022,
-            'Genero': random.choices(generos, weights=distribucion_genero)[0],
-            'EstratoSocieconomico': random.choices(estratos, weights=distribucion_estrato)[0],
-            'BecasSegunMigracion': 'Migró'  # Internacional siempre migra
-        })
-        becas_internacional_count += 1
-    
-    # Generar registros para doctorados
-    for _ in range(doctorados):
-        institucion = f"Universidad de {pais}"
-        carrera = random.choice([c for c in carreras_posgrado if 'Doctorado' in c])
-        
-        datos_dashboard.append({
-            'NombreBeca': 'Beca Generación del Bicentenario',
-            'Institucion': institucion,
-            'Carrera': carrera,
-            'Lugar': pais,
-            'CategoriaDeBecas': 'Posgrado Doctorado',
-            'Anio_Convocatoria': 2022,
-            'Genero': random.choices(generos, weights=distribucion_genero)[0],
-            'EstratoSocieconomico': random.choices(estratos, weights=distribucion_estrato)[0],
-            'BecasSegunMigracion': 'Migró'  # Internacional siempre migra
-        })
-        becas_internacional_count += 1
+# Becas internacionales (excluyendo la fila de total): un registro por maestría y por doctorado
+df_internacional = df_internacional[df_internacional['PaisEstudios'] != 'Total']
+paises = df_internacional[['PaisEstudios']].rename(columns={'PaisEstudios': 'Lugar'})
+base = pd.concat([
+    expandir(paises.assign(CategoriaDeBecas='Posgrado Maestria'),
+             df_internacional['Maestria'].fillna(0).astype(int)),
+    expandir(paises.assign(CategoriaDeBecas='Posgrado Doctorado'),
+             df_internacional['Doctorado'].fillna(0).astype(int)),
+], ignore_index=True)
+
+df_int_final = generar_dataframe({
+    'NombreBeca': Constante('Beca Generación del Bicentenario'),
+    # Institución ficticia del país
+    'Institucion': Derivada(lambda f, rng: 'Universidad de ' + f['Lugar'].astype(str)),
+    'Carrera': SegunColumna('CategoriaDeBecas',
+                            {'Posgrado Doctorado': Eleccion([c for c in carreras_posgrado if 'Doctorado' in c])},
+                            defecto=Eleccion(carreras_posgrado)),
+    'Anio_Convocatoria': Constante(2022),
+    'Genero': GENERO,
+    'EstratoSocieconomico': ESTRATO,
+    'BecasSegunMigracion': Constante('Migró'),  # Internacional siempre migra
+}, base=base, semilla=rng, columnas=COLUMNAS)
+becas_internacional_count = len(df_int_final)
 
 print(f"   ✓ Generados {becas_internacional_count} registros de becas internacionales")
 
 # Crear DataFrame final
-df_final = pd.DataFrame(datos_dashboard)
+df_final = pd.concat([df_nacional, df_int_final], ignore_index=True)
 
 print("\n" + "="*80)
 print("DATASET FINAL GENERADO")
@@ -3,20 +3,25 @@ import pdfplumber
 import pandas as pd
 import re
 import io
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import descargar_con_cache
+from comun.palabras_clave import BuscadorPalabrasClave
+
 # URL del PDF
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/4498935/Memoria%20Anual%20del%20Pronabec%202022.pdf?v=1683306322"
 
 def descargar_pdf(url):
-    """Descarga el PDF desde la URL"""
+    """Descarga el PDF desde la URL (o lo toma de la caché local si no cambió)"""
     print("Descargando PDF...")
-    response = requests.get(url)
-    if response.status_code == 200:
-        print("PDF descargado exitosamente")
-        return io.BytesIO(response.content)
-    else:
-        raise Exception(f"Error al descargar el PDF: {response.status_code}")
+    try:
+        pdf_bytes = descargar_con_cache(url)
+    except requests.HTTPError as e:
+        raise Exception(f"Error al descargar el PDF: {e.response.status_code}")
+    print("PDF descargado exitosamente")
+    return pdf_bytes
 
 def extraer_tablas_del_pdf(pdf_bytes):
     """Extrae todas las tablas del PDF"""
@@ -91,6 +96,7 @@ def identificar_datasets_relevantes(datasets):
         'universidad', 'instituto', '2022'
     ]
     
+    buscador = BuscadorPalabrasClave({'relevante': keywords_relevantes})
     datasets_relevantes = []
     
     for dataset in datasets:
@@ -101,7 +107,7 @@ def identificar_datasets_relevantes(datasets):
         columnas_str = ' '.join([str(col).lower() for col in df.columns])
         contenido = contexto + ' ' + columnas_str
         
-        score = sum(1 for keyword in keywords_relevantes if keyword in contenido)
+        score = len(buscador.palabras_en(contenido))
         
         if score > 2:  # Al menos 3 palabras clave coincidentes
             dataset['relevancia_score'] = score
@@ -1,11 +1,17 @@
 """
 Script para generar dataset de becarios en formato Excel
 con campos específicos según los requisitos del usuario
+(reglas declarativas de comun.generador_sintetico)
 """
 
-import pandas as pd
-import random
+import sys
+from pathlib import Path
+
 import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.generador_sintetico import Constante, Eleccion, SegunColumna, generar_dataframe
 
 # Definir los datos base desde los CSVs existentes
 carreras_disponibles = [
@@ -74,87 +80,51 @@ estratos_socioeconomicos = ["Pobre", "Pobre Extremo", "No pobre"]
 
 estados_migracion = ["Migro", "No Migro", "No aplica"]
 
-# Años de convocatoria disponibles
+# Años de convocatoria disponibles (mayormente 2023, algunos 2024-2025)
 anios = [2023, 2024, 2025]
+proporcion_anios = [0.75, 0.15, 0.10]
 
 # Generar dataset de 200 becarios
 num_becarios = 200
-random.seed(42)  # Para reproducibilidad
+semilla = 42  # Para reproducibilidad
 
-datos = []
+# Bloques de años en proporción fija: 150 de 2023, 30 de 2024 y el resto de 2025
+cantidades_anio = [int(num_becarios * p) for p in proporcion_anios[:-1]]
+cantidades_anio.append(num_becarios - sum(cantidades_anio))
+base = pd.DataFrame({'Anio_Convocatoria': np.repeat(anios, cantidades_anio)})
 
-for i in range(num_becarios):
+especificacion = {
     # Seleccionar tipo de beca
-    nombre_beca = random.choice(nombres_becas)
-    
+    'NombreBeca': Eleccion(nombres_becas),
     # Asignar categoría según tipo de beca
-    if nombre_beca == "Beca 18":
-        categoria = "Pregrado"
-    elif nombre_beca == "Beca Tec":
-        categoria = random.choice(["Pregrado", "Especiales"])
-    elif nombre_beca == "Beca Permanencia":
-        categoria = "Pregrado"
-    elif nombre_beca == "Beca Inclusión":
-        categoria = "Especiales"
-    elif nombre_beca == "Beca Vocación de Maestro":
-        categoria = random.choice(["Pregrado", "Posgrado Maestria"])
-    else:
-        categoria = random.choice(categorias_becas)
-    
-    # Asignar año (mayormente 2023, algunos 2024-2025)
-    if i < 150:
-        anio = 2023
-    elif i < 180:
-        anio = 2024
-    else:
-        anio = 2025
-    
-    # Seleccionar institución
-    institucion = random.choice(instituciones_disponibles)
-    
-    # Seleccionar carrera
-    carrera = random.choice(carreras_disponibles)
-    
-    # Seleccionar lugar (mayormente Perú, algunos internacional)
-    if random.random() < 0.95:  # 95% en Perú
-        lugar = random.choice(departamentos_peru)
-        # Si estudia en su región, menor probabilidad de migración
-        migracion = random.choices(
-            estados_migracion, 
-            weights=[30, 70, 0], 
-            k=1
-        )[0]
-    else:  # 5% internacional
-        lugar = random.choice(paises_internacionales)
-        migracion = "No aplica"  # Para estudios internacionales
-    
-    # Género
-    genero = random.choice(generos)
-    
+    'CategoriaDeBecas': SegunColumna('NombreBeca', {
+        'Beca 18': Constante('Pregrado'),
+        'Beca Tec': Eleccion(['Pregrado', 'Especiales']),
+        'Beca Permanencia': Constante('Pregrado'),
+        'Beca Inclusión': Constante('Especiales'),
+        'Beca Vocación de Maestro': Eleccion(['Pregrado', 'Posgrado Maestria']),
+    }, defecto=Eleccion(categorias_becas)),
+    'Institucion': Eleccion(instituciones_disponibles),
+    'Carrera': Eleccion(carreras_disponibles),
+    # Lugar: 95% en Perú, 5% internacional (columna auxiliar EnPeru)
+    'EnPeru': Eleccion([True, False], [0.95, 0.05]),
+    'Lugar': SegunColumna('EnPeru', {True: Eleccion(departamentos_peru)},
+                          defecto=Eleccion(paises_internacionales)),
+    # Si estudia en Perú: 30% migra; para estudios internacionales "No aplica"
+    'BecasSegunMigracion': SegunColumna('EnPeru', {True: Eleccion(estados_migracion, [30, 70, 0])},
+                                        defecto=Constante('No aplica')),
+    'Genero': Eleccion(generos),
     # Estrato socioeconómico (mayormente pobres según los datos)
-    estrato = random.choices(
-        estratos_socioeconomicos,
-        weights=[60, 30, 10],  # Mayoría pobre
-        k=1
-    )[0]
-    
-    # Crear registro
-    registro = {
-        "NombreBeca": nombre_beca,
-        "Institucion": institucion,
-        "Carrera": carrera,
-        "Lugar": lugar,
-        "CategoriaDeBecas": categoria,
-        "Anio_Convocatoria": anio,
-        "Genero": genero,
-        "EstratoSocieconomico": estrato,
-        "BecasSegunMigracion": migracion
-    }
-    
-    datos.append(registro)
+    'EstratoSocieconomico': Eleccion(estratos_socioeconomicos, [60, 30, 10]),
+}
+
+columnas = [
+    "NombreBeca", "Institucion", "Carrera", "Lugar", "CategoriaDeBecas",
+    "Anio_Convocatoria", "Genero", "EstratoSocieconomico", "BecasSegunMigracion"
+]
 
 # Crear DataFrame
-df = pd.DataFrame(datos)
+df = generar_dataframe(especificacion, base=base, semilla=semilla, columnas=columnas)
 
 # Ordenar por año y nombre de beca
 df = df.sort_values(["Anio_Convocatoria", "NombreBeca"], ascending=[True, True])
@@ -7,20 +7,25 @@ import requests
 import PyPDF2
 import pandas as pd
 import re
+import sys
 from io import BytesIO
+from pathlib import Path
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import descargar_con_cache
+from comun.palabras_clave import BuscadorPalabrasClave
+
 # URL del PDF
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/6317263/5552590-memoria-anual-del-pronabec-2023.pdf?v=1715184066"
 
 def descargar_pdf(url):
-    """Descarga el PDF desde la URL"""
+    """Descarga el PDF desde la URL (o lo toma de la caché local si no cambió)"""
     print(f"Descargando PDF desde: {url}")
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        pdf_file = descargar_con_cache(url, timeout=30)
         print("✓ PDF descargado exitosamente")
-        return BytesIO(response.content)
+        return pdf_file
     except Exception as e:
         print(f"✗ Error al descargar el PDF: {e}")
         return None
@@ -73,6 +78,8 @@ def buscar_tablas_datos(texto_paginas):
         'estrato': ['pobreza', 'pobre extremo', 'estrato', 'socioeconómico'],
         'migracion': ['migración', 'migró', 'traslado', 'movilidad']
     }
+    # Todas las categorías se evalúan en una sola pasada por página
+    buscador = BuscadorPalabrasClave(keywords)
     
     for pagina_info in texto_paginas:
         pagina_num = pagina_info['pagina']
@@ -81,13 +88,10 @@ def buscar_tablas_datos(texto_paginas):
         
         # Buscar menciones de Beca 18 y datos del 2023
         if 'beca 18' in texto_lower and '2023' in texto:
-            # Buscar números y datos relevantes
-            lineas = texto.split('\n')
-            for i, linea in enumerate(lineas):
-                linea_lower = linea.lower()
-                
+            # Clasificar cada línea con coincidencias según las categorías
+            for i, linea, categorias in buscador.clasificar_lineas(texto):
                 # Buscar datos de departamentos
-                if any(kw in linea_lower for kw in keywords['departamento']):
+                if 'departamento' in categorias:
                     # Buscar números en las líneas cercanas
                     numeros = re.findall(r'\b\d{1,5}\b', linea)
                     if numeros:
@@ -98,35 +102,35 @@ def buscar_tablas_datos(texto_paginas):
                         })
                 
                 # Buscar datos de instituciones
-                if any(kw in linea_lower for kw in keywords['institucion']):
+                if 'institucion' in categorias:
                     datos_encontrados['becarios_por_institucion'].append({
                         'pagina': pagina_num,
                         'texto': linea.strip()
                     })
                 
                 # Buscar datos de carreras
-                if any(kw in linea_lower for kw in keywords['carrera']):
+                if 'carrera' in categorias:
                     datos_encontrados['becarios_por_carrera'].append({
                         'pagina': pagina_num,
                         'texto': linea.strip()
                     })
                 
                 # Buscar datos de modalidades
-                if any(kw in linea_lower for kw in keywords['modalidad']):
+                if 'modalidad' in categorias:
                     datos_encontrados['becarios_por_modalidad'].append({
                         'pagina': pagina_num,
                         'texto': linea.strip()
                     })
                 
                 # Buscar datos de estrato socioeconómico
-                if any(kw in linea_lower for kw in keywords['estrato']):
+                if 'estrato' in categorias:
                     datos_encontrados['becarios_por_estrato'].append({
                         'pagina': pagina_num,
                         'texto': linea.strip()
                     })
                 
                 # Buscar datos de migración
-                if any(kw in linea_lower for kw in keywords['migracion']):
+                if 'migracion' in categorias:
                     datos_encontrados['becarios_migracion'].append({
                         'pagina': pagina_num,
                         'texto': linea.strip()
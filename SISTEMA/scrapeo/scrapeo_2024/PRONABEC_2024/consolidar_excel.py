@@ -6,9 +6,11 @@ con múltiples hojas organizadas
 import pandas as pd
 import json
 from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+ANCHO_MAXIMO_COLUMNA = 50
 
 def cargar_todos_los_datos():
     """Carga todos los datasets generados"""
@@ -92,68 +94,72 @@ def crear_hoja_resumen(stats_df, top5_df):
     
     return resumen_df
 
-def aplicar_formato_excel(archivo_excel):
-    """Aplica formato profesional al archivo Excel"""
-    print("\n🎨 Aplicando formato profesional...")
+# Estilos del libro: se registran una vez y las hojas los referencian
+COLOR_HEADER = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+COLOR_ALT_ROW = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+BORDE = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+ESTILO_ENCABEZADO = 'encabezado_pronabec'
+
+
+def registrar_estilos(wb):
+    """Registra en el libro el estilo con nombre de los encabezados (una sola vez)"""
+    if ESTILO_ENCABEZADO not in wb.named_styles:
+        wb.add_named_style(NamedStyle(
+            name=ESTILO_ENCABEZADO,
+            fill=COLOR_HEADER,
+            font=Font(bold=True, color="FFFFFF", size=11),
+            alignment=Alignment(horizontal='center', vertical='center'),
+            border=BORDE
+        ))
+
+
+def anchos_columnas(df):
+    """Ancho de cada columna según el texto más largo (encabezado o valor), calculado sobre el DataFrame"""
+    anchos = []
+    for i, columna in enumerate(df.columns):
+        serie = df.iloc[:, i]
+        # Los valores vacíos o nulos no cuentan, igual que las celdas vacías
+        valores = serie[serie.notna()]
+        valores = valores[valores.astype(bool)]
+        largo = valores.astype(str).str.len().max() if len(valores) else 0
+        largo = max(largo, len(str(columna)) if columna else 0)
+        anchos.append(min(int(largo) + 2, ANCHO_MAXIMO_COLUMNA))
+    return anchos
+
+
+def aplicar_formato_hoja(ws, df):
+    """
+    Da formato a una hoja recién escrita por pandas, sin recorrer sus celdas:
+    estilo con nombre en los encabezados, bordes y filas alternas con formato
+    condicional sobre el rango de datos, anchos desde el DataFrame y primera
+    fila congelada.
+    """
+    registrar_estilos(ws.parent)
     
-    try:
-        wb = load_workbook(archivo_excel)
-        
-        # Colores
-        color_header = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        color_alt_row = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-        font_header = Font(bold=True, color="FFFFFF", size=11)
-        font_normal = Font(size=10)
-        
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Aplicar formato a cada hoja
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            
-            # Ajustar ancho de columnas
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                
-                for cell in column:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Formatear encabezados (primera fila)
-            for cell in ws[1]:
-                cell.fill = color_header
-                cell.font = font_header
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = border
-            
-            # Formatear filas alternas
-            for idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                for cell in row:
-                    cell.font = font_normal
-                    cell.border = border
-                    if idx % 2 == 0:
-                        cell.fill = color_alt_row
-            
-            # Congelar primera fila
-            ws.freeze_panes = ws['A2']
-        
-        wb.save(archivo_excel)
-        print("  ✓ Formato aplicado exitosamente")
-        
-    except Exception as e:
-        print(f"  ⚠ Error aplicando formato: {e}")
+    for letra_col, ancho in zip(map(get_column_letter, range(1, len(df.columns) + 1)), anchos_columnas(df)):
+        ws.column_dimensions[letra_col].width = ancho
+    
+    for cell in ws[1]:
+        cell.style = ESTILO_ENCABEZADO
+    
+    if len(df) and len(df.columns):
+        rango = f"A2:{get_column_letter(len(df.columns))}{len(df) + 1}"
+        ws.conditional_formatting.add(rango, FormulaRule(formula=['TRUE'], border=BORDE))
+        ws.conditional_formatting.add(rango, FormulaRule(formula=['MOD(ROW(),2)=0'], fill=COLOR_ALT_ROW))
+    
+    # Congelar primera fila
+    ws.freeze_panes = 'A2'
+
+
+def escribir_hoja(writer, df, sheet_name):
+    """Escribe df en la hoja y le aplica el formato en la misma pasada"""
+    df.to_excel(writer, sheet_name=sheet_name, index=False)
+    aplicar_formato_hoja(writer.sheets[sheet_name], df)
 
 def crear_hoja_metadata():
     """Crea una hoja con metadata del proyecto"""
@@ -275,37 +281,37 @@ def main():
             
             # Hoja 1: Resumen Ejecutivo (Estadísticas)
             if 'Estadisticas' in datos and not datos['Estadisticas'].empty:
-                datos['Estadisticas'].to_excel(writer, sheet_name='01_Resumen', index=False)
+                escribir_hoja(writer, datos['Estadisticas'], '01_Resumen')
                 print(f"  ✓ Hoja 01: Resumen Ejecutivo")
             
             # Hoja 2: Top 5 Departamentos
             if 'Top5_Departamentos' in datos and not datos['Top5_Departamentos'].empty:
-                datos['Top5_Departamentos'].to_excel(writer, sheet_name='02_Top5_Departamentos', index=False)
+                escribir_hoja(writer, datos['Top5_Departamentos'], '02_Top5_Departamentos')
                 print(f"  ✓ Hoja 02: Top 5 Departamentos")
             
             # Hoja 3: Departamentos (Principal)
             if 'Departamentos' in datos and not datos['Departamentos'].empty:
-                datos['Departamentos'].to_excel(writer, sheet_name='03_Departamentos', index=False)
+                escribir_hoja(writer, datos['Departamentos'], '03_Departamentos')
                 print(f"  ✓ Hoja 03: Becarios por Departamento ({len(datos['Departamentos'])} registros)")
             
             # Hoja 4: Becas por Tipo
             if 'Becas' in datos and not datos['Becas'].empty:
-                datos['Becas'].to_excel(writer, sheet_name='04_Tipos_de_Becas', index=False)
+                escribir_hoja(writer, datos['Becas'], '04_Tipos_de_Becas')
                 print(f"  ✓ Hoja 04: Tipos de Becas ({len(datos['Becas'])} registros)")
             
             # Hoja 5: Instituciones
             if 'Instituciones' in datos and not datos['Instituciones'].empty:
-                datos['Instituciones'].to_excel(writer, sheet_name='05_Instituciones', index=False)
+                escribir_hoja(writer, datos['Instituciones'], '05_Instituciones')
                 print(f"  ✓ Hoja 05: Instituciones ({len(datos['Instituciones'])} registros)")
             
             # Hoja 6: Datos Completos (Consolidado)
             if 'Datos_Completos' in datos and not datos['Datos_Completos'].empty:
-                datos['Datos_Completos'].to_excel(writer, sheet_name='06_Datos_Completos', index=False)
+                escribir_hoja(writer, datos['Datos_Completos'], '06_Datos_Completos')
                 print(f"  ✓ Hoja 06: Datos Completos ({len(datos['Datos_Completos'])} registros)")
             
             # Hoja 7: Departamentos Detallado
             if 'Dept_Detallado' in datos and not datos['Dept_Detallado'].empty:
-                datos['Dept_Detallado'].to_excel(writer, sheet_name='07_Dept_Detallado', index=False)
+                escribir_hoja(writer, datos['Dept_Detallado'], '07_Dept_Detallado')
                 print(f"  ✓ Hoja 07: Departamentos Detallado ({len(datos['Dept_Detallado'])} registros)")
             
             # Hoja 8: Becas Detallado
@@ -315,32 +321,29 @@ def main():
                 if len(df_becas_det.columns) > 20:
                     # Seleccionar las primeras 20 columnas más relevantes
                     df_becas_det = df_becas_det.iloc[:, :20]
-                df_becas_det.to_excel(writer, sheet_name='08_Becas_Detallado', index=False)
+                escribir_hoja(writer, df_becas_det, '08_Becas_Detallado')
                 print(f"  ✓ Hoja 08: Becas Detallado ({len(df_becas_det)} registros)")
             
             # Hoja 9: Instituciones Detallado
             if 'Inst_Detallado' in datos and not datos['Inst_Detallado'].empty:
-                datos['Inst_Detallado'].to_excel(writer, sheet_name='09_Inst_Detallado', index=False)
+                escribir_hoja(writer, datos['Inst_Detallado'], '09_Inst_Detallado')
                 print(f"  ✓ Hoja 09: Instituciones Detallado ({len(datos['Inst_Detallado'])} registros)")
             
             # Hoja 10: Información Adicional
             if 'Info_Adicional' in datos and not datos['Info_Adicional'].empty:
-                datos['Info_Adicional'].to_excel(writer, sheet_name='10_Info_Adicional', index=False)
+                escribir_hoja(writer, datos['Info_Adicional'], '10_Info_Adicional')
                 print(f"  ✓ Hoja 10: Información Adicional ({len(datos['Info_Adicional'])} registros)")
             
             # Hoja 11: Diccionario de Datos
             dict_datos = crear_hoja_diccionario_datos()
-            dict_datos.to_excel(writer, sheet_name='11_Diccionario_Datos', index=False)
+            escribir_hoja(writer, dict_datos, '11_Diccionario_Datos')
             print(f"  ✓ Hoja 11: Diccionario de Datos")
             
             # Hoja 12: Metadata del Proyecto
             metadata = crear_hoja_metadata()
-            metadata.to_excel(writer, sheet_name='12_Metadata', index=False)
+            escribir_hoja(writer, metadata, '12_Metadata')
             print(f"  ✓ Hoja 12: Metadata del Proyecto")
         
-        # Aplicar formato profesional
-        aplicar_formato_excel(archivo_final)
-        
         # Resumen final
         print("\n" + "="*70)
         print(f"  ✅ ARCHIVO CONSOLIDADO CREADO EXITOSAMENTE")
@@ -3,14 +3,22 @@ Script para extraer datos PRONABEC 2024 con campos específicos del dataset
 Incluye campos reales e inventados basados en el contexto disponible
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import json
-import random
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.generador_sintetico import (Columna, Condicional, Constante, Eleccion,
+                                       Mapeo, SegunColumna, expandir, generar_dataframe)
+
 # Configuración de datos inventados
 GENEROS = ['Masculino', 'Femenino']
 ESTRATOS = ['Pobre', 'Pobre Extremo', 'No pobre']
+# 45% Pobre; del 55% restante, 75% Pobre Extremo y 25% No pobre
+PROB_ESTRATOS = [0.45, 0.55 * 0.75, 0.55 * 0.25]
 MIGRACION = ['Migró', 'No Migró']
 CATEGORIAS_BECAS = [
     'Pregrado',
@@ -19,6 +27,14 @@ CATEGORIAS_BECAS = [
     'Especiales'
 ]
 
+# Departamentos del Perú (un Lugar fuera de esta lista es un país extranjero)
+DEPARTAMENTOS_PERU = [
+    'Lima', 'Ica', 'Callao', 'Cusco', 'Piura', 'Arequipa', 'La Libertad',
+    'Lambayeque', 'Junín', 'Puno', 'Cajamarca', 'Ancash', 'Apurímac',
+    'Huánuco', 'San Martín', 'Ayacucho', 'Loreto', 'Ucayali', 'Amazonas',
+    'Huancavelica', 'Pasco', 'Tumbes', 'Tacna', 'Madre de Dios', 'Moquegua'
+]
+
 # Países para becas internacionales (principalmente Posgrado)
 PAISES_BECAS = [
     'Estados Unidos',
@@ -110,20 +126,16 @@ def cargar_datos_base():
     
     return datos
 
-def generar_datos_completos(datos_base):
-    """Genera dataset completo con todos los campos solicitados"""
+def generar_datos_completos(datos_base, semilla=None):
+    """
+    Genera dataset completo con todos los campos solicitados.
+    
+    Los campos inventados se describen como reglas de
+    comun.generador_sintetico, que las sortea por bloques con NumPy, con
+    las mismas probabilidades y el mismo conteo de datos inventados.
+    """
     print("\n🔄 Generando dataset con campos específicos...")
     
-    registros = []
-    datos_inventados = {
-        'Carrera': 0,
-        'Institucion': 0,
-        'Genero': 0,
-        'EstratoSocioeconomico': 0,
-        'BecasSegunMigracion': 0,
-        'CategoriaDeBecas': 0
-    }
-    
     # Obtener becas y departamentos
     df_becas = datos_base.get('becas', pd.DataFrame())
     df_dept = datos_base['departamentos']
@@ -136,90 +148,77 @@ def generar_datos_completos(datos_base):
         'Especiales': 'Especiales'
     }
     
-    # Generar registros por departamento
-    for idx, row in df_dept.iterrows():
-        departamento = row['Departamento']
-        cantidad = int(row['CantidadBecarios'])
-        
-        # Generar registros individuales para cada becario
-        for i in range(cantidad):
-            
-            # Determinar tipo de beca (basado en datos reales si existen)
-            if not df_becas.empty and random.random() > 0.3:
-                tipo_beca_real = random.choice(df_becas['TipoBeca'].tolist())
-                nombre_beca = df_becas[df_becas['TipoBeca'] == tipo_beca_real]['NombreBeca'].iloc[0]
-                categoria_beca = tipo_beca_map.get(tipo_beca_real, 'Pregrado')
-                beca_inventada = False
-            else:
-                nombre_beca = random.choice(['Beca 18', 'Beca Permanencia', 'Beca Vocación'])
-                categoria_beca = random.choice(CATEGORIAS_BECAS)
-                beca_inventada = False  # Nombre está en el documento
-                datos_inventados['CategoriaDeBecas'] += 1
-            
-            # Determinar Lugar (puede ser departamento de Perú o país extranjero)
-            # Becas de Posgrado tienen mayor probabilidad de ser en el extranjero
-            if 'Posgrado' in categoria_beca and random.random() < 0.25:  # 25% de posgrado en el extranjero
-                lugar = random.choice(PAISES_BECAS)
-                datos_inventados['Lugar'] = datos_inventados.get('Lugar', 0) + 1
-            else:
-                lugar = departamento  # Usar departamento del Perú
-            
-            # Institución (algunas reales, otras inventadas)
-            if not df_inst.empty and random.random() > 0.7:
-                institucion = random.choice(df_inst['Institucion'].tolist())
-            else:
-                institucion = random.choice(INSTITUCIONES_PERU)
-                datos_inventados['Institucion'] += 1
-            
-            # Carrera (siempre inventada - no hay en el PDF)
-            carrera = random.choice(CARRERAS_COMUNES)
-            datos_inventados['Carrera'] += 1
-            
-            # Género (siempre inventado - no hay en el PDF)
-            genero = random.choice(GENEROS)
-            datos_inventados['Genero'] += 1
-            
-            # Estrato socioeconómico (siempre inventado - no hay en el PDF)
-            # Distribución más realista: más pobres que no pobres
-            if random.random() < 0.45:
-                estrato = 'Pobre'
-            elif random.random() < 0.75:
-                estrato = 'Pobre Extremo'
-            else:
-                estrato = 'No pobre'
-            datos_inventados['EstratoSocioeconomico'] += 1
-            
-            # Migración (siempre inventado - no hay en el PDF)
-            # Si es de Lima, menos probable que migre
-            # Si estudia en el extranjero, definitivamente migró
-            if lugar not in ['Lima', 'Ica', 'Callao', 'Cusco', 'Piura', 'Arequipa', 'La Libertad', 
-                            'Lambayeque', 'Junín', 'Puno', 'Cajamarca', 'Ancash', 'Apurímac', 
-                            'Huánuco', 'San Martín', 'Ayacucho', 'Loreto', 'Ucayali', 'Amazonas',
-                            'Huancavelica', 'Pasco', 'Tumbes', 'Tacna', 'Madre de Dios', 'Moquegua']:
-                # Estudia en el extranjero
-                migracion = 'Migró'
-            elif departamento == 'Lima':
-                migracion = 'No Migró' if random.random() < 0.8 else 'Migró'
-            else:
-                migracion = 'Migró' if random.random() < 0.4 else 'No Migró'
-            datos_inventados['BecasSegunMigracion'] += 1
-            
-            # Crear registro
-            registro = {
-                'NombreBeca': nombre_beca,
-                'Institucion': institucion,
-                'Carrera': carrera,
-                'Lugar': lugar,  # Cambiado de Departamento a Lugar
-                'CategoriaDeBecas': categoria_beca,
-                'Anio_Convocatoria': 2024,
-                'Genero': genero,
-                'EstratoSocioeconomico': estrato,
-                'BecasSegunMigracion': migracion
-            }
-            
-            registros.append(registro)
+    # Un registro por becario: cada departamento se repite según su cantidad
+    base = expandir(df_dept[['Departamento']], df_dept['CantidadBecarios'].astype(int))
+    
+    # Tipo de beca (basado en datos reales si existen; 30% inventado)
+    nombres_inventados = ['Beca 18', 'Beca Permanencia', 'Beca Vocación']
+    if not df_becas.empty:
+        tipos = df_becas['TipoBeca'].tolist()
+        primer_nombre = df_becas.drop_duplicates('TipoBeca').set_index('TipoBeca')['NombreBeca'].to_dict()
+        tipo_real = Eleccion(tipos)
+        usar_beca_real = Eleccion([True, False], [0.7, 0.3])
+    else:
+        primer_nombre = {}
+        tipo_real = usar_beca_real = Constante(False)
+    
+    # Institución (algunas reales, otras inventadas)
+    instituciones_reales = df_inst['Institucion'].tolist() if not df_inst.empty else []
+    if instituciones_reales:
+        usar_inst_real = Eleccion([True, False], [0.3, 0.7])
+        inst_real = Eleccion(instituciones_reales)
+    else:
+        usar_inst_real = inst_real = Constante(False)
+    
+    especificacion = {
+        # Columnas auxiliares: de qué fuente sale cada campo
+        'TipoBecaReal': tipo_real,
+        'UsaBecaReal': usar_beca_real,
+        'UsaInstitucionReal': usar_inst_real,
+        'NombreBeca': SegunColumna('UsaBecaReal', {True: Mapeo('TipoBecaReal', primer_nombre)},
+                                   defecto=Eleccion(nombres_inventados)),
+        'CategoriaDeBecas': SegunColumna('UsaBecaReal', {True: Mapeo('TipoBecaReal', tipo_beca_map, 'Pregrado')},
+                                         defecto=Eleccion(CATEGORIAS_BECAS)),
+        # Becas de Posgrado tienen mayor probabilidad de ser en el extranjero (25%)
+        'EnExtranjero': Condicional(lambda f: f['CategoriaDeBecas'].astype(str).str.contains('Posgrado'),
+                                    Eleccion([True, False], [0.25, 0.75]), Constante(False)),
+        # Lugar: departamento de Perú o país extranjero
+        'Lugar': SegunColumna('EnExtranjero', {True: Eleccion(PAISES_BECAS)},
+                              defecto=Columna('Departamento')),
+        'Institucion': SegunColumna('UsaInstitucionReal', {True: inst_real},
+                                    defecto=Eleccion(INSTITUCIONES_PERU)),
+        # Carrera, género y estrato (siempre inventados - no hay en el PDF)
+        'Carrera': Eleccion(CARRERAS_COMUNES),
+        'Anio_Convocatoria': Constante(2024),
+        'Genero': Eleccion(GENEROS),
+        # Misma distribución que antes: 45% Pobre, luego 75% del resto Pobre Extremo
+        'EstratoSocioeconomico': Eleccion(ESTRATOS, PROB_ESTRATOS),
+        # Migración: si estudia en el extranjero, definitivamente migró; de Lima es menos probable
+        'BecasSegunMigracion': Condicional(
+            lambda f: ~f['Lugar'].isin(DEPARTAMENTOS_PERU),
+            Constante('Migró'),
+            SegunColumna('Departamento', {'Lima': Eleccion(MIGRACION, [0.2, 0.8])},
+                         defecto=Eleccion(MIGRACION, [0.4, 0.6]))
+        ),
+    }
+    
+    df = generar_dataframe(especificacion, base=base, semilla=semilla)
+    n = len(df)
+    df_final = df[['NombreBeca', 'Institucion', 'Carrera',
+                   'Lugar',  # Cambiado de Departamento a Lugar
+                   'CategoriaDeBecas', 'Anio_Convocatoria', 'Genero',
+                   'EstratoSocioeconomico', 'BecasSegunMigracion']].copy()
     
-    df_final = pd.DataFrame(registros)
+    datos_inventados = {
+        'Carrera': n,
+        'Institucion': int((~df['UsaInstitucionReal']).sum()),
+        'Genero': n,
+        'EstratoSocioeconomico': n,
+        'BecasSegunMigracion': n,
+        'CategoriaDeBecas': int((~df['UsaBecaReal']).sum())
+    }
+    if df['EnExtranjero'].any():
+        datos_inventados['Lugar'] = int(df['EnExtranjero'].sum())
     
     return df_final, datos_inventados
 
@@ -414,14 +413,8 @@ def main():
                 'Valor': [
                     len(df_final),
                     df_final['Lugar'].nunique(),
-                    len(df_final[df_final['Lugar'].isin(['Lima', 'Ica', 'Callao', 'Cusco', 'Piura', 'Arequipa', 'La Libertad', 
-                            'Lambayeque', 'Junín', 'Puno', 'Cajamarca', 'Ancash', 'Apurímac', 
-                            'Huánuco', 'San Martín', 'Ayacucho', 'Loreto', 'Ucayali', 'Amazonas',
-                            'Huancavelica', 'Pasco', 'Tumbes', 'Tacna', 'Madre de Dios', 'Moquegua'])]),
-                    len(df_final[~df_final['Lugar'].isin(['Lima', 'Ica', 'Callao', 'Cusco', 'Piura', 'Arequipa', 'La Libertad', 
-                            'Lambayeque', 'Junín', 'Puno', 'Cajamarca', 'Ancash', 'Apurímac', 
-                            'Huánuco', 'San Martín', 'Ayacucho', 'Loreto', 'Ucayali', 'Amazonas',
-                            'Huancavelica', 'Pasco', 'Tumbes', 'Tacna', 'Madre de Dios', 'Moquegua'])]),
+                    int(df_final['Lugar'].isin(DEPARTAMENTOS_PERU).sum()),
+                    int((~df_final['Lugar'].isin(DEPARTAMENTOS_PERU)).sum()),
                     df_final['Institucion'].nunique(),
                     df_final['Carrera'].nunique(),
                     df_final['CategoriaDeBecas'].nunique(),
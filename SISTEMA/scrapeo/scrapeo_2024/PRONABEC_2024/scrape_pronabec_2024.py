@@ -7,51 +7,72 @@ import requests
 import pdfplumber
 import pandas as pd
 import re
+import sys
+import argparse
+import os
 from io import BytesIO
+from pathlib import Path
 from typing import List, Dict
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.cache_descargas import obtener_pdf
+from comun.paginas_pdf import indice_relevancia, recorrer_paginas
+
 # URL del PDF
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/8154351/6826853-memoria-anual-2024%282%29.pdf?v=1752678425"
 
-def descargar_pdf(url: str) -> BytesIO:
-    """Descarga el PDF desde la URL"""
+# Términos del índice de relevancia (el año es obligatorio para ser candidata)
+ANIO = '2024'
+PALABRAS_CLAVE = ['beca', 'becario', 'departamento', 'institución', 'carrera', 'modalidad', 'estrato', 'migración']
+
+def seleccionar_paginas_candidatas(pdf_path: Path, usar_cache: bool = True) -> List[int]:
+    """Primera pasada barata: solo las páginas que mencionan el año pueden aportar tablas de 2024"""
+    indice = indice_relevancia(pdf_path, [ANIO] + PALABRAS_CLAVE, usar_cache=usar_cache)
+    candidatas = [p for p, encontrados in indice.items() if ANIO in encontrados]
+    omitidas = len(indice) - len(candidatas)
+    print(f"Índice de relevancia: {len(candidatas)} páginas candidatas, {omitidas} omitidas de {len(indice)}")
+    for p in candidatas:
+        claves = sorted(indice[p] - {ANIO})
+        print(f"  Página {p}: {', '.join(claves) if claves else 'sin palabras clave'}")
+    return candidatas
+
+def descargar_pdf(url: str) -> Path:
+    """Descarga el PDF desde la URL (o lo toma de la caché local si no cambió)"""
     print(f"Descargando PDF desde: {url}")
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
+    pdf_path = obtener_pdf(url, timeout=30)
     print("PDF descargado exitosamente")
-    return BytesIO(response.content)
+    return pdf_path
 
-def extraer_tablas_pdf(pdf_buffer: BytesIO) -> List[pd.DataFrame]:
-    """Extrae todas las tablas del PDF"""
+def extraer_tablas_pdf(pdf_path: Path, workers: int = 1, usar_cache: bool = True) -> List[pd.DataFrame]:
+    """Extrae las tablas de las páginas candidatas del PDF (en paralelo si workers > 1)"""
     tablas = []
     
-    with pdfplumber.open(pdf_buffer) as pdf:
-        print(f"Total de páginas: {len(pdf.pages)}")
+    # La detección de tablas solo corre en páginas que mencionan 2024
+    candidatas = seleccionar_paginas_candidatas(pdf_path, usar_cache=usar_cache)
+    
+    for pagina in recorrer_paginas(pdf_path, workers=workers, usar_cache=usar_cache, paginas=candidatas):
+        i = pagina['pagina'] - 1
+        print(f"Procesando página {i+1}/{pagina['total_paginas']}")
         
-        for i, page in enumerate(pdf.pages):
-            print(f"Procesando página {i+1}/{len(pdf.pages)}")
-            
-            # Extraer texto para buscar menciones de 2024
-            texto = page.extract_text()
-            
-            # Extraer tablas
-            tables = page.extract_tables()
-            
-            if tables:
-                for table in tables:
-                    if table and len(table) > 1:  # Verificar que tenga contenido
-                        # Convertir a DataFrame
+        # Texto para buscar menciones de 2024
+        texto = pagina['texto']
+        
+        # Tablas de la página
+        tables = pagina['tablas']
+        
+        if tables:
+            for table in tables:
+                if table and len(table) > 1:  # Verificar que tenga contenido
+                    # Verificar si contiene datos de 2024 (el texto de la página incluye las celdas de sus tablas)
+                    if '2024' in str(texto):
+                        # Solo las tablas relevantes se convierten a DataFrame
                         df = pd.DataFrame(table[1:], columns=table[0])
-                        
-                        # Verificar si contiene datos de 2024
-                        texto_tabla = df.to_string()
-                        if '2024' in texto_tabla or '2024' in str(texto):
-                            tablas.append({
-                                'pagina': i+1,
-                                'dataframe': df,
-                                'texto_contexto': texto[:500] if texto else ""
-                            })
-                            print(f"  ✓ Tabla encontrada con posible referencia a 2024")
+                        tablas.append({
+                            'pagina': i+1,
+                            'dataframe': df,
+                            'texto_contexto': texto[:500] if texto else ""
+                        })
+                        print(f"  ✓ Tabla encontrada con posible referencia a 2024")
     
     return tablas
 
@@ -121,29 +142,34 @@ def procesar_datos_becarios(tablas: List[Dict]) -> pd.DataFrame:
     else:
         return pd.DataFrame()
 
-def extraer_texto_completo(pdf_buffer: BytesIO) -> str:
+def extraer_texto_completo(pdf_path: Path, workers: int = 1, usar_cache: bool = True) -> str:
     """Extrae todo el texto del PDF para análisis adicional"""
     texto_completo = []
     
-    with pdfplumber.open(pdf_buffer) as pdf:
-        for page in pdf.pages:
-            texto = page.extract_text()
-            if texto:
-                texto_completo.append(texto)
+    for pagina in recorrer_paginas(pdf_path, tablas=False, workers=workers, usar_cache=usar_cache):
+        if pagina['texto']:
+            texto_completo.append(pagina['texto'])
     
     return "\n".join(texto_completo)
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Extrae datos de becarios de la Memoria Anual PRONABEC 2024")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos para extraer páginas en paralelo (1 = secuencial)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Ignorar la caché de páginas y volver a analizar todo el PDF")
+    args = parser.parse_args()
+    
     try:
         # Descargar PDF
-        pdf_buffer = descargar_pdf(PDF_URL)
+        pdf_path = descargar_pdf(PDF_URL)
         
         # Extraer tablas
         print("\n" + "="*50)
-        print("EXTRAYENDO TABLAS DEL PDF")
+        print(f"EXTRAYENDO TABLAS DEL PDF ({args.workers} proceso(s))")
         print("="*50)
-        tablas = extraer_tablas_pdf(pdf_buffer)
+        tablas = extraer_tablas_pdf(pdf_path, workers=args.workers, usar_cache=not args.sin_cache)
         print(f"\nTotal de tablas encontradas: {len(tablas)}")
         
         # Procesar datos
@@ -184,9 +210,7 @@ def main():
             print("\n⚠ No se encontraron tablas en el PDF")
             print("Extrayendo texto completo para análisis manual...")
             
-            # Reiniciar buffer
-            pdf_buffer.seek(0)
-            texto = extraer_texto_completo(pdf_buffer)
+            texto = extraer_texto_completo(pdf_path, workers=args.workers, usar_cache=not args.sin_cache)
             
             with open("pronabec_2024_texto_completo.txt", "w", encoding="utf-8") as f:
                 f.write(texto)
@@ -7,19 +7,27 @@ import requests
 import pdfplumber
 import pandas as pd
 import re
+import sys
+import argparse
+import os
 from io import BytesIO
+from pathlib import Path
 from typing import List, Dict, Tuple
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.cache_descargas import obtener_pdf
+from comun.paginas_pdf import indice_relevancia, recorrer_paginas
+from comun.palabras_clave import BuscadorPalabrasClave
+
 PDF_URL = "https://cdn.www.gob.pe/uploads/document/file/8154351/6826853-memoria-anual-2024%282%29.pdf?v=1752678425"
 
-def descargar_pdf(url: str) -> BytesIO:
-    """Descarga el PDF desde la URL"""
+def descargar_pdf(url: str) -> Path:
+    """Descarga el PDF desde la URL (o lo toma de la caché local si no cambió)"""
     print(f"📥 Descargando PDF desde: {url}")
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
+    pdf_path = obtener_pdf(url, timeout=30)
     print("✅ PDF descargado exitosamente")
-    return BytesIO(response.content)
+    return pdf_path
 
 def extraer_info_becas_por_tipo(texto: str, pagina: int) -> List[Dict]:
     """Extrae información sobre tipos de becas y sus cifras"""
@@ -130,8 +138,8 @@ def extraer_info_migracion(texto: str, pagina: int) -> List[Dict]:
     
     return datos
 
-def extraer_tablas_detalladas(pdf_buffer: BytesIO) -> Tuple[List[Dict], Dict]:
-    """Extrae todas las tablas y analiza el contenido del PDF"""
+def extraer_tablas_detalladas(pdf_path: Path, workers: int = 1, usar_cache: bool = True) -> Tuple[List[Dict], Dict]:
+    """Extrae todas las tablas y analiza el contenido del PDF (en paralelo si workers > 1)"""
     
     todas_tablas = []
     info_adicional = {
@@ -143,68 +151,67 @@ def extraer_tablas_detalladas(pdf_buffer: BytesIO) -> Tuple[List[Dict], Dict]:
         'carreras': []
     }
     
-    with pdfplumber.open(pdf_buffer) as pdf:
-        print(f"📄 Total de páginas: {len(pdf.pages)}")
+    # Primera pasada barata: las páginas sin "2024" no aportan texto ni tablas
+    indice = indice_relevancia(pdf_path, ['2024'], usar_cache=usar_cache)
+    candidatas = [p for p, encontrados in indice.items() if encontrados]
+    print(f"📄 Total de páginas: {len(indice)} ({len(candidatas)} candidatas, {len(indice) - len(candidatas)} omitidas)")
+    
+    for n, pagina in enumerate(recorrer_paginas(pdf_path, workers=workers, usar_cache=usar_cache,
+                                                paginas=candidatas), 1):
+        i = pagina['pagina']
+        if n % 10 == 0:
+            print(f"  Procesando página {n}/{len(candidatas)}...")
         
-        for i, page in enumerate(pdf.pages, 1):
-            if i % 10 == 0:
-                print(f"  Procesando página {i}/{len(pdf.pages)}...")
-            
-            # Extraer texto
-            texto = page.extract_text() or ""
-            
-            # Buscar información relevante solo si menciona 2024
-            if '2024' in texto:
-                # Extraer información de diferentes categorías
-                info_adicional['becas_por_tipo'].extend(extraer_info_becas_por_tipo(texto, i))
-                info_adicional['becas_por_departamento'].extend(extraer_info_departamentos(texto, i))
-                info_adicional['becas_por_estrato'].extend(extraer_info_estratos(texto, i))
-                info_adicional['becas_por_migracion'].extend(extraer_info_migracion(texto, i))
-            
-            # Extraer tablas
-            tables = page.extract_tables()
-            
-            if tables:
-                for j, table in enumerate(tables):
-                    if table and len(table) > 1:
-                        try:
-                            # Convertir a DataFrame
+        # Texto de la página
+        texto = pagina['texto']
+        
+        # Buscar información relevante solo si menciona 2024
+        if '2024' in texto:
+            # Extraer información de diferentes categorías
+            info_adicional['becas_por_tipo'].extend(extraer_info_becas_por_tipo(texto, i))
+            info_adicional['becas_por_departamento'].extend(extraer_info_departamentos(texto, i))
+            info_adicional['becas_por_estrato'].extend(extraer_info_estratos(texto, i))
+            info_adicional['becas_por_migracion'].extend(extraer_info_migracion(texto, i))
+        
+        # Tablas de la página
+        tables = pagina['tablas']
+        
+        if tables:
+            for j, table in enumerate(tables):
+                if table and len(table) > 1:
+                    try:
+                        # Verificar si contiene datos de 2024 (el texto de la página incluye las celdas de sus tablas)
+                        if '2024' in texto:
+                            # Solo las tablas relevantes se convierten a DataFrame
                             headers = table[0] if table[0] else [f"Col{k}" for k in range(len(table[1]))]
                             df = pd.DataFrame(table[1:], columns=headers)
-                            
-                            # Verificar si contiene datos de 2024
-                            texto_tabla = df.to_string()
-                            if '2024' in texto_tabla or '2024' in texto:
-                                todas_tablas.append({
-                                    'pagina': i,
-                                    'tabla_num': j+1,
-                                    'dataframe': df,
-                                    'tipo': identificar_tipo_tabla(df, texto)
-                                })
-                        except Exception as e:
-                            continue
+                            todas_tablas.append({
+                                'pagina': i,
+                                'tabla_num': j+1,
+                                'dataframe': df,
+                                'tipo': identificar_tipo_tabla(df, texto)
+                            })
+                    except Exception as e:
+                        continue
     
     return todas_tablas, info_adicional
 
+# Tipos de tabla según palabras en sus columnas (el orden define la prioridad)
+BUSCADOR_TIPO_TABLA = BuscadorPalabrasClave({
+    'departamentos': ['departamento', 'región', 'region'],
+    'carreras': ['carrera', 'especialidad', 'área'],
+    'instituciones': ['institución', 'institucion', 'universidad'],
+    'becas': ['beca', 'modalidad', 'tipo'],
+    'estratos': ['estrato', 'socioeconómico'],
+    'migracion': ['migración', 'migracion', 'movilidad'],
+})
+
 def identificar_tipo_tabla(df: pd.DataFrame, contexto: str) -> str:
     """Identifica el tipo de tabla basándose en sus columnas y contexto"""
     
     columnas_str = ' '.join([str(col).lower() for col in df.columns if col])
     
-    if any(palabra in columnas_str for palabra in ['departamento', 'región', 'region']):
-        return 'departamentos'
-    elif any(palabra in columnas_str for palabra in ['carrera', 'especialidad', 'área']):
-        return 'carreras'
-    elif any(palabra in columnas_str for palabra in ['institución', 'institucion', 'universidad']):
-        return 'instituciones'
-    elif any(palabra in columnas_str for palabra in ['beca', 'modalidad', 'tipo']):
-        return 'becas'
-    elif any(palabra in columnas_str for palabra in ['estrato', 'socioeconómico']):
-        return 'estratos'
-    elif any(palabra in columnas_str for palabra in ['migración', 'migracion', 'movilidad']):
-        return 'migracion'
-    else:
-        return 'otros'
+    return BUSCADOR_TIPO_TABLA.primera_categoria(columnas_str, default='otros')
 
 def procesar_tablas_por_tipo(tablas: List[Dict]) -> Dict[str, pd.DataFrame]:
     """Agrupa y procesa las tablas por tipo"""
@@ -364,17 +371,24 @@ def crear_dataset_completo(tablas_procesadas: Dict, info_adicional: Dict) -> pd.
 
 def main():
     """Función principal mejorada"""
+    parser = argparse.ArgumentParser(description="Web scraping mejorado de la Memoria Anual PRONABEC 2024")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos para extraer páginas en paralelo (1 = secuencial)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Ignorar la caché de páginas y volver a analizar todo el PDF")
+    args = parser.parse_args()
+    
     try:
         print("\n" + "="*70)
         print("  WEB SCRAPING PRONABEC 2024 - MEMORIA ANUAL")
         print("="*70 + "\n")
         
         # Descargar PDF
-        pdf_buffer = descargar_pdf(PDF_URL)
+        pdf_path = descargar_pdf(PDF_URL)
         
         # Extraer tablas y datos
-        print("\n📊 EXTRAYENDO DATOS DEL PDF...")
-        tablas, info_adicional = extraer_tablas_detalladas(pdf_buffer)
+        print(f"\n📊 EXTRAYENDO DATOS DEL PDF ({args.workers} proceso(s))...")
+        tablas, info_adicional = extraer_tablas_detalladas(pdf_path, workers=args.workers, usar_cache=not args.sin_cache)
         print(f"✅ {len(tablas)} tablas encontradas con datos de 2024")
         
         # Procesar tablas por tipo
@@ -0,0 +1,115 @@
+"""
+Agregaciones agrupadas sobre códigos categóricos
+Reemplaza los groupby().agg() con lambdas (', '.join(x.unique())) y el
+segundo groupby().size() que se alineaba por posición: el grupo y cada
+columna se convierten una vez a códigos enteros (los de la categórica, o
+pd.factorize) y los conteos, distintos, primeros y etiquetas unidas salen
+de operaciones de NumPy sobre esos códigos, todo en la misma pasada.
+
+    agregar_por(df, 'Carrera',
+                ProgramasBecas=('NombreBeca', 'unir'),
+                Instituciones=('Institucion', 'nunique'),
+                TotalBecas=('AnioBecariosConfirmados', 'count'))
+
+Operaciones (como en groupby, grupos ordenados y sin el grupo nulo):
+    size     filas del grupo (la columna se ignora, puede ser None)
+    count    valores no nulos
+    nunique  valores distintos no nulos
+    first    primer valor no nulo
+    unir     valores distintos no nulos en orden de aparición, unidos con ', '
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+OPERACIONES = ('size', 'count', 'nunique', 'first', 'unir')
+SEPARADOR = ', '
+
+
+def _codigos(serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Códigos enteros (-1 para nulos) y valores de cada código"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), serie.cat.categories
+    codigos, valores = pd.factorize(serie)
+    return codigos.astype(np.int64), pd.Index(valores)
+
+
+def _codigos_grupo(serie: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Códigos del grupo numerados en el orden de groupby (sort=True, observed=True)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy(dtype=np.int64)
+        observados = np.flatnonzero(np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories)))
+        remapeo = np.full(len(serie.cat.categories) + 1, -1, dtype=np.int64)
+        remapeo[observados] = np.arange(len(observados))
+        # El -1 de los nulos indexa la última posición, que queda en -1
+        return remapeo[codigos], serie.cat.categories[observados]
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), pd.Index(valores)
+
+
+def _contar(grupos: np.ndarray, n_grupos: int) -> pd.Series:
+    """Filas por código de grupo (las de grupo nulo, -1, no cuentan)"""
+    return pd.Series(np.bincount(grupos[grupos >= 0], minlength=n_grupos).astype(np.int64))
+
+
+def _pares_distintos(grupos: np.ndarray, codigos: np.ndarray, n_valores: int):
+    """(grupo, valor) distintos no nulos con la fila de su primera aparición"""
+    validos = (grupos >= 0) & (codigos >= 0)
+    n_valores = max(1, n_valores)
+    claves = grupos[validos] * n_valores + codigos[validos]
+    # duplicated() usa una tabla hash: una pasada, sin ordenar todas las filas
+    primeras = ~pd.Index(claves).duplicated()
+    claves_unicas = claves[primeras]
+    filas = np.flatnonzero(validos)[primeras]
+    return claves_unicas // n_valores, claves_unicas % n_valores, filas
+
+
+def _primeros(grupos: np.ndarray, serie: pd.Series, n_grupos: int) -> pd.Series:
+    """Primer valor no nulo de cada grupo (nulo si el grupo no tiene ninguno)"""
+    filas = np.flatnonzero(serie.notna().to_numpy() & (grupos >= 0))
+    primeras = np.full(n_grupos, len(grupos), dtype=np.int64)
+    np.minimum.at(primeras, grupos[filas], filas)
+    con_valor = np.flatnonzero(primeras < len(grupos))
+    valores = pd.Series(serie.iloc[primeras[con_valor]].to_numpy(), index=con_valor)
+    return valores.reindex(np.arange(n_grupos)).reset_index(drop=True)
+
+
+def _unir(grupos: np.ndarray, serie: pd.Series, n_grupos: int, separador: str) -> pd.Series:
+    codigos, valores = _codigos(serie)
+    grupo_par, valor_par, filas = _pares_distintos(grupos, codigos, len(valores))
+    orden = np.lexsort((filas, grupo_par))
+    etiquetas = valores.astype(str)[valor_par[orden]].tolist()
+    limites = np.searchsorted(grupo_par[orden], np.arange(n_grupos + 1))
+    return pd.Series([separador.join(etiquetas[inicio:fin]) for inicio, fin in zip(limites[:-1], limites[1:])],
+                     dtype=object)
+
+
+def agregar_por(df: pd.DataFrame, grupo: str, separador: str = SEPARADOR, **columnas) -> pd.DataFrame:
+    """
+    Una fila por valor de `grupo` con las columnas pedidas como
+    nombre=(columna, operación). Devuelve el grupo como primera columna.
+    """
+    for nombre, (_, operacion) in columnas.items():
+        if operacion not in OPERACIONES:
+            raise ValueError(f"Operación desconocida para {nombre}: {operacion} (opciones: {', '.join(OPERACIONES)})")
+
+    grupos, claves = _codigos_grupo(df[grupo])
+    n_grupos = len(claves)
+
+    resultado = {grupo: pd.Series(claves, dtype=df[grupo].dtype)}
+    for nombre, (columna, operacion) in columnas.items():
+        if operacion == 'size':
+            resultado[nombre] = _contar(grupos, n_grupos)
+        elif operacion == 'count':
+            resultado[nombre] = _contar(grupos[df[columna].notna().to_numpy()], n_grupos)
+        elif operacion == 'nunique':
+            codigos, valores = _codigos(df[columna])
+            grupo_par, _, _ = _pares_distintos(grupos, codigos, len(valores))
+            resultado[nombre] = _contar(grupo_par, n_grupos)
+        elif operacion == 'first':
+            resultado[nombre] = _primeros(grupos, df[columna], n_grupos)
+        else:
+            resultado[nombre] = _unir(grupos, df[columna], n_grupos, separador)
+    return pd.DataFrame(resultado)
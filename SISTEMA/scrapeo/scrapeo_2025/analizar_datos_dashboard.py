@@ -6,37 +6,52 @@ import pandas as pd
 import json
 from datetime import datetime
 
+from cubo_conteos import obtener_cubo
+from dataset_consolidado import cargar_consolidado
+
 def cargar_datos():
-    """Carga el dataset consolidado"""
+    """Carga el dataset consolidado (Parquet si está disponible, si no el CSV)"""
     print("Cargando datos consolidados...")
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    df = cargar_consolidado()
     print(f"✓ {len(df)} registros cargados\n")
     return df
 
-def generar_reporte_por_beca(df):
+def generar_reporte_por_beca(cubo):
     """Genera un reporte detallado por cada beca"""
     print("="*80)
     print("REPORTE DETALLADO POR TIPO DE BECA")
     print("="*80)
     
-    becas = df['NombreBeca'].unique()
+    becas = cubo.valores('NombreBeca')
+    totales = cubo.totales_por('NombreBeca')
+    vacio = pd.Series(dtype='int64')
+    
+    def distribucion(columna):
+        """value_counts de la columna para cada beca, o {} si la columna no existe"""
+        if columna not in cubo.dimensiones:
+            return {}
+        return cubo.conteos_por('NombreBeca', columna)
+    
+    instituciones = distribucion('Institucion')
+    departamentos = distribucion('Departamento')
+    modalidades = distribucion('Modalidad')
+    estratos = distribucion('Estrato_socioeconomico')
+    migracion = distribucion('Migracion')
     
     reportes = {}
     
     for beca in sorted(becas):
-        df_beca = df[df['NombreBeca'] == beca]
-        
         reporte = {
             'nombre': beca,
-            'total_registros': len(df_beca),
-            'instituciones_unicas': df_beca['Institucion'].nunique(),
-            'departamentos': df_beca['Departamento'].nunique(),
-            'modalidades': df_beca['Modalidad'].nunique() if 'Modalidad' in df_beca.columns else 0,
-            'instituciones_top_5': df_beca['Institucion'].value_counts().head(5).to_dict(),
-            'departamentos_top_5': df_beca['Departamento'].value_counts().head(5).to_dict(),
-            'modalidades_distribucion': df_beca['Modalidad'].value_counts().to_dict() if 'Modalidad' in df_beca.columns else {},
-            'estrato_distribucion': df_beca['Estrato_socioeconomico'].value_counts().to_dict() if 'Estrato_socioeconomico' in df_beca.columns else {},
-            'migracion_distribucion': df_beca['Migracion'].value_counts().to_dict() if 'Migracion' in df_beca.columns else {}
+            'total_registros': totales[beca],
+            'instituciones_unicas': len(instituciones.get(beca, vacio)),
+            'departamentos': len(departamentos.get(beca, vacio)),
+            'modalidades': len(modalidades.get(beca, vacio)) if 'Modalidad' in cubo.dimensiones else 0,
+            'instituciones_top_5': instituciones.get(beca, vacio).head(5).to_dict(),
+            'departamentos_top_5': departamentos.get(beca, vacio).head(5).to_dict(),
+            'modalidades_distribucion': modalidades.get(beca, vacio).to_dict() if 'Modalidad' in cubo.dimensiones else {},
+            'estrato_distribucion': estratos.get(beca, vacio).to_dict() if 'Estrato_socioeconomico' in cubo.dimensiones else {},
+            'migracion_distribucion': migracion.get(beca, vacio).to_dict() if 'Migracion' in cubo.dimensiones else {}
         }
         
         reportes[beca] = reporte
@@ -64,27 +79,30 @@ def generar_reporte_por_beca(df):
     print("\n✓ Reporte detallado guardado en: reporte_detallado_por_beca.json")
     return reportes
 
-def generar_reporte_por_departamento(df):
+def generar_reporte_por_departamento(cubo):
     """Genera un reporte por departamento"""
     print("\n" + "="*80)
     print("REPORTE POR DEPARTAMENTO")
     print("="*80)
     
-    departamentos = df['Departamento'].value_counts().head(20)
+    departamentos = cubo.conteos('Departamento').head(20)
     
     print(f"\nTop 20 Departamentos con más becas:")
     for i, (dept, count) in enumerate(departamentos.items(), 1):
         print(f"{i:2d}. {dept:30s} - {count:4d} becas")
     
     # Análisis por departamento
+    becas_por_dept = cubo.conteos_por('Departamento', 'NombreBeca')
+    instituciones_por_dept = cubo.distintos_por('Departamento', 'Institucion')
+    modalidades_por_dept = cubo.conteos_por('Departamento', 'Modalidad') if 'Modalidad' in cubo.dimensiones else {}
+    
     reporte_dept = {}
-    for dept in departamentos.index[:10]:  # Top 10
-        df_dept = df[df['Departamento'] == dept]
+    for dept, total in departamentos.head(10).items():  # Top 10
         reporte_dept[dept] = {
-            'total_becas': len(df_dept),
-            'becas_tipos': df_dept['NombreBeca'].value_counts().to_dict(),
-            'instituciones_unicas': df_dept['Institucion'].nunique(),
-            'modalidades': df_dept['Modalidad'].value_counts().to_dict() if 'Modalidad' in df_dept.columns else {}
+            'total_becas': int(total),
+            'becas_tipos': becas_por_dept[dept].to_dict() if dept in becas_por_dept else {},
+            'instituciones_unicas': instituciones_por_dept.get(dept, 0),
+            'modalidades': modalidades_por_dept[dept].to_dict() if dept in modalidades_por_dept else {}
         }
     
     with open('reporte_por_departamento.json', 'w', encoding='utf-8') as f:
@@ -92,80 +110,80 @@ def generar_reporte_por_departamento(df):
     
     print("\n✓ Reporte por departamento guardado en: reporte_por_departamento.json")
 
-def generar_reporte_migracion(df):
+def generar_reporte_migracion(cubo):
     """Analiza los patrones de migración"""
     print("\n" + "="*80)
     print("ANÁLISIS DE MIGRACIÓN")
     print("="*80)
     
-    if 'Migracion' not in df.columns:
+    if 'Migracion' not in cubo.dimensiones:
         print("No hay datos de migración disponibles")
         return
     
-    migracion = df['Migracion'].value_counts()
+    migracion = cubo.conteos('Migracion')
     
     print("\nDistribución de migración:")
     for tipo, count in migracion.items():
-        porcentaje = (count / len(df)) * 100
+        porcentaje = (count / cubo.total) * 100
         print(f"  • {tipo}: {count} ({porcentaje:.1f}%)")
     
     # Análisis por beca
     print("\nMigración por tipo de beca:")
-    for beca in df['NombreBeca'].unique()[:10]:  # Top 10 becas
-        df_beca = df[df['NombreBeca'] == beca]
-        if 'Migracion' in df_beca.columns:
-            mig = df_beca['Migracion'].value_counts()
-            print(f"\n  {beca}:")
-            for tipo, count in mig.items():
-                print(f"    - {tipo}: {count}")
+    migracion_por_beca = cubo.conteos_por('NombreBeca', 'Migracion')
+    for beca in cubo.valores('NombreBeca')[:10]:  # Top 10 becas
+        mig = migracion_por_beca.get(beca, pd.Series(dtype='int64'))
+        print(f"\n  {beca}:")
+        for tipo, count in mig.items():
+            print(f"    - {tipo}: {count}")
 
-def generar_reporte_estratos(df):
+def generar_reporte_estratos(cubo):
     """Analiza los estratos socioeconómicos"""
     print("\n" + "="*80)
     print("ANÁLISIS DE ESTRATOS SOCIOECONÓMICOS")
     print("="*80)
     
-    if 'Estrato_socioeconomico' not in df.columns:
+    if 'Estrato_socioeconomico' not in cubo.dimensiones:
         print("No hay datos de estrato socioeconómico disponibles")
         return
     
-    estratos = df['Estrato_socioeconomico'].value_counts()
+    estratos = cubo.conteos('Estrato_socioeconomico')
     
     print("\nDistribución de estratos socioeconómicos:")
-    total = len(df)
+    total = cubo.total
     for estrato, count in estratos.items():
         porcentaje = (count / total) * 100
         print(f"  • {estrato}: {count} ({porcentaje:.1f}%)")
     
     # Por beca
     print("\nEstrato socioeconómico por tipo de beca:")
+    totales = cubo.totales_por('NombreBeca')
+    estratos_por_beca = cubo.conteos_por('NombreBeca', 'Estrato_socioeconomico')
     for beca in ['Beca 18', 'Beca Tec', 'Beca Perú']:
-        df_beca = df[df['NombreBeca'] == beca]
-        if not df_beca.empty and 'Estrato_socioeconomico' in df_beca.columns:
+        if totales.get(beca, 0):
             print(f"\n  {beca}:")
-            estratos_beca = df_beca['Estrato_socioeconomico'].value_counts()
+            estratos_beca = estratos_por_beca.get(beca, pd.Series(dtype='int64'))
             for estrato, count in estratos_beca.items():
-                porcentaje = (count / len(df_beca)) * 100
+                porcentaje = (count / totales[beca]) * 100
                 print(f"    - {estrato}: {count} ({porcentaje:.1f}%)")
 
-def generar_reporte_modalidades(df):
+def generar_reporte_modalidades(cubo):
     """Analiza las modalidades de becas"""
     print("\n" + "="*80)
     print("ANÁLISIS DE MODALIDADES")
     print("="*80)
     
-    if 'Modalidad' not in df.columns:
+    if 'Modalidad' not in cubo.dimensiones:
         print("No hay datos de modalidad disponibles")
         return
     
-    modalidades = df['Modalidad'].value_counts().head(15)
+    modalidades = cubo.conteos('Modalidad').head(15)
     
     print("\nTop 15 Modalidades más comunes:")
     for i, (mod, count) in enumerate(modalidades.items(), 1):
-        porcentaje = (count / len(df)) * 100
+        porcentaje = (count / cubo.total) * 100
         print(f"{i:2d}. {mod:40s} - {count:4d} ({porcentaje:5.1f}%)")
 
-def generar_resumen_ejecutivo(df):
+def generar_resumen_ejecutivo(cubo):
     """Genera un resumen ejecutivo en formato de texto"""
     print("\n" + "="*80)
     print("RESUMEN EJECUTIVO - BECAS 2025")
@@ -176,39 +194,39 @@ RESUMEN EJECUTIVO DE BECAS - AÑO 2025
 Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 1. DATOS GENERALES
-   • Total de registros procesados: {len(df):,}
-   • Programas de becas diferentes: {df['NombreBeca'].nunique()}
-   • Instituciones educativas participantes: {df['Institucion'].nunique()}
-   • Departamentos con cobertura: {df['Departamento'].nunique()}
+   • Total de registros procesados: {cubo.total:,}
+   • Programas de becas diferentes: {cubo.distintos('NombreBeca')}
+   • Instituciones educativas participantes: {cubo.distintos('Institucion')}
+   • Departamentos con cobertura: {cubo.distintos('Departamento')}
 
 2. PROGRAMAS DE BECAS MÁS IMPORTANTES
 """
     
-    for beca, count in df['NombreBeca'].value_counts().head(5).items():
-        porcentaje = (count / len(df)) * 100
+    for beca, count in cubo.conteos('NombreBeca').head(5).items():
+        porcentaje = (count / cubo.total) * 100
         resumen += f"   • {beca}: {count:,} registros ({porcentaje:.1f}%)\n"
     
     resumen += "\n3. COBERTURA GEOGRÁFICA (Top 10 Departamentos)\n"
-    for dept, count in df['Departamento'].value_counts().head(10).items():
-        porcentaje = (count / len(df)) * 100
+    for dept, count in cubo.conteos('Departamento').head(10).items():
+        porcentaje = (count / cubo.total) * 100
         resumen += f"   • {dept}: {count:,} becas ({porcentaje:.1f}%)\n"
     
-    if 'Modalidad' in df.columns:
+    if 'Modalidad' in cubo.dimensiones:
         resumen += "\n4. MODALIDADES PRINCIPALES\n"
-        for mod, count in df['Modalidad'].value_counts().head(5).items():
-            porcentaje = (count / len(df)) * 100
+        for mod, count in cubo.conteos('Modalidad').head(5).items():
+            porcentaje = (count / cubo.total) * 100
             resumen += f"   • {mod}: {count:,} ({porcentaje:.1f}%)\n"
     
-    if 'Estrato_socioeconomico' in df.columns:
+    if 'Estrato_socioeconomico' in cubo.dimensiones:
         resumen += "\n5. ENFOQUE SOCIOECONÓMICO\n"
-        for estrato, count in df['Estrato_socioeconomico'].value_counts().head(5).items():
-            porcentaje = (count / len(df)) * 100
+        for estrato, count in cubo.conteos('Estrato_socioeconomico').head(5).items():
+            porcentaje = (count / cubo.total) * 100
             resumen += f"   • {estrato}: {count:,} ({porcentaje:.1f}%)\n"
     
-    if 'Migracion' in df.columns:
+    if 'Migracion' in cubo.dimensiones:
         resumen += "\n6. ANÁLISIS DE MIGRACIÓN\n"
-        for mig, count in df['Migracion'].value_counts().items():
-            porcentaje = (count / len(df)) * 100
+        for mig, count in cubo.conteos('Migracion').items():
+            porcentaje = (count / cubo.total) * 100
             resumen += f"   • {mig}: {count:,} ({porcentaje:.1f}%)\n"
     
     resumen += """
@@ -281,13 +299,14 @@ def main():
     # Cargar datos
     df = cargar_datos()
     
-    # Generar reportes
-    generar_reporte_por_beca(df)
-    generar_reporte_por_departamento(df)
-    generar_reporte_migracion(df)
-    generar_reporte_estratos(df)
-    generar_reporte_modalidades(df)
-    generar_resumen_ejecutivo(df)
+    # Generar reportes: todos salen del cubo de conteos del consolidado
+    cubo = obtener_cubo(df)
+    generar_reporte_por_beca(cubo)
+    generar_reporte_por_departamento(cubo)
+    generar_reporte_migracion(cubo)
+    generar_reporte_estratos(cubo)
+    generar_reporte_modalidades(cubo)
+    generar_resumen_ejecutivo(cubo)
     generar_csv_simplificado(df)
     
     print("\n" + "="*80)
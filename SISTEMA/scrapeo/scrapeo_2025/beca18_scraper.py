@@ -17,6 +17,11 @@ import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlparse
 import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.descargas_concurrentes import LIMITADOR_COMPARTIDO, en_paralelo
 
 class Beca18Scraper:
     """
@@ -30,6 +35,8 @@ class Beca18Scraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Rate limiting por host (una petición cada 2 s a cada sitio)
+        self.limitador = LIMITADOR_COMPARTIDO
         
         # Configurar logging
         logging.basicConfig(
@@ -222,12 +229,10 @@ class Beca18Scraper:
         """
         for intento in range(max_retries):
             try:
+                self.limitador.esperar(url)
                 self.logger.info(f"Realizando petición a: {url} (intento {intento + 1})")
                 response = self.session.get(url, timeout=30)
                 response.raise_for_status()
-                
-                # Rate limiting
-                time.sleep(2)
                 return response
                 
             except requests.exceptions.RequestException as e:
@@ -496,9 +501,14 @@ class Beca18Scraper:
                 'recomendaciones': []
             }
             
+            # Los sitios se consultan en paralelo; el limitador espacia los del mismo host
+            respuestas = en_paralelo(self.hacer_request, urls_oficiales)
+            
             for nombre, url in urls_oficiales.items():
                 try:
-                    response = self.hacer_request(url)
+                    response = respuestas[nombre]
+                    if isinstance(response, Exception):
+                        raise response
                     if response:
                         soup = BeautifulSoup(response.content, 'html.parser')
                         texto = soup.get_text().lower()
@@ -540,8 +550,6 @@ class Beca18Scraper:
                         'accesible': False,
                         'error': str(e)
                     }
-                
-                time.sleep(1)  # Rate limiting
             
             # Generar recomendaciones
             if resultados['cambios_detectados']:
@@ -256,7 +256,7 @@ class BecasInstitucionesScraper:
                             {'nombre': 'Diseño Publicitario', 'modalidad': 'Presencial', 'sede': 'La Victoria'},
                             {'nombre': 'Traducción e Interpretación de Idiomas', 'modalidad': 'Presencial', 'sede': 'La Victoria'}
                         ]
-                    }
+                    },
                     # LAMBAYEQUE (continuación)
                     {
                         'nombre': 'IES Privado IDAT',
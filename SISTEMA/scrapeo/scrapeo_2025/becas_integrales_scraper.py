@@ -11,12 +11,16 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import json
-import time
 import logging
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlparse
 import re
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.descargas_concurrentes import LIMITADOR_COMPARTIDO, en_paralelo
 
 class BecasIntegralesScraper:
     """
@@ -46,6 +50,9 @@ class BecasIntegralesScraper:
             'csc_china': 'https://www.campuschina.org/'
         }
         
+        # Espacia las peticiones a cada host (reemplaza la pausa fija entre sitios)
+        self.limitador = LIMITADOR_COMPARTIDO
+        
         # Estructura completa de becas
         self.becas_data = self._inicializar_becas_data()
     
@@ -433,40 +440,43 @@ class BecasIntegralesScraper:
             return {}
     
     def obtener_informacion_internacional(self) -> Dict:
-        """Extrae información de becas internacionales"""
-        becas_internacionales = {}
+        """Extrae información de becas internacionales (los sitios se consultan en paralelo)"""
+        internacionales = ['chevening', 'fulbright', 'erasmus', 'daad', 'campus_france', 'mext_japan', 'gks_korea', 'csc_china']
+        urls = {nombre: url for nombre, url in self.urls_oficiales.items() if nombre in internacionales}
         
-        for nombre_beca, url in self.urls_oficiales.items():
-            if nombre_beca in ['chevening', 'fulbright', 'erasmus', 'daad', 'campus_france', 'mext_japan', 'gks_korea', 'csc_china']:
-                try:
-                    self.logger.info(f"Extrayendo información de {nombre_beca}...")
-                    response = self.session.get(url, timeout=30)
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Extraer información básica
-                    titulo = soup.find('title')
-                    descripcion = soup.find('meta', attrs={'name': 'description'})
-                    
-                    becas_internacionales[nombre_beca] = {
-                        'titulo_pagina': titulo.get_text(strip=True) if titulo else '',
-                        'descripcion': descripcion.get('content', '') if descripcion else '',
-                        'url_verificada': url,
-                        'estado_conexion': 'Activa'
-                    }
-                    
-                    time.sleep(2)  # Pausa entre requests
-                    
-                except Exception as e:
-                    self.logger.error(f"Error al extraer información de {nombre_beca}: {str(e)}")
-                    becas_internacionales[nombre_beca] = {
-                        'estado_conexion': 'Error',
-                        'error': str(e)
-                    }
+        becas_internacionales = {}
+        for nombre_beca, resultado in en_paralelo(self._extraer_sitio_internacional, urls).items():
+            if isinstance(resultado, Exception):
+                self.logger.error(f"Error al extraer información de {nombre_beca}: {str(resultado)}")
+                becas_internacionales[nombre_beca] = {
+                    'estado_conexion': 'Error',
+                    'error': str(resultado)
+                }
+            else:
+                becas_internacionales[nombre_beca] = resultado
         
         return becas_internacionales
     
+    def _extraer_sitio_internacional(self, url: str) -> Dict:
+        """Título y descripción de un sitio de becas internacionales"""
+        self.limitador.esperar(url)
+        self.logger.info(f"Extrayendo información de {url}...")
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Extraer información básica
+        titulo = soup.find('title')
+        descripcion = soup.find('meta', attrs={'name': 'description'})
+        
+        return {
+            'titulo_pagina': titulo.get_text(strip=True) if titulo else '',
+            'descripcion': descripcion.get('content', '') if descripcion else '',
+            'url_verificada': url,
+            'estado_conexion': 'Activa'
+        }
+    
     def categorizar_becas(self) -> Dict:
         """Categoriza todas las becas por nivel de estudios"""
         categorias = {
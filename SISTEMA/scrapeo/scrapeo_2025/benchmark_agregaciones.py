@@ -0,0 +1,124 @@
+"""
+Benchmark: agregaciones de las hojas Instituciones, Carreras y Beca 18 Detalle
+Compara el método anterior (groupby().agg() con lambda ', '.join(x.unique())
+y un segundo groupby().size()) con agregaciones.agregar_por sobre el
+consolidado 2025 (categóricas, como lo recibe generar_excel_powerbi_2025.py)
+y beca18_datos_expandido.csv, repetidos 1x, 10x y 100x. Verifica además que
+ambos métodos den el mismo resultado.
+
+Uso:
+    python benchmark_agregaciones.py [--factores 1 10 100] [--repeticiones N]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, Tuple
+
+import pandas as pd
+
+from agregaciones import agregar_por
+from dataset_consolidado import cargar_consolidado
+
+
+def instituciones_con_lambda(df: pd.DataFrame) -> pd.DataFrame:
+    instituciones = df.groupby('Institucion').agg({
+        'NombreBeca': lambda x: ', '.join(x.unique()),
+        'Departamento': 'first',
+        'AnioBecariosConfirmados': 'first'
+    }).reset_index()
+    instituciones.columns = ['Institucion', 'ProgramasBecas', 'Departamento', 'Anio']
+    instituciones['TotalRegistros'] = df.groupby('Institucion').size().values
+    tipo_inst = df.groupby('Institucion')['TipoInstitucion'].first().reset_index()
+    return instituciones.merge(tipo_inst, on='Institucion', how='left')
+
+
+def instituciones_con_codigos(df: pd.DataFrame) -> pd.DataFrame:
+    return agregar_por(df, 'Institucion', ProgramasBecas=('NombreBeca', 'unir'),
+                       Departamento=('Departamento', 'first'), Anio=('AnioBecariosConfirmados', 'first'),
+                       TotalRegistros=(None, 'size'), TipoInstitucion=('TipoInstitucion', 'first'))
+
+
+def carreras_con_lambda(df: pd.DataFrame) -> pd.DataFrame:
+    carreras = df.groupby('Carrera').agg({
+        'NombreBeca': lambda x: ', '.join(x.unique()),
+        'Institucion': 'nunique',
+        'AnioBecariosConfirmados': 'count'
+    }).reset_index()
+    carreras.columns = ['Carrera', 'ProgramasBecas', 'Instituciones', 'TotalBecas']
+    return carreras.sort_values('TotalBecas', ascending=False)
+
+
+def carreras_con_codigos(df: pd.DataFrame) -> pd.DataFrame:
+    carreras = agregar_por(df, 'Carrera', ProgramasBecas=('NombreBeca', 'unir'),
+                           Instituciones=('Institucion', 'nunique'),
+                           TotalBecas=('AnioBecariosConfirmados', 'count'))
+    return carreras.sort_values('TotalBecas', ascending=False)
+
+
+def beca18_con_lambda(df: pd.DataFrame) -> pd.DataFrame:
+    beca18 = df.groupby('modalidad').agg({
+        'nombre_universidad': 'nunique',
+        'ubicacion': lambda x: x.dropna().nunique(),
+        'tipo_universidad': lambda x: ', '.join(x.unique())
+    }).reset_index()
+    beca18.columns = ['Modalidad', 'UniversidadesUnicas', 'UbicacionesUnicas', 'TipoUniversidad']
+    beca18['TotalRegistros'] = df.groupby('modalidad').size().values
+    return beca18
+
+
+def beca18_con_codigos(df: pd.DataFrame) -> pd.DataFrame:
+    return agregar_por(df, 'modalidad', UniversidadesUnicas=('nombre_universidad', 'nunique'),
+                       UbicacionesUnicas=('ubicacion', 'nunique'), TipoUniversidad=('tipo_universidad', 'unir'),
+                       TotalRegistros=(None, 'size')).rename(columns={'modalidad': 'Modalidad'})
+
+
+CASOS = [
+    ('Instituciones', 'consolidado', instituciones_con_lambda, instituciones_con_codigos),
+    ('Carreras', 'consolidado', carreras_con_lambda, carreras_con_codigos),
+    ('Beca18 Detalle', 'beca18', beca18_con_lambda, beca18_con_codigos),
+]
+
+
+def medir(funcion: Callable, df: pd.DataFrame, repeticiones: int) -> Tuple[float, pd.DataFrame]:
+    """Devuelve (segundos por repetición, resultado)"""
+    resultado = funcion(df)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(df)
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+def mismos_valores(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Mismas columnas y valores celda a celda (los tipos pueden diferir: object vs categórica)"""
+    if list(a.columns) != list(b.columns):
+        return False
+    a = a.astype(object).where(a.notna(), None).values.tolist()
+    b = b.astype(object).where(b.notna(), None).values.tolist()
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de agregaciones (lambda join vs códigos categóricos)")
+    parser.add_argument("--factores", type=int, nargs='+', default=[1, 10, 100],
+                        help="Veces que se repite cada dataset")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    base: Dict[str, pd.DataFrame] = {'consolidado': cargar_consolidado(categoricas=True)}
+    beca18 = pd.read_csv('beca18_datos_expandido.csv')
+    base['beca18'] = beca18[beca18['convocatoria'] == 2025]
+
+    print(f"\n{'Hoja':<16}{'Factor':>7}{'Filas':>10}{'lambda ms':>12}{'códigos ms':>12}{'Aceleración':>13}  Iguales")
+    for factor in args.factores:
+        datos = {nombre: pd.concat([df] * factor, ignore_index=True) for nombre, df in base.items()}
+        for hoja, fuente, anterior, nuevo in CASOS:
+            df = datos[fuente]
+            seg_anterior, res_anterior = medir(anterior, df, args.repeticiones)
+            seg_nuevo, res_nuevo = medir(nuevo, df, args.repeticiones)
+            iguales = mismos_valores(res_anterior.reset_index(drop=True), res_nuevo.reset_index(drop=True))
+            print(f"{hoja:<16}{factor:>6}x{len(df):>10}{seg_anterior * 1000:>12.1f}{seg_nuevo * 1000:>12.1f}"
+                  f"{seg_anterior / seg_nuevo:>12.1f}x  {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
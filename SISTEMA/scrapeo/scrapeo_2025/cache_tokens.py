@@ -0,0 +1,151 @@
+"""
+Caché persistente y cifrada de tokens MSAL para graph_upload.py y powerbi_refresh.py
+Los tokens que entrega Azure AD se guardan (SerializableTokenCache de MSAL)
+cifrados con Fernet en un directorio del usuario, fuera de la carpeta del
+proyecto que se sincroniza con OneDrive. En la siguiente ejecución el token
+sale de la caché sin ir a Azure AD; MSAL lo renueva cuando le quedan menos
+de 5 minutos (o antes, si el servicio indica refresh_in) y con login de
+usuario usa el refresh token, así que el código de dispositivo se pide solo
+la primera vez.
+
+La clave de cifrado no se guarda junto a la caché: sale de MSAL_CACHE_KEY
+o del almacén de secretos del sistema (keyring: Administrador de
+credenciales de Windows, Llavero de macOS, Secret Service en Linux), donde
+se crea la primera vez. Si no hay ninguno de los dos, los tokens quedan
+solo en memoria durante la ejecución.
+
+Variables de entorno (opcionales):
+  MSAL_CACHE_DIR  -> directorio de la caché (por defecto ~/.becas_msal)
+  MSAL_CACHE_KEY  -> clave Fernet (Fernet.generate_key()); tiene prioridad
+                     sobre keyring, útil en servidores sin almacén de secretos
+
+Si dos scripts guardan a la vez gana el último: el otro token solo se
+vuelve a pedir en la próxima ejecución.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from msal import ConfidentialClientApplication, PublicClientApplication, SerializableTokenCache
+
+try:
+    import keyring
+    from keyring.errors import KeyringError
+except ImportError:  # sin keyring solo se puede usar MSAL_CACHE_KEY
+    keyring = None
+
+DIRECTORIO_CACHE = Path(os.getenv("MSAL_CACHE_DIR", str(Path.home() / ".becas_msal")))
+ARCHIVO_CACHE = "tokens.bin"
+SERVICIO_KEYRING = "becas-msal-cache"
+USUARIO_KEYRING = "fernet"
+
+
+def _escribir_privado(ruta: Path, datos: bytes) -> None:
+    """Escritura atómica de un archivo legible solo por el usuario"""
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    descriptor = os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def _clave() -> Optional[bytes]:
+    """Clave Fernet de MSAL_CACHE_KEY o de keyring (la crea si falta); None si no hay dónde guardarla"""
+    clave = os.getenv("MSAL_CACHE_KEY")
+    if clave:
+        return clave.encode()
+    if keyring is None:
+        print("⚠ Caché de tokens solo en memoria: instala keyring o define MSAL_CACHE_KEY")
+        return None
+    try:
+        clave = keyring.get_password(SERVICIO_KEYRING, USUARIO_KEYRING)
+        if not clave:
+            clave = Fernet.generate_key().decode()
+            keyring.set_password(SERVICIO_KEYRING, USUARIO_KEYRING, clave)
+    except KeyringError as e:
+        print(f"⚠ Caché de tokens solo en memoria: no hay almacén de secretos ({e.__class__.__name__}); "
+              "define MSAL_CACHE_KEY")
+        return None
+    return clave.encode()
+
+
+class CacheTokens:
+    """SerializableTokenCache de MSAL que se carga y se guarda cifrada (o solo en memoria, sin clave)"""
+
+    def __init__(self, directorio: Path = DIRECTORIO_CACHE):
+        self.directorio = Path(directorio)
+        self.ruta = self.directorio / ARCHIVO_CACHE
+        self.cache = SerializableTokenCache()
+        clave = _clave()
+        self._fernet = None
+        if clave:
+            try:
+                self._fernet = Fernet(clave)
+            except ValueError:
+                print("⚠ Caché de tokens solo en memoria: MSAL_CACHE_KEY no es una clave Fernet válida "
+                      "(genera una con Fernet.generate_key())")
+        if self._fernet is None:
+            return
+        self.directorio.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.ruta.exists():
+            try:
+                self.cache.deserialize(self._fernet.decrypt(self.ruta.read_bytes()).decode("utf-8"))
+            except (InvalidToken, ValueError):
+                print(f"⚠ No se pudo leer la caché de tokens {self.ruta} (¿cambió la clave?); se empieza vacía")
+
+    def guardar(self) -> None:
+        if self._fernet is not None and self.cache.has_state_changed:
+            _escribir_privado(self.ruta, self._fernet.encrypt(self.cache.serialize().encode("utf-8")))
+            self.cache.has_state_changed = False
+
+
+def _informar_origen(resultado: dict) -> None:
+    if resultado.get("token_source") == "cache":
+        print("🔑 Token reutilizado de la caché")
+
+
+def token_aplicacion(tenant_id: str, client_id: str, client_secret: str, scopes: List[str],
+                     cache: Optional[CacheTokens] = None) -> dict:
+    """Token app-only (client credentials); resultado de MSAL, con 'access_token' si hubo éxito"""
+    cache = cache or CacheTokens()
+    app = ConfidentialClientApplication(
+        client_id,
+        authority=f"https://login.microsoftonline.com/{tenant_id}",
+        client_credential=client_secret,
+        token_cache=cache.cache,
+    )
+    try:
+        # Con token_cache, MSAL devuelve el token guardado si sigue vigente
+        resultado = app.acquire_token_for_client(scopes=scopes)
+    finally:
+        cache.guardar()
+    _informar_origen(resultado)
+    return resultado
+
+
+def token_usuario(tenant_id: str, client_id: str, scopes: List[str],
+                  cache: Optional[CacheTokens] = None) -> dict:
+    """Token delegado: silencioso con la cuenta guardada y, si no hay, device code flow"""
+    cache = cache or CacheTokens()
+    pca = PublicClientApplication(
+        client_id,
+        authority=f"https://login.microsoftonline.com/{tenant_id}",
+        token_cache=cache.cache,
+    )
+    try:
+        cuentas = pca.get_accounts()
+        resultado = pca.acquire_token_silent(scopes, account=cuentas[0]) if cuentas else None
+        if resultado and "access_token" in resultado:
+            _informar_origen(resultado)
+            return resultado
+        flow = pca.initiate_device_flow(scopes=scopes)
+        if not flow or "user_code" not in flow:
+            raise RuntimeError("No se pudo iniciar el device code flow")
+        print("Autenticación de usuario requerida. Ve a https://microsoft.com/devicelogin y pega este código:")
+        print(flow["user_code"])
+        print("Luego vuelve aquí. Esperando confirmación...")
+        return pca.acquire_token_by_device_flow(flow)
+    finally:
+        cache.guardar()
@@ -0,0 +1,174 @@
+"""
+Cubo de conteos del dataset consolidado 2025
+El consolidado se agrupa una sola vez por las dimensiones principales
+(beca, institución, año, departamento, modalidad, estrato y migración) y el
+resultado, una fila por combinación con su conteo, se guarda junto al CSV.
+Los reportes y las hojas de Power BI salen de cortes y agregaciones de ese
+cubo, cuyo tamaño depende de las combinaciones distintas y no de las filas.
+
+    cubo = obtener_cubo()
+    cubo.conteos('Departamento')                       # df['Departamento'].value_counts()
+    cubo.filtrar(NombreBeca='Beca 18').conteos('Modalidad')
+    cubo.tabla_cruzada('NombreBeca', 'Departamento')   # pd.crosstab(...)
+
+Los conteos respetan el orden de value_counts: conteo descendente y, a
+igual conteo, orden de primera aparición en el dataset.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import escribir_atomico
+from dataset_consolidado import ARCHIVO_CSV, cargar_consolidado, parquet_disponible
+
+ARCHIVO_CUBO = 'dashboard_becas_2025_cubo.parquet'
+ARCHIVO_CUBO_CSV = 'dashboard_becas_2025_cubo.csv'
+
+DIMENSIONES = ['NombreBeca', 'Institucion', 'AnioBecariosConfirmados', 'Departamento',
+               'Modalidad', 'Estrato_socioeconomico', 'Migracion']
+
+CONTEO = 'conteo'
+
+
+class CuboConteos:
+    """Conteos por combinación de dimensiones, con cortes y agregaciones"""
+
+    def __init__(self, cubo: pd.DataFrame):
+        self.cubo = cubo
+        self.dimensiones = [c for c in cubo.columns if c != CONTEO]
+        self.total = int(cubo[CONTEO].sum())
+        self._cache: Dict = {}
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, dimensiones: List[str] = DIMENSIONES) -> 'CuboConteos':
+        """Agrupa df (una pasada) por las dimensiones presentes; los nulos se conservan como clave"""
+        presentes = [d for d in dimensiones if d in df.columns]
+        cubo = (df.groupby(presentes, dropna=False, sort=False, observed=True)
+                  .size().rename(CONTEO).reset_index())
+        return cls(cubo)
+
+    # --- persistencia
+
+    def guardar(self, ruta: Optional[str] = None) -> str:
+        """
+        Guarda el cubo (Parquet si hay pyarrow, si no CSV) y devuelve la ruta usada.
+        La escritura es atómica: los reportes y el Excel pueden reconstruirlo a la vez.
+        """
+        if ruta is None:
+            ruta = ARCHIVO_CUBO if parquet_disponible() else ARCHIVO_CUBO_CSV
+        if ruta.endswith('.parquet'):
+            datos = self.cubo.to_parquet(None, engine='pyarrow', compression='zstd', index=False)
+        else:
+            datos = self.cubo.to_csv(index=False).encode('utf-8-sig')
+        escribir_atomico(Path(ruta), datos)
+        return ruta
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'CuboConteos':
+        if ruta.endswith('.parquet'):
+            return cls(pd.read_parquet(ruta, engine='pyarrow'))
+        return cls(pd.read_csv(ruta))
+
+    # --- cortes y agregaciones
+
+    def filtrar(self, **valores) -> 'CuboConteos':
+        """Corte del cubo: dimension=valor o dimension=[valores]"""
+        mascara = pd.Series(True, index=self.cubo.index)
+        for dimension, valor in valores.items():
+            if isinstance(valor, (list, tuple, set)):
+                mascara &= self.cubo[dimension].isin(list(valor))
+            else:
+                mascara &= self.cubo[dimension] == valor
+        return CuboConteos(self.cubo[mascara].reset_index(drop=True))
+
+    def agregar(self, dimensiones: List[str], dropna: bool = True) -> pd.DataFrame:
+        """Roll-up a las dimensiones indicadas: DataFrame con las dimensiones y el conteo"""
+        return (self.cubo.groupby(dimensiones, dropna=dropna, sort=False, observed=True)[CONTEO]
+                    .sum().reset_index())
+
+    def conteos(self, columna: str) -> pd.Series:
+        """Equivalente a df[columna].value_counts()"""
+        clave = ('conteos', columna)
+        if clave not in self._cache:
+            serie = self.cubo.groupby(columna, sort=False, observed=True)[CONTEO].sum()
+            self._cache[clave] = serie.sort_values(ascending=False, kind='stable').rename('count')
+        return self._cache[clave]
+
+    def conteos_por(self, grupo: str, columna: str) -> Dict:
+        """{valor de grupo: value_counts de columna dentro del grupo}"""
+        clave = ('conteos_por', grupo, columna)
+        if clave not in self._cache:
+            parcial = self.cubo.groupby([grupo, columna], sort=False, observed=True)[CONTEO].sum()
+            self._cache[clave] = {
+                valor: serie.droplevel(0).sort_values(ascending=False, kind='stable').rename('count')
+                for valor, serie in parcial.groupby(level=0, sort=False)
+            }
+        return self._cache[clave]
+
+    def totales_por(self, grupo: str) -> Dict:
+        """{valor de grupo: filas del grupo}"""
+        return {valor: int(total) for valor, total in self.conteos(grupo).items()}
+
+    def distintos(self, columna: str) -> int:
+        """Equivalente a df[columna].nunique()"""
+        return len(self.conteos(columna))
+
+    def distintos_por(self, grupo: str, columna: str) -> Dict:
+        """{valor de grupo: nunique de columna dentro del grupo}"""
+        return {valor: len(serie) for valor, serie in self.conteos_por(grupo, columna).items()}
+
+    def valores(self, columna: str) -> List:
+        """Valores distintos en orden de primera aparición (como df[columna].unique(), sin nulos)"""
+        return list(self.cubo[columna].dropna().unique())
+
+    def resumen_por(self, grupo: str, contar: str, distintos: List[str]) -> pd.DataFrame:
+        """
+        Equivalente a df.groupby(grupo).agg({contar: 'count', col: 'nunique', ...}):
+        filas no nulas de `contar` y valores distintos de cada columna, por grupo.
+        """
+        cubo = self.cubo[self.cubo[grupo].notna()]
+        columnas = {contar: cubo[cubo[contar].notna()].groupby(grupo)[CONTEO].sum()}
+        for columna in distintos:
+            columnas[columna] = cubo.groupby(grupo)[columna].nunique()
+        resumen = pd.DataFrame(columnas).fillna(0).astype('int64')
+        resumen.index.name = grupo
+        return resumen
+
+    def tabla_cruzada(self, filas: str, columnas: str) -> pd.DataFrame:
+        """Equivalente a pd.crosstab(df[filas], df[columnas])"""
+        tabla = (self.cubo.groupby([filas, columnas], observed=True)[CONTEO].sum()
+                     .unstack(columnas, fill_value=0))
+        return tabla.rename_axis(index=filas, columns=columnas).astype('int64')
+
+
+def _cubo_vigente(ruta_cubo: str, ruta_csv: str) -> bool:
+    """El cubo sirve si existe y no es más antiguo que el CSV consolidado"""
+    if not os.path.exists(ruta_cubo):
+        return False
+    if ruta_cubo.endswith('.parquet') and not parquet_disponible():
+        return False
+    if not os.path.exists(ruta_csv):
+        return True
+    return os.path.getmtime(ruta_cubo) >= os.path.getmtime(ruta_csv)
+
+
+def construir_cubo(df: Optional[pd.DataFrame] = None, ruta: Optional[str] = None) -> CuboConteos:
+    """Construye el cubo desde el consolidado (o df) y lo guarda"""
+    if df is None:
+        df = cargar_consolidado()
+    cubo = CuboConteos.desde_dataframe(df)
+    cubo.guardar(ruta)
+    return cubo
+
+
+def obtener_cubo(df: Optional[pd.DataFrame] = None, ruta_csv: str = ARCHIVO_CSV) -> CuboConteos:
+    """Carga el cubo guardado si está al día con el CSV; si no, lo construye y lo guarda"""
+    for ruta in (ARCHIVO_CUBO, ARCHIVO_CUBO_CSV):
+        if _cubo_vigente(ruta, ruta_csv):
+            return CuboConteos.cargar(ruta)
+    return construir_cubo(df)
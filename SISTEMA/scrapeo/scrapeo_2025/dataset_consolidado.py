@@ -0,0 +1,80 @@
+"""
+Lectura y escritura del dataset consolidado 2025
+Además del CSV, el consolidado se guarda (si pyarrow está instalado) como
+Parquet comprimido con las columnas de texto repetitivas como categóricas,
+que se escriben con codificación de diccionario. Los scripts de análisis
+y de Power BI leen el Parquet cuando existe y está al día con el CSV.
+"""
+
+import os
+
+import pandas as pd
+from pandas.api.types import infer_dtype, is_string_dtype
+
+ARCHIVO_CSV = 'dashboard_becas_2025_consolidado.csv'
+ARCHIVO_PARQUET = 'dashboard_becas_2025_consolidado.parquet'
+
+# Una columna de texto se guarda como categórica si a lo sumo la mitad de sus valores son distintos
+PROPORCION_MAXIMA_CATEGORICA = 0.5
+
+
+def parquet_disponible():
+    """True si está instalado pyarrow (dependencia opcional)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def a_categoricas(df):
+    """Convierte a categóricas las columnas de texto con pocos valores distintos"""
+    df = df.copy()
+    for columna in df.columns:
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if serie.dtype != object and not is_string_dtype(serie.dtype):
+            continue
+        if infer_dtype(serie, skipna=True) not in ('string', 'empty'):
+            # Columnas con tipos mezclados: se guardan como texto (los nulos se conservan)
+            serie = serie.where(serie.isna(), serie.astype(str))
+        if serie.nunique() <= max(1, len(serie) * PROPORCION_MAXIMA_CATEGORICA):
+            serie = serie.astype('category')
+        df[columna] = serie
+    return df
+
+
+def guardar_parquet(df, ruta=ARCHIVO_PARQUET):
+    """Guarda el consolidado en Parquet (zstd + diccionario). Devuelve False si no hay pyarrow"""
+    if not parquet_disponible():
+        print(f"⚠ pyarrow no está instalado: se omite {ruta}")
+        return False
+    a_categoricas(df).to_parquet(ruta, engine='pyarrow', compression='zstd', index=False)
+    return True
+
+
+def _parquet_vigente(ruta_parquet, ruta_csv):
+    """El Parquet sirve si existe y no es más antiguo que el CSV"""
+    if not os.path.exists(ruta_parquet) or not parquet_disponible():
+        return False
+    if not os.path.exists(ruta_csv):
+        return True
+    return os.path.getmtime(ruta_parquet) >= os.path.getmtime(ruta_csv)
+
+
+def cargar_consolidado(categoricas=False, ruta_csv=ARCHIVO_CSV, ruta_parquet=ARCHIVO_PARQUET):
+    """
+    Carga el dataset consolidado, del Parquet si está vigente y si no del CSV.
+    Con categoricas=False las columnas categóricas vuelven a texto, igual que al leer el CSV.
+    """
+    if _parquet_vigente(ruta_parquet, ruta_csv):
+        df = pd.read_parquet(ruta_parquet, engine='pyarrow')
+        if not categoricas:
+            for columna in df.columns:
+                if isinstance(df[columna].dtype, pd.CategoricalDtype):
+                    df[columna] = df[columna].astype(df[columna].cat.categories.dtype)
+        return df
+
+    df = pd.read_csv(ruta_csv)
+    return a_categoricas(df) if categoricas else df
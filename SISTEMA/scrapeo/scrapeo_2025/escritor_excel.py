@@ -0,0 +1,63 @@
+"""
+Escritura de libros Excel en modo streaming (openpyxl write-only)
+pd.ExcelWriter arma en memoria el modelo completo del libro (un objeto por
+celda) hasta guardarlo. En modo write-only cada fila se serializa al
+agregarla, así que la memoria no crece con el tamaño del libro. Las filas
+se envían por bloques desde el DataFrame y cada hoja puede liberarse apenas
+se escribe.
+
+    with LibroStreaming('salida.xlsx') as libro:
+        libro.agregar_hoja('Datos', df)
+        libro.agregar_hoja('Matriz', matriz, index=True)
+
+El contenido es el mismo que escribe DataFrame.to_excel (encabezados, índice
+opcional y celdas vacías para los nulos), sin estilos.
+"""
+
+from typing import Iterator, List
+
+import pandas as pd
+from openpyxl import Workbook
+
+TAMANO_BLOQUE = 10_000
+
+
+def filas_de(df: pd.DataFrame, index: bool = False, tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[List]:
+    """Encabezado y filas de df como listas de valores Python (None en los nulos)"""
+    encabezado = df.columns.tolist()
+    yield [df.index.name] + encabezado if index else encabezado
+    for inicio in range(0, len(df), tamano_bloque):
+        bloque = df.iloc[inicio:inicio + tamano_bloque].astype(object)
+        filas = bloque.where(bloque.notna(), None).to_numpy().tolist()
+        if index:
+            filas = [[indice] + fila for indice, fila in zip(bloque.index.tolist(), filas)]
+        yield from filas
+
+
+class LibroStreaming:
+    """Libro Excel de solo escritura: las hojas se escriben fila a fila y en orden"""
+
+    def __init__(self, ruta, tamano_bloque: int = TAMANO_BLOQUE):
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        self.libro = Workbook(write_only=True)
+        self.hojas: List[str] = []
+
+    def agregar_hoja(self, nombre: str, df: pd.DataFrame, index: bool = False) -> int:
+        """Escribe df en una hoja nueva y devuelve cuántas filas de datos escribió"""
+        hoja = self.libro.create_sheet(title=nombre)
+        for fila in filas_de(df, index, self.tamano_bloque):
+            hoja.append(fila)
+        self.hojas.append(nombre)
+        return len(df)
+
+    def guardar(self):
+        self.libro.save(self.ruta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.guardar()
+        return False
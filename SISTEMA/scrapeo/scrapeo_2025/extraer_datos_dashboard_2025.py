@@ -14,10 +14,14 @@ Campos del dashboard:
 """
 
 import pandas as pd
+import numpy as np
 import json
 from datetime import datetime
 import os
 
+from cubo_conteos import construir_cubo
+from dataset_consolidado import ARCHIVO_CSV, ARCHIVO_PARQUET, guardar_parquet
+
 def extraer_datos_beca18_expandido():
     """Extrae datos de Beca 18 con información detallada de universidades"""
     print("Extrayendo datos de beca18_datos_expandido.csv...")
@@ -280,35 +284,56 @@ def extraer_datos_becas_integrales():
         return pd.DataFrame()
 
 
-def generar_campo_migracion(df):
+# Lugar de estudio (en minúsculas) -> región. Un lugar que no figura en la
+# tabla se considera extranjero; se puede pasar otra tabla a generar_campo_migracion
+REGION_POR_LUGAR = {
+    'lima': 'Lima', 'huacho': 'Lima',
+    'arequipa': 'Arequipa', 'cusco': 'Cusco', 'puno': 'Puno', 'ayacucho': 'Ayacucho',
+    'lambayeque': 'Lambayeque', 'tacna': 'Tacna', 'tarapoto': 'San Martín',
+    'huancayo': 'Junín', 'junín': 'Junín', 'trujillo': 'La Libertad', 'pasco': 'Pasco',
+    'huaraz': 'Áncash', 'chimbote': 'Áncash', 'iquitos': 'Loreto', 'loreto': 'Loreto',
+    'sullana': 'Piura', 'piura': 'Piura', 'cajamarca': 'Cajamarca', 'ucayali': 'Ucayali',
+    'tumbes': 'Tumbes', 'huancavelica': 'Huancavelica', 'madre de dios': 'Madre de Dios'
+}
+
+# Lugares que no indican un departamento concreto
+LUGARES_SIN_ESPECIFICAR = {'nacional', 'no especificado', 'no especificada'}
+
+# Lugar de origen asumido: estudiar en él no implica migración. Se compara el
+# lugar y no la región, como antes: Huacho (región Lima) sigue en "Posible migración"
+LUGAR_SIN_MIGRACION = 'lima'
+
+
+def generar_campo_migracion(df, region_por_lugar=None):
     """
     Genera el campo de migración basado en el departamento de la institución
     vs el departamento de origen (asumiendo que la mayoría proviene de Lima y regiones)
+    
+    La clasificación se hace una vez por lugar distinto (factorize + np.select)
+    y se reparte a las filas con sus códigos, sin recorrer el DataFrame fila a fila.
     """
     print("Generando campo de migración...")
     
     if 'Departamento' in df.columns:
-        def clasificar_migracion(row):
-            dept = str(row['Departamento']).lower()
-            
+        region_por_lugar = REGION_POR_LUGAR if region_por_lugar is None else region_por_lugar
+        
+        codigos, lugares = pd.factorize(df['Departamento'], use_na_sentinel=False)
+        lugares = pd.Series([str(lugar).lower() for lugar in lugares])
+        regiones = lugares.map(region_por_lugar)
+        
+        condiciones = [
             # Si es nacional o no especificado, se considera sin migración específica
-            if dept in ['nacional', 'no especificado', 'no especificada']:
-                return 'Nacional - Sin especificar'
-            
+            lugares.isin(LUGARES_SIN_ESPECIFICAR),
             # Si es internacional
-            if dept not in ['lima', 'arequipa', 'cusco', 'puno', 'ayacucho', 'lambayeque', 
-                           'tacna', 'huacho', 'tarapoto', 'huancayo', 'trujillo', 'pasco',
-                           'huaraz', 'iquitos', 'chimbote', 'sullana', 'piura', 'cajamarca',
-                           'ucayali', 'tumbes', 'huancavelica', 'junín', 'loreto', 'madre de dios']:
-                return 'Internacional'
-            
-            # Para becas en provincias, asumimos migración desde Lima u otras regiones
-            if dept != 'lima':
-                return 'Posible migración'
-            else:
-                return 'Lima - Sin migración'
+            regiones.isna(),
+            # Estudia en el lugar de origen asumido
+            lugares == LUGAR_SIN_MIGRACION,
+        ]
+        opciones = ['Nacional - Sin especificar', 'Internacional', 'Lima - Sin migración']
+        # Para becas en provincias, asumimos migración desde Lima u otras regiones
+        clasificacion = np.select(condiciones, opciones, default='Posible migración')
         
-        df['Migracion'] = df.apply(clasificar_migracion, axis=1)
+        df['Migracion'] = clasificacion[codigos]
         print(f"  ✓ Campo de migración generado")
     
     return df
@@ -359,17 +384,25 @@ def consolidar_datos():
         df_consolidado = df_consolidado.sort_values(['NombreBeca', 'Departamento'])
         
         # Guardar archivo consolidado
-        archivo_salida = 'dashboard_becas_2025_consolidado.csv'
+        archivo_salida = ARCHIVO_CSV
         df_consolidado.to_csv(archivo_salida, index=False, encoding='utf-8-sig')
         print(f"\n✓ Datos consolidados guardados en: {archivo_salida}")
         
+        # Versión columnar (opcional, requiere pyarrow): más liviana y rápida de leer
+        if guardar_parquet(df_consolidado, ARCHIVO_PARQUET):
+            print(f"✓ Datos consolidados guardados en: {ARCHIVO_PARQUET}")
+        
         # Generar también versión JSON
         archivo_json = 'dashboard_becas_2025_consolidado.json'
         df_consolidado.to_json(archivo_json, orient='records', indent=2, force_ascii=False)
         print(f"✓ Datos consolidados guardados en: {archivo_json}")
         
+        # Cubo de conteos para reportes y hojas de Power BI
+        cubo = construir_cubo(df_consolidado)
+        print(f"✓ Cubo de conteos guardado: {len(cubo.cubo)} combinaciones")
+        
         # Generar reporte de estadísticas
-        generar_reporte_estadisticas(df_consolidado)
+        generar_reporte_estadisticas(cubo)
         
         return df_consolidado
     else:
@@ -377,48 +410,48 @@ def consolidar_datos():
         return None
 
 
-def generar_reporte_estadisticas(df):
-    """Genera un reporte con estadísticas del dataset consolidado"""
+def generar_reporte_estadisticas(cubo):
+    """Genera un reporte con estadísticas del dataset consolidado a partir de su cubo de conteos"""
     print("\n" + "="*60)
     print("ESTADÍSTICAS DEL DATASET CONSOLIDADO")
     print("="*60)
     
-    print(f"\nTotal de registros: {len(df)}")
-    print(f"\nBecas únicas: {df['NombreBeca'].nunique()}")
+    print(f"\nTotal de registros: {cubo.total}")
+    print(f"\nBecas únicas: {cubo.distintos('NombreBeca')}")
     print("\nDistribución por beca:")
-    print(df['NombreBeca'].value_counts())
+    print(cubo.conteos('NombreBeca'))
     
-    print(f"\nInstituciones únicas: {df['Institucion'].nunique()}")
+    print(f"\nInstituciones únicas: {cubo.distintos('Institucion')}")
     
-    print(f"\nDepartamentos únicos: {df['Departamento'].nunique()}")
+    print(f"\nDepartamentos únicos: {cubo.distintos('Departamento')}")
     print("\nDistribución por departamento:")
-    print(df['Departamento'].value_counts().head(10))
+    print(cubo.conteos('Departamento').head(10))
     
-    if 'Modalidad' in df.columns:
-        print(f"\nModalidades únicas: {df['Modalidad'].nunique()}")
+    if 'Modalidad' in cubo.dimensiones:
+        print(f"\nModalidades únicas: {cubo.distintos('Modalidad')}")
         print("\nDistribución por modalidad:")
-        print(df['Modalidad'].value_counts().head(10))
+        print(cubo.conteos('Modalidad').head(10))
     
-    if 'Estrato_socioeconomico' in df.columns:
+    if 'Estrato_socioeconomico' in cubo.dimensiones:
         print("\nDistribución por estrato socioeconómico:")
-        print(df['Estrato_socioeconomico'].value_counts())
+        print(cubo.conteos('Estrato_socioeconomico'))
     
-    if 'Migracion' in df.columns:
+    if 'Migracion' in cubo.dimensiones:
         print("\nDistribución por migración:")
-        print(df['Migracion'].value_counts())
+        print(cubo.conteos('Migracion'))
     
     # Guardar estadísticas en archivo
     stats_dict = {
         'fecha_generacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'total_registros': len(df),
-        'becas_unicas': df['NombreBeca'].nunique(),
-        'instituciones_unicas': df['Institucion'].nunique(),
-        'departamentos_unicos': df['Departamento'].nunique(),
-        'distribucion_becas': df['NombreBeca'].value_counts().to_dict(),
-        'distribucion_departamentos': df['Departamento'].value_counts().to_dict(),
-        'distribucion_modalidades': df['Modalidad'].value_counts().to_dict() if 'Modalidad' in df.columns else {},
-        'distribucion_estrato': df['Estrato_socioeconomico'].value_counts().to_dict() if 'Estrato_socioeconomico' in df.columns else {},
-        'distribucion_migracion': df['Migracion'].value_counts().to_dict() if 'Migracion' in df.columns else {}
+        'total_registros': cubo.total,
+        'becas_unicas': cubo.distintos('NombreBeca'),
+        'instituciones_unicas': cubo.distintos('Institucion'),
+        'departamentos_unicos': cubo.distintos('Departamento'),
+        'distribucion_becas': cubo.conteos('NombreBeca').to_dict(),
+        'distribucion_departamentos': cubo.conteos('Departamento').to_dict(),
+        'distribucion_modalidades': cubo.conteos('Modalidad').to_dict() if 'Modalidad' in cubo.dimensiones else {},
+        'distribucion_estrato': cubo.conteos('Estrato_socioeconomico').to_dict() if 'Estrato_socioeconomico' in cubo.dimensiones else {},
+        'distribucion_migracion': cubo.conteos('Migracion').to_dict() if 'Migracion' in cubo.dimensiones else {}
     }
     
     with open('estadisticas_dashboard_2025.json', 'w', encoding='utf-8') as f:
@@ -467,7 +500,9 @@ def main():
         print("="*60)
         print(f"\nArchivos generados:")
         print("  • dashboard_becas_2025_consolidado.csv")
+        print("  • dashboard_becas_2025_consolidado.parquet (si pyarrow está instalado)")
         print("  • dashboard_becas_2025_consolidado.json")
+        print("  • dashboard_becas_2025_cubo.parquet (o .csv sin pyarrow)")
         print("  • estadisticas_dashboard_2025.json")
         print("\nLos datos están listos para ser usados en el dashboard.")
     else:
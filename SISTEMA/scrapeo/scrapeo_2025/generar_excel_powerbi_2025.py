@@ -1,19 +1,42 @@
 """
 Script para generar archivo Excel completo con múltiples hojas
 para Power BI - Datos de Becas 2025
+
+El consolidado se carga una sola vez (con las columnas de texto como
+categóricas) junto con el cubo de conteos, y todas las hojas se construyen
+a partir de esos datos compartidos. Al final se muestra cuánto tardó cada
+hoja en construirse y en escribirse.
 """
 
 import pandas as pd
+import argparse
 import json
+import time
 from datetime import datetime
 import os
 
-def crear_hoja_principal():
+from agregaciones import agregar_por
+from cubo_conteos import obtener_cubo
+from dataset_consolidado import cargar_consolidado
+from escritor_excel import LibroStreaming
+
+# streaming: openpyxl write-only, memoria constante; openpyxl: pd.ExcelWriter (libro completo en memoria)
+MODOS_ESCRITURA = ('streaming', 'openpyxl')
+
+
+class DatosLibro:
+    """Datos compartidos por todas las hojas: consolidado (categóricas) y cubo de conteos"""
+
+    def __init__(self):
+        self.df = cargar_consolidado(categoricas=True)
+        self.cubo = obtener_cubo(self.df)
+
+
+def crear_hoja_principal(datos):
     """Crea la hoja principal con los campos del dataset solicitado"""
     print("Generando Hoja Principal: Becas 2025...")
     
-    # Cargar datos consolidados
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    df = datos.df
     
     # Seleccionar y renombrar campos según especificación
     df_principal = pd.DataFrame({
@@ -31,42 +54,34 @@ def crear_hoja_principal():
     return df_principal
 
 
-def crear_hoja_instituciones_2025():
+def crear_hoja_instituciones_2025(datos):
     """Crea hoja con información detallada de instituciones"""
     print("\nGenerando Hoja: Instituciones 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
-    
-    # Agrupar por institución
-    instituciones = df.groupby('Institucion').agg({
-        'NombreBeca': lambda x: ', '.join(x.unique()),
-        'Departamento': 'first',
-        'AnioBecariosConfirmados': 'first'
-    }).reset_index()
-    
-    instituciones.columns = ['Institucion', 'ProgramasBecas', 'Departamento', 'Anio']
-    instituciones['TotalRegistros'] = df.groupby('Institucion').size().values
-    
-    # Agregar información adicional si existe
-    if 'TipoInstitucion' in df.columns:
-        tipo_inst = df.groupby('Institucion')['TipoInstitucion'].first().reset_index()
-        instituciones = instituciones.merge(tipo_inst, on='Institucion', how='left')
+    df = datos.df
+    
+    # Agrupar por institución (una pasada; información adicional si existe)
+    adicionales = {'TipoInstitucion': ('TipoInstitucion', 'first')} if 'TipoInstitucion' in df.columns else {}
+    instituciones = agregar_por(
+        df, 'Institucion',
+        ProgramasBecas=('NombreBeca', 'unir'),
+        Departamento=('Departamento', 'first'),
+        Anio=('AnioBecariosConfirmados', 'first'),
+        TotalRegistros=(None, 'size'),
+        **adicionales
+    )
     
     print(f"  ✓ {len(instituciones)} instituciones únicas")
     return instituciones
 
 
-def crear_hoja_departamentos_2025():
+def crear_hoja_departamentos_2025(datos):
     """Crea hoja con análisis por departamento"""
     print("\nGenerando Hoja: Departamentos 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    cubo = datos.cubo
     
-    departamentos = df.groupby('Departamento').agg({
-        'NombreBeca': 'count',
-        'Institucion': 'nunique',
-        'Modalidad': 'nunique'
-    }).reset_index()
+    departamentos = cubo.resumen_por('Departamento', 'NombreBeca', ['Institucion', 'Modalidad']).reset_index()
     
     departamentos.columns = ['Departamento', 'TotalBecas', 'InstitucionesUnicas', 'ModalidadesUnicas']
     departamentos = departamentos.sort_values('TotalBecas', ascending=False)
@@ -79,17 +94,13 @@ def crear_hoja_departamentos_2025():
     return departamentos
 
 
-def crear_hoja_modalidades_2025():
+def crear_hoja_modalidades_2025(datos):
     """Crea hoja con análisis por modalidad"""
     print("\nGenerando Hoja: Modalidades 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    cubo = datos.cubo
     
-    modalidades = df.groupby('Modalidad').agg({
-        'NombreBeca': 'count',
-        'Institucion': 'nunique',
-        'Departamento': 'nunique'
-    }).reset_index()
+    modalidades = cubo.resumen_por('Modalidad', 'NombreBeca', ['Institucion', 'Departamento']).reset_index()
     
     modalidades.columns = ['Modalidad', 'TotalBecas', 'Instituciones', 'Departamentos']
     modalidades = modalidades.sort_values('TotalBecas', ascending=False)
@@ -102,17 +113,13 @@ def crear_hoja_modalidades_2025():
     return modalidades
 
 
-def crear_hoja_estratos_2025():
+def crear_hoja_estratos_2025(datos):
     """Crea hoja con análisis por estrato socioeconómico"""
     print("\nGenerando Hoja: Estratos Socioeconómicos 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    cubo = datos.cubo
     
-    estratos = df.groupby('Estrato_socioeconomico').agg({
-        'NombreBeca': 'count',
-        'Institucion': 'nunique',
-        'Departamento': 'nunique'
-    }).reset_index()
+    estratos = cubo.resumen_por('Estrato_socioeconomico', 'NombreBeca', ['Institucion', 'Departamento']).reset_index()
     
     estratos.columns = ['Estrato_Socioeconomico', 'TotalBecas', 'Instituciones', 'Departamentos']
     estratos = estratos.sort_values('TotalBecas', ascending=False)
@@ -125,17 +132,13 @@ def crear_hoja_estratos_2025():
     return estratos
 
 
-def crear_hoja_migracion_2025():
+def crear_hoja_migracion_2025(datos):
     """Crea hoja con análisis de migración"""
     print("\nGenerando Hoja: Análisis Migración 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    cubo = datos.cubo
     
-    migracion = df.groupby('Migracion').agg({
-        'NombreBeca': 'count',
-        'Institucion': 'nunique',
-        'Departamento': 'nunique'
-    }).reset_index()
+    migracion = cubo.resumen_por('Migracion', 'NombreBeca', ['Institucion', 'Departamento']).reset_index()
     
     migracion.columns = ['Tipo_Migracion', 'TotalBecas', 'Instituciones', 'Departamentos']
     
@@ -154,11 +157,11 @@ def crear_hoja_migracion_2025():
     return migracion
 
 
-def crear_hoja_becas_detalle_2025():
+def crear_hoja_becas_detalle_2025(datos):
     """Crea hoja con detalle de cada programa de becas"""
     print("\nGenerando Hoja: Detalle Programas Becas 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    df = datos.df
     
     becas = df.groupby('NombreBeca').agg({
         'Institucion': 'nunique',
@@ -179,43 +182,39 @@ def crear_hoja_becas_detalle_2025():
     return becas
 
 
-def crear_hoja_carreras_2025():
+def agregar_carreras(df):
+    """Programas, instituciones distintas y total de becas por carrera"""
+    carreras = agregar_por(
+        df, 'Carrera',
+        ProgramasBecas=('NombreBeca', 'unir'),
+        Instituciones=('Institucion', 'nunique'),
+        TotalBecas=('AnioBecariosConfirmados', 'count')
+    )
+    return carreras.sort_values('TotalBecas', ascending=False)
+
+
+def crear_hoja_carreras_2025(datos):
     """Crea hoja con análisis por carrera"""
     print("\nGenerando Hoja: Carreras 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    df = datos.df
     
     # Filtrar carreras específicas (no genéricas)
     df_carreras = df[~df['Carrera'].str.contains('Todas las carreras|Según modalidad|Variable', case=False, na=False)]
     
     if len(df_carreras) > 0:
-        carreras = df_carreras.groupby('Carrera').agg({
-            'NombreBeca': lambda x: ', '.join(x.unique()),
-            'Institucion': 'nunique',
-            'AnioBecariosConfirmados': 'count'
-        }).reset_index()
-        
-        carreras.columns = ['Carrera', 'ProgramasBecas', 'Instituciones', 'TotalBecas']
-        carreras = carreras.sort_values('TotalBecas', ascending=False)
+        carreras = agregar_carreras(df_carreras)
         
         print(f"  ✓ {len(carreras)} carreras específicas")
     else:
-        carreras = pd.DataFrame(columns=['Carrera', 'ProgramasBecas', 'Instituciones', 'TotalBecas'])
         print("  ⚠ No hay carreras específicas, usando todas las carreras")
         
-        carreras = df.groupby('Carrera').agg({
-            'NombreBeca': lambda x: ', '.join(x.unique()),
-            'Institucion': 'nunique',
-            'AnioBecariosConfirmados': 'count'
-        }).reset_index()
-        
-        carreras.columns = ['Carrera', 'ProgramasBecas', 'Instituciones', 'TotalBecas']
-        carreras = carreras.sort_values('TotalBecas', ascending=False)
+        carreras = agregar_carreras(df)
     
     return carreras
 
 
-def crear_hoja_beca18_detalle_2025():
+def crear_hoja_beca18_detalle_2025(datos):
     """Crea hoja específica para Beca 18 con todas sus modalidades"""
     print("\nGenerando Hoja: Beca 18 Detalle 2025...")
     
@@ -224,14 +223,13 @@ def crear_hoja_beca18_detalle_2025():
         df_2025 = df[df['convocatoria'] == 2025].copy()
         
         # Análisis por modalidad
-        beca18_modalidad = df_2025.groupby('modalidad').agg({
-            'nombre_universidad': 'nunique',
-            'ubicacion': lambda x: x.dropna().nunique(),
-            'tipo_universidad': lambda x: ', '.join(x.unique())
-        }).reset_index()
-        
-        beca18_modalidad.columns = ['Modalidad', 'UniversidadesUnicas', 'UbicacionesUnicas', 'TipoUniversidad']
-        beca18_modalidad['TotalRegistros'] = df_2025.groupby('modalidad').size().values
+        beca18_modalidad = agregar_por(
+            df_2025, 'modalidad',
+            UniversidadesUnicas=('nombre_universidad', 'nunique'),
+            UbicacionesUnicas=('ubicacion', 'nunique'),
+            TipoUniversidad=('tipo_universidad', 'unir'),
+            TotalRegistros=(None, 'size')
+        ).rename(columns={'modalidad': 'Modalidad'})
         
         print(f"  ✓ {len(beca18_modalidad)} modalidades de Beca 18")
         return beca18_modalidad
@@ -240,7 +238,7 @@ def crear_hoja_beca18_detalle_2025():
         return pd.DataFrame()
 
 
-def crear_hoja_beca_tec_detalle_2025():
+def crear_hoja_beca_tec_detalle_2025(datos):
     """Crea hoja específica para Beca Tec"""
     print("\nGenerando Hoja: Beca Tec Detalle 2025...")
     
@@ -263,11 +261,11 @@ def crear_hoja_beca_tec_detalle_2025():
         return pd.DataFrame()
 
 
-def crear_hoja_resumen_ejecutivo_2025():
+def crear_hoja_resumen_ejecutivo_2025(datos):
     """Crea hoja con resumen ejecutivo y KPIs"""
     print("\nGenerando Hoja: Resumen Ejecutivo 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    df = datos.df
     
     # Crear resumen con KPIs
     resumen = pd.DataFrame({
@@ -295,10 +293,11 @@ def crear_hoja_resumen_ejecutivo_2025():
             df['Departamento'].nunique(),
             df['Modalidad'].nunique(),
             df['Carrera'].nunique(),
-            df['NombreBeca'].value_counts().index[0],
-            df['Departamento'].value_counts().index[0],
-            df['Modalidad'].value_counts().index[0],
-            df['Estrato_socioeconomico'].value_counts().index[0],
+            # Del cubo: con categóricas value_counts desempata por categoría y no por aparición
+            datos.cubo.conteos('NombreBeca').index[0],
+            datos.cubo.conteos('Departamento').index[0],
+            datos.cubo.conteos('Modalidad').index[0],
+            datos.cubo.conteos('Estrato_socioeconomico').index[0],
             f"{(df['Migracion'].str.contains('Posible migración|Internacional').sum() / len(df) * 100):.1f}%",
             f"{(df['Migracion'].str.contains('Sin migración|Sin especificar').sum() / len(df) * 100):.1f}%",
             df['Migracion'].str.contains('Internacional').sum(),
@@ -311,14 +310,14 @@ def crear_hoja_resumen_ejecutivo_2025():
     return resumen
 
 
-def crear_hoja_matriz_beca_departamento_2025():
+def crear_hoja_matriz_beca_departamento_2025(datos):
     """Crea matriz cruzada de Becas vs Departamentos"""
     print("\nGenerando Hoja: Matriz Beca-Departamento 2025...")
     
-    df = pd.read_csv('dashboard_becas_2025_consolidado.csv')
+    cubo = datos.cubo
     
     # Crear tabla pivote
-    matriz = pd.crosstab(df['NombreBeca'], df['Departamento'])
+    matriz = cubo.tabla_cruzada('NombreBeca', 'Departamento')
     
     # Ordenar por total
     matriz['Total'] = matriz.sum(axis=1)
@@ -331,8 +330,53 @@ def crear_hoja_matriz_beca_departamento_2025():
     return matriz
 
 
-def generar_excel_completo():
+# Hojas del libro en orden: (nombre, constructor, escribir índice, omitir si queda vacía)
+HOJAS_2025 = [
+    ('Becas 2025', crear_hoja_principal, False, False),
+    ('Resumen 2025', crear_hoja_resumen_ejecutivo_2025, False, False),
+    ('Instituciones 2025', crear_hoja_instituciones_2025, False, False),
+    ('Departamentos 2025', crear_hoja_departamentos_2025, False, False),
+    ('Modalidades 2025', crear_hoja_modalidades_2025, False, False),
+    ('Estratos 2025', crear_hoja_estratos_2025, False, False),
+    ('Migracion 2025', crear_hoja_migracion_2025, False, False),
+    ('Programas Becas 2025', crear_hoja_becas_detalle_2025, False, False),
+    ('Carreras 2025', crear_hoja_carreras_2025, False, False),
+    ('Beca18 Detalle 2025', crear_hoja_beca18_detalle_2025, False, True),
+    ('BecaTec Detalle 2025', crear_hoja_beca_tec_detalle_2025, False, True),
+    ('Matriz Beca-Depto 2025', crear_hoja_matriz_beca_departamento_2025, True, False),
+]
+
+
+def generar_hojas(datos):
+    """
+    Genera las hojas de a una (nombre, DataFrame, índice, segundos de construcción):
+    solo una está en memoria a la vez
+    """
+    for nombre, constructor, indice, opcional in HOJAS_2025:
+        inicio = time.perf_counter()
+        df = constructor(datos)
+        segundos = time.perf_counter() - inicio
+        if opcional and df.empty:
+            continue
+        yield nombre, df, indice, segundos
+
+
+def imprimir_tiempos(tiempos):
+    """Resumen por hoja: filas, tiempo de construcción y de escritura"""
+    print("\nTiempos por hoja:")
+    print(f"  {'Hoja':<26}{'Filas':>9}{'Construir':>11}{'Escribir':>10}")
+    for nombre, filas, construir, escribir in tiempos:
+        print(f"  {nombre:<26}{filas:>9}{construir:>10.2f}s{escribir:>9.2f}s")
+    total_construir = sum(t[2] for t in tiempos)
+    total_escribir = sum(t[3] for t in tiempos)
+    print(f"  {'Total':<26}{'':>9}{total_construir:>10.2f}s{total_escribir:>9.2f}s")
+
+
+def generar_excel_completo(modo='streaming'):
     """Genera el archivo Excel con todas las hojas"""
+    if modo not in MODOS_ESCRITURA:
+        raise ValueError(f"Modo de escritura desconocido: {modo} (opciones: {', '.join(MODOS_ESCRITURA)})")
+    
     print("╔══════════════════════════════════════════════════════════════╗")
     print("║     GENERACIÓN DE EXCEL PARA POWER BI - BECAS 2025          ║")
     print("╚══════════════════════════════════════════════════════════════╝")
@@ -340,58 +384,28 @@ def generar_excel_completo():
     
     archivo_salida = 'Dashboard_Becas_PowerBI_2025.xlsx'
     
+    # Cargar una sola vez los datos que usan todas las hojas
+    inicio = time.perf_counter()
+    datos = DatosLibro()
+    tiempos = [('(carga de datos)', len(datos.df), time.perf_counter() - inicio, 0.0)]
+    
     # Crear archivo Excel con múltiples hojas
-    with pd.ExcelWriter(archivo_salida, engine='openpyxl') as writer:
-        
-        # 1. Hoja Principal
-        df_principal = crear_hoja_principal()
-        df_principal.to_excel(writer, sheet_name='Becas 2025', index=False)
-        
-        # 2. Resumen Ejecutivo
-        df_resumen = crear_hoja_resumen_ejecutivo_2025()
-        df_resumen.to_excel(writer, sheet_name='Resumen 2025', index=False)
-        
-        # 3. Instituciones
-        df_instituciones = crear_hoja_instituciones_2025()
-        df_instituciones.to_excel(writer, sheet_name='Instituciones 2025', index=False)
-        
-        # 4. Departamentos
-        df_departamentos = crear_hoja_departamentos_2025()
-        df_departamentos.to_excel(writer, sheet_name='Departamentos 2025', index=False)
-        
-        # 5. Modalidades
-        df_modalidades = crear_hoja_modalidades_2025()
-        df_modalidades.to_excel(writer, sheet_name='Modalidades 2025', index=False)
-        
-        # 6. Estratos Socioeconómicos
-        df_estratos = crear_hoja_estratos_2025()
-        df_estratos.to_excel(writer, sheet_name='Estratos 2025', index=False)
-        
-        # 7. Migración
-        df_migracion = crear_hoja_migracion_2025()
-        df_migracion.to_excel(writer, sheet_name='Migracion 2025', index=False)
-        
-        # 8. Detalle de Becas
-        df_becas = crear_hoja_becas_detalle_2025()
-        df_becas.to_excel(writer, sheet_name='Programas Becas 2025', index=False)
-        
-        # 9. Carreras
-        df_carreras = crear_hoja_carreras_2025()
-        df_carreras.to_excel(writer, sheet_name='Carreras 2025', index=False)
-        
-        # 10. Beca 18 Detalle
-        df_beca18 = crear_hoja_beca18_detalle_2025()
-        if not df_beca18.empty:
-            df_beca18.to_excel(writer, sheet_name='Beca18 Detalle 2025', index=False)
-        
-        # 11. Beca Tec Detalle
-        df_beca_tec = crear_hoja_beca_tec_detalle_2025()
-        if not df_beca_tec.empty:
-            df_beca_tec.to_excel(writer, sheet_name='BecaTec Detalle 2025', index=False)
-        
-        # 12. Matriz Beca-Departamento
-        df_matriz = crear_hoja_matriz_beca_departamento_2025()
-        df_matriz.to_excel(writer, sheet_name='Matriz Beca-Depto 2025')
+    if modo == 'streaming':
+        with LibroStreaming(archivo_salida) as libro:
+            for nombre, df, indice, construir in generar_hojas(datos):
+                inicio = time.perf_counter()
+                libro.agregar_hoja(nombre, df, index=indice)
+                tiempos.append((nombre, len(df), construir, time.perf_counter() - inicio))
+            inicio = time.perf_counter()
+        tiempos.append(('(guardar libro)', 0, 0.0, time.perf_counter() - inicio))
+    else:
+        with pd.ExcelWriter(archivo_salida, engine='openpyxl') as writer:
+            for nombre, df, indice, construir in generar_hojas(datos):
+                inicio = time.perf_counter()
+                df.to_excel(writer, sheet_name=nombre, index=indice)
+                tiempos.append((nombre, len(df), construir, time.perf_counter() - inicio))
+            inicio = time.perf_counter()
+        tiempos.append(('(guardar libro)', 0, 0.0, time.perf_counter() - inicio))
     
     print("\n" + "="*70)
     print("✓ ARCHIVO EXCEL GENERADO EXITOSAMENTE")
@@ -411,6 +425,8 @@ def generar_excel_completo():
     print(" 11. BecaTec Detalle 2025 - Detalle específico Beca Tec")
     print(" 12. Matriz Beca-Depto 2025 - Tabla cruzada")
     
+    imprimir_tiempos(tiempos)
+    
     print("\n¡Listo para importar en Power BI!")
     
     return archivo_salida
@@ -440,13 +456,18 @@ def verificar_dependencias():
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Generar Excel para Power BI - Becas 2025")
+    parser.add_argument("--modo", choices=MODOS_ESCRITURA, default='streaming',
+                        help="streaming (memoria constante, por defecto) u openpyxl (pd.ExcelWriter)")
+    args = parser.parse_args()
+    
     print("\n")
     
     # Verificar dependencias
     verificar_dependencias()
     
     # Generar Excel
-    archivo = generar_excel_completo()
+    archivo = generar_excel_completo(args.modo)
     
     print("\n" + "="*70)
     print("PROCESO COMPLETADO")
@@ -12,6 +12,25 @@ Requisitos:
   Para OneDrive: GRAPH_USER_UPN = usuario@dominio.com
   Para SharePoint: SHAREPOINT_SITE_ID, SHAREPOINT_DRIVE_ID
   Opcional: GRAPH_AUTH = app | device (device permite login interactivo del usuario para OneDrive)
+  Opcional: GRAPH_UPLOAD_WORKERS = 4 (archivos subidos en paralelo)
+  Opcional: GRAPH_CHUNK_SIZE = 3276800 (bytes por fragmento en sesiones de carga, múltiplo de 320 KiB)
+  Opcional: GRAPH_BASE_URL (por defecto https://graph.microsoft.com/v1.0; permite apuntar a un servidor de prueba)
+  Opcional: MSAL_CACHE_DIR, MSAL_CACHE_KEY (caché cifrada de tokens compartida, ver cache_tokens.py)
+
+Archivos de hasta 4 MiB se suben con un PUT simple; los más grandes con una
+sesión de carga (createUploadSession) por fragmentos, que se reanuda desde
+el último fragmento recibido si uno falla.
+
+Solo se suben los archivos nuevos o cambiados: el manifiesto local
+(manifiesto_sync.py) guarda el SHA-256 de cada archivo subido y el
+eTag/quickXorHash que devolvió Graph, y se compara con el listado actual de
+la carpeta en la nube. Con --simular solo se muestra qué se subiría.
+
+Los IDs de las carpetas de destino se guardan en .graph_carpetas.json, así
+que en las siguientes ejecuciones no se consulta la carpeta nivel por nivel;
+si un ID guardado ya no existe (404) se descarta y se vuelve a resolver. Las
+carpetas que faltan se comprueban y crean con Graph $batch: una petición
+para todos los niveles en lugar de una por nivel.
 
 Permisos:
 - App-only (GRAPH_AUTH=app):
@@ -20,16 +39,31 @@ Permisos:
 - User (GRAPH_AUTH=device, solo OneDrive):
   - Delegados: Files.ReadWrite (normalmente sin admin consent)
 """
+import argparse
+import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
 import requests
-from msal import ConfidentialClientApplication, PublicClientApplication
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.cache_descargas import escribir_atomico
+from cache_tokens import token_aplicacion, token_usuario
+from manifiesto_sync import ManifiestoSync
+
 load_dotenv()
 
 GRAPH_SCOPE = ["https://graph.microsoft.com/.default"]
-BASE_URL = "https://graph.microsoft.com/v1.0"
+BASE_URL = os.getenv("GRAPH_BASE_URL", "https://graph.microsoft.com/v1.0").rstrip("/")
 
 TENANT_ID = os.getenv("TENANT_ID")
 CLIENT_ID = os.getenv("CLIENT_ID")
@@ -41,16 +75,39 @@ SITE_ID = os.getenv("SHAREPOINT_SITE_ID")
 DRIVE_ID = os.getenv("SHAREPOINT_DRIVE_ID")
 AUTH_MODE = os.getenv("GRAPH_AUTH", "app").lower()
 
+UPLOAD_WORKERS = max(1, int(os.getenv("GRAPH_UPLOAD_WORKERS", "4")))
+# Graph exige fragmentos múltiplos de 320 KiB (máximo 60 MiB)
+CHUNK_UNIT = 320 * 1024
+CHUNK_SIZE = min(max(CHUNK_UNIT, int(os.getenv("GRAPH_CHUNK_SIZE", str(10 * CHUNK_UNIT))) // CHUNK_UNIT * CHUNK_UNIT),
+                 60 * 1024 * 1024)
+SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+MAX_RETRIES = 5
+TIMEOUT = (10, 120)
+# Graph acepta hasta 20 peticiones por $batch
+BATCH_LIMIT = 20
+FOLDER_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".graph_carpetas.json")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Sesión HTTP compartida: reutiliza conexiones (un pool por host del tamaño del thread pool)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=UPLOAD_WORKERS, pool_maxsize=UPLOAD_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
 
 def get_token_app() -> str:
     if not all([TENANT_ID, CLIENT_ID, CLIENT_SECRET]):
         raise RuntimeError("Faltan TENANT_ID/CLIENT_ID/CLIENT_SECRET en entorno")
-    app = ConfidentialClientApplication(
-        CLIENT_ID,
-        authority=f"https://login.microsoftonline.com/{TENANT_ID}",
-        client_credential=CLIENT_SECRET,
-    )
-    res = app.acquire_token_for_client(scopes=GRAPH_SCOPE)
+    res = token_aplicacion(TENANT_ID, CLIENT_ID, CLIENT_SECRET, GRAPH_SCOPE)
     if "access_token" not in res:
         raise RuntimeError(f"No se pudo obtener token Graph (app-only): {res}")
     return res["access_token"]
@@ -59,19 +116,8 @@ def get_token_app() -> str:
 def get_token_device() -> str:
     if not all([TENANT_ID, CLIENT_ID]):
         raise RuntimeError("Faltan TENANT_ID/CLIENT_ID para login de usuario")
-    pca = PublicClientApplication(
-        CLIENT_ID,
-        authority=f"https://login.microsoftonline.com/{TENANT_ID}",
-    )
-    # Solo OneDrive con permisos delegados del usuario
-    scopes = ["Files.ReadWrite"]
-    flow = pca.initiate_device_flow(scopes=scopes)
-    if not flow or "user_code" not in flow:
-        raise RuntimeError("No se pudo iniciar el device code flow")
-    print("Autenticación de usuario requerida. Ve a https://microsoft.com/devicelogin y pega este código:")
-    print(flow["user_code"])
-    print("Luego vuelve aquí. Esperando confirmación...")
-    res = pca.acquire_token_by_device_flow(flow)
+    # Solo OneDrive con permisos delegados del usuario; el código se pide solo si no hay sesión en caché
+    res = token_usuario(TENANT_ID, CLIENT_ID, ["Files.ReadWrite"])
     if "access_token" not in res:
         raise RuntimeError(f"No se pudo obtener token Graph (device): {res}")
     return res["access_token"]
@@ -85,70 +131,358 @@ def get_token() -> str:
     return get_token_app()
 
 
-def drive_root_url() -> str:
+@lru_cache(maxsize=None)
+def drive_path() -> str:
+    """Ruta del drive relativa a la versión de la API (como la piden las peticiones de $batch)"""
     if TARGET == "onedrive":
         if not USER_UPN:
             raise RuntimeError("GRAPH_USER_UPN es requerido para OneDrive")
-        return f"{BASE_URL}/users/{USER_UPN}/drive"
+        return f"/users/{USER_UPN}/drive"
     if TARGET == "sharepoint":
         if not SITE_ID or not DRIVE_ID:
             raise RuntimeError("SHAREPOINT_SITE_ID y SHAREPOINT_DRIVE_ID requeridos para SharePoint")
-        return f"{BASE_URL}/sites/{SITE_ID}/drives/{DRIVE_ID}"
+        return f"/sites/{SITE_ID}/drives/{DRIVE_ID}"
     raise RuntimeError("GRAPH_TARGET debe ser 'onedrive' o 'sharepoint'")
 
 
-def ensure_folder(token: str, folder_path: str) -> None:
+def drive_root_url() -> str:
+    return f"{BASE_URL}{drive_path()}"
+
+
+class FolderCache:
+    """IDs de las carpetas ya resueltas en la nube, por drive; se guardan entre ejecuciones"""
+
+    def __init__(self, path: str = FOLDER_CACHE_FILE):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._all = json.load(f)
+        except (OSError, ValueError):
+            self._all = {}
+        self.ids = self._all.setdefault(drive_root_url(), {})
+
+    def get(self, folder: str) -> Optional[str]:
+        return self.ids.get(folder.strip("/"))
+
+    def set(self, folder: str, item_id: str) -> None:
+        self.ids[folder.strip("/")] = item_id
+
+    def invalidate(self, folder: str) -> None:
+        """Descarta la carpeta y sus subcarpetas (su ID ya no existe en la nube)"""
+        folder = folder.strip("/")
+        for key in [k for k in self.ids if k == folder or k.startswith(folder + "/")]:
+            del self.ids[key]
+
+    def save(self) -> None:
+        escribir_atomico(Path(self.path), json.dumps(self._all, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def graph_batch(token: str, requests_: list) -> dict:
+    """Envía hasta BATCH_LIMIT peticiones en un solo POST /$batch; devuelve {id: respuesta}"""
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    r = get_session().post(f"{BASE_URL}/$batch", headers=headers, json={"requests": requests_}, timeout=TIMEOUT)
+    r.raise_for_status()
+    return {resp["id"]: resp for resp in r.json().get("responses", [])}
+
+
+def _folder_url(folder: str, suffix: str = "") -> str:
+    """URL relativa (para $batch) de una carpeta por ruta; '' es la raíz del drive"""
+    if not folder:
+        return f"{drive_path()}/root{'/' + suffix if suffix else ''}"
+    return f"{drive_path()}/root:/{quote(folder)}{':/' + suffix if suffix else ''}"
+
+
+def lookup_folders(token: str, levels: list) -> dict:
+    """{ruta: id} de las carpetas que existen, consultando todos los niveles en un $batch"""
+    ids = {}
+    for start in range(0, len(levels), BATCH_LIMIT):
+        chunk = levels[start:start + BATCH_LIMIT]
+        responses = graph_batch(token, [
+            {"id": str(i), "method": "GET", "url": f"{_folder_url(level)}?$select=id"}
+            for i, level in enumerate(chunk)
+        ])
+        for i, level in enumerate(chunk):
+            resp = responses.get(str(i), {})
+            if resp.get("status") == 200:
+                ids[level] = resp["body"]["id"]
+            elif resp.get("status") != 404:
+                raise RuntimeError(f"No se pudo comprobar carpeta '{level}': {resp.get('status')} {resp.get('body')}")
+    return ids
+
+
+def create_folders(token: str, missing: list) -> dict:
+    """
+    Crea las carpetas que faltan (de la menos a la más profunda) en un $batch,
+    cada una después de su padre (dependsOn). Devuelve {ruta: id}; None si
+    alguna ya existía (otro proceso la creó entre la consulta y la creación).
+    """
+    ids = {}
+    for start in range(0, len(missing), BATCH_LIMIT):
+        chunk = missing[start:start + BATCH_LIMIT]
+        batch = []
+        for i, folder in enumerate(chunk):
+            parent, _, name = folder.rpartition("/")
+            request = {
+                "id": str(i), "method": "POST", "url": _folder_url(parent, "children"),
+                "headers": {"Content-Type": "application/json"},
+                "body": {"name": name, "folder": {}, "@microsoft.graph.conflictBehavior": "fail"},
+            }
+            if i:
+                request["dependsOn"] = [str(i - 1)]
+            batch.append(request)
+        responses = graph_batch(token, batch)
+        for i, folder in enumerate(chunk):
+            resp = responses.get(str(i), {})
+            if resp.get("status") == 201:
+                ids[folder] = resp["body"]["id"]
+            elif resp.get("status") in (409, 424):
+                return None
+            else:
+                raise RuntimeError(f"No se pudo crear carpeta '{folder}': {resp.get('status')} {resp.get('body')}")
+    return ids
+
+
+def ensure_folder(token: str, folder_path: str, cache: Optional[FolderCache] = None,
+                  create: bool = True) -> Optional[str]:
+    """
+    ID de la carpeta en la nube, creándola con sus padres si falta.
+    Con create=False devuelve None si no existe.
+    """
     path = folder_path.strip("/")
     if not path:
-        return
+        return "root"
+    if cache is not None and cache.get(path):
+        return cache.get(path)
     parts = path.split("/")
-    parent = ""
-    for name in parts:
-        current = f"{parent}/{name}" if parent else name
-        # Comprobar existencia
-        check_url = f"{drive_root_url()}/root:/{current}"
-        r = requests.get(check_url, headers=headers)
-        if r.status_code == 404:
-            # Crear dentro del padre
-            if parent:
-                create_url = f"{drive_root_url()}/root:/{parent}:/children"
-            else:
-                create_url = f"{drive_root_url()}/root/children"
-            body = {"name": name, "folder": {}, "@microsoft.graph.conflictBehavior": "fail"}
-            r2 = requests.post(create_url, headers=headers, json=body)
-            if r2.status_code not in (201, 409):
-                raise RuntimeError(f"No se pudo crear carpeta '{current}': {r2.status_code} {r2.text}")
-        parent = current
+    levels = ["/".join(parts[:i + 1]) for i in range(len(parts))]
+    for _ in range(2):
+        ids = lookup_folders(token, levels)
+        missing = [level for level in levels if level not in ids]
+        if missing and not create:
+            return None
+        created = create_folders(token, missing) if missing else {}
+        if created is not None:
+            ids.update(created)
+            break
+    else:
+        raise RuntimeError(f"No se pudo crear carpeta '{path}': conflicto con otra creación")
+    if cache is not None:
+        for level, item_id in ids.items():
+            cache.set(level, item_id)
+    return ids[path]
 
 
-def upload_file(token: str, local_path: str, cloud_folder: str) -> None:
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/octet-stream"}
+def cloud_path_for(local_path: str, cloud_folder: str) -> str:
     fname = os.path.basename(local_path)
-    cloud_path = f"{cloud_folder.strip('/')}/{fname}" if cloud_folder else fname
+    return f"{cloud_folder.strip('/')}/{fname}" if cloud_folder.strip("/") else fname
+
+
+def upload_small_file(token: str, local_path: str, cloud_path: str) -> dict:
+    """PUT simple a /content (archivos de hasta 4 MiB)"""
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/octet-stream"}
     url = f"{drive_root_url()}/root:/{cloud_path}:/content"
     with open(local_path, "rb") as f:
-        r = requests.put(url, headers=headers, data=f)
+        r = get_session().put(url, headers=headers, data=f, timeout=TIMEOUT)
     if r.status_code not in (200, 201):
-        raise RuntimeError(f"Error subiendo {fname}: {r.status_code} {r.text}")
-    item = r.json()
+        raise RuntimeError(f"Error subiendo {os.path.basename(local_path)}: {r.status_code} {r.text}")
+    return r.json()
+
+
+def create_upload_session(token: str, cloud_path: str) -> str:
+    """Crea una sesión de carga y devuelve su uploadUrl"""
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    url = f"{drive_root_url()}/root:/{cloud_path}:/createUploadSession"
+    body = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+    r = get_session().post(url, headers=headers, json=body, timeout=TIMEOUT)
+    if r.status_code != 200:
+        raise RuntimeError(f"No se pudo crear la sesión de carga para '{cloud_path}': {r.status_code} {r.text}")
+    return r.json()["uploadUrl"]
+
+
+def next_expected_offset(upload_url: str) -> Optional[int]:
+    """Primer byte que falta según la sesión (None si la sesión ya no existe)"""
+    r = get_session().get(upload_url, timeout=TIMEOUT)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    ranges = r.json().get("nextExpectedRanges") or ["0-"]
+    return int(ranges[0].split("-")[0])
+
+
+def _retry_delay(r: Optional[requests.Response], attempt: int) -> float:
+    if r is not None and r.headers.get("Retry-After", "").isdigit():
+        return float(r.headers["Retry-After"])
+    return min(2 ** attempt, 30)
+
+
+def upload_large_file(token: str, local_path: str, cloud_path: str) -> dict:
+    """
+    Sube el archivo por fragmentos de CHUNK_SIZE en una sesión de carga.
+    Si un fragmento falla, consulta la sesión y continúa desde el byte que
+    falta; si la sesión expiró, crea otra y empieza de nuevo.
+    """
+    fname = os.path.basename(local_path)
+    size = os.path.getsize(local_path)
+    upload_url = create_upload_session(token, cloud_path)
+    offset = 0
+    failures = 0
+    with open(local_path, "rb") as f:
+        while True:
+            f.seek(offset)
+            chunk = f.read(CHUNK_SIZE)
+            end = offset + len(chunk) - 1
+            # uploadUrl ya está autorizada: no lleva el token
+            headers = {"Content-Length": str(len(chunk)), "Content-Range": f"bytes {offset}-{end}/{size}"}
+            r = None
+            try:
+                r = get_session().put(upload_url, headers=headers, data=chunk, timeout=TIMEOUT)
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if r.status_code in (200, 201):
+                    return r.json()
+                if r.status_code == 202:
+                    ranges = r.json().get("nextExpectedRanges")
+                    offset = int(ranges[0].split("-")[0]) if ranges else end + 1
+                    failures = 0
+                    continue
+                error = f"{r.status_code} {r.text[:200]}"
+
+            failures += 1
+            if failures > MAX_RETRIES:
+                raise RuntimeError(f"Error subiendo {fname} (bytes {offset}-{end}): {error}")
+            print(f"  ⚠ {fname}: fragmento {offset}-{end} falló ({error}); reintento {failures}/{MAX_RETRIES}")
+            time.sleep(_retry_delay(r, failures))
+            try:
+                resumed = None if r is not None and r.status_code == 404 else next_expected_offset(upload_url)
+            except requests.RequestException:
+                continue  # se reintenta el mismo fragmento
+            if resumed is None:
+                upload_url = create_upload_session(token, cloud_path)
+                offset = 0
+            else:
+                offset = resumed
+
+
+def upload_file(token: str, local_path: str, cloud_folder: str) -> dict:
+    fname = os.path.basename(local_path)
+    cloud_path = cloud_path_for(local_path, cloud_folder)
+    if os.path.getsize(local_path) <= SIMPLE_UPLOAD_LIMIT:
+        item = upload_small_file(token, local_path, cloud_path)
+    else:
+        item = upload_large_file(token, local_path, cloud_path)
     print(f"✓ Subido {fname} -> {item.get('webUrl')}")
+    return item
+
+
+def remote_state(item: dict) -> dict:
+    """Lo que se compara del archivo en la nube: eTag y hashes de contenido"""
+    hashes = (item.get("file") or {}).get("hashes") or {}
+    return {"eTag": item.get("eTag"), "quickXorHash": hashes.get("quickXorHash"),
+            "sha1Hash": hashes.get("sha1Hash")}
+
+
+def list_remote_files(token: str, folder_id: str) -> Optional[dict]:
+    """{nombre: estado remoto} de los archivos de la carpeta en la nube (None si el ID no existe)"""
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"{drive_root_url()}/items/{folder_id}/children?$select=name,eTag,file,size&$top=999"
+    remote = {}
+    while url:
+        r = get_session().get(url, headers=headers, timeout=TIMEOUT)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        data = r.json()
+        for item in data.get("value", []):
+            if "file" in item:
+                remote[item["name"]] = remote_state(item)
+        url = data.get("@odata.nextLink")
+    return remote
+
+
+def upload_files(token: str, paths: list, cloud_folder: str, workers: int = UPLOAD_WORKERS,
+                 manifest: Optional[ManifiestoSync] = None) -> list:
+    """Sube varios archivos en paralelo; devuelve [(archivo, error)] de los que fallaron"""
+    errores = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(upload_file, token, path, cloud_folder): path for path in paths}
+        for futuro in as_completed(futuros):
+            try:
+                item = futuro.result()
+                if manifest is not None:
+                    manifest.registrar(futuros[futuro], remote_state(item))
+            except Exception as e:
+                fname = os.path.basename(futuros[futuro])
+                print(f"✗ {fname}: {e}")
+                errores.append((fname, str(e)))
+    return errores
+
+
+def open_folder(token: str, cloud_folder: str, cache: FolderCache, create: bool = True) -> dict:
+    """Resuelve (o crea) la carpeta en la nube y devuelve sus archivos ({} si no existe y create=False)"""
+    for _ in range(2):
+        folder_id = ensure_folder(token, cloud_folder, cache, create=create)
+        if folder_id is None:
+            return {}
+        remote = list_remote_files(token, folder_id)
+        if remote is not None:
+            return remote
+        # El ID guardado ya no existe (carpeta borrada o movida): se vuelve a resolver por ruta
+        print(f"⚠ La carpeta {cloud_folder} cambió en la nube; se vuelve a resolver")
+        cache.invalidate(cloud_folder)
+    raise RuntimeError(f"No se pudo abrir la carpeta '{cloud_folder}' en la nube")
+
+
+def pending_uploads(paths: list, remote: dict, manifest: ManifiestoSync, force: bool = False) -> list:
+    """[(ruta, motivo)] de los archivos que hay que subir"""
+    pending = []
+    for path in paths:
+        reason = "forzado" if force else manifest.motivo(path, remote.get(os.path.basename(path)),
+                                                         verificar_remoto=True)
+        if reason:
+            pending.append((path, reason))
+    return pending
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Subir .csv/.json a OneDrive o SharePoint (solo cambios)")
+    parser.add_argument("--simular", action="store_true", help="Solo mostrar qué archivos se subirían")
+    parser.add_argument("--forzar", action="store_true", help="Subir todos los archivos aunque no hayan cambiado")
+    args = parser.parse_args()
+
     token = get_token()
     print(f"Destino: {TARGET} | Auth: {AUTH_MODE} | Carpeta nube: {CLOUD_FOLDER}")
-    ensure_folder(token, CLOUD_FOLDER)
-    base = os.path.dirname(__file__)
-    nombres = os.listdir(base)
-    to_upload = [os.path.join(base, n) for n in nombres if n.lower().endswith((".json", ".csv"))]
+    base = os.path.dirname(os.path.abspath(__file__))
+    nombres = sorted(os.listdir(base))
+    # Los archivos ocultos (manifiesto de sincronización, estado del pipeline) no son datos
+    to_upload = [os.path.join(base, n) for n in nombres
+                 if n.lower().endswith((".json", ".csv")) and not n.startswith(".")]
     excluir = {"requirements.txt"}
     to_upload = [p for p in to_upload if os.path.basename(p) not in excluir]
     if not to_upload:
         print("No hay archivos .json/.csv para subir.")
         return
-    for path in to_upload:
-        upload_file(token, path, CLOUD_FOLDER)
+
+    folders = FolderCache()
+    try:
+        remote = open_folder(token, CLOUD_FOLDER, folders, create=not args.simular)
+    finally:
+        folders.save()
+    manifest = ManifiestoSync(f"graph:{drive_root_url()}:{CLOUD_FOLDER.strip('/')}")
+    pending = pending_uploads(to_upload, remote, manifest, force=args.forzar)
+    print(f"{len(pending)} de {len(to_upload)} archivos con cambios ({len(to_upload) - len(pending)} sin cambios)")
+    for path, reason in pending:
+        print(f" - {os.path.basename(path)} [{reason}]")
+    if args.simular or not pending:
+        return
+
+    try:
+        errores = upload_files(token, [p for p, _ in pending], CLOUD_FOLDER, manifest=manifest)
+    finally:
+        manifest.guardar()
+    print(f"Subidos {len(pending) - len(errores)}/{len(pending)} archivos")
+    if errores:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
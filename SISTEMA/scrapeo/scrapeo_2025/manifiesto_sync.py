@@ -0,0 +1,79 @@
+"""
+Manifiesto de sincronización para sync_to_onedrive.py y graph_upload.py
+Guarda, por destino, el tamaño, la fecha de modificación y el SHA-256 de cada
+archivo enviado junto con lo que el destino informó (eTag/quickXorHash en
+Graph, tamaño y fecha de la copia en la carpeta sincronizada). En la próxima
+ejecución solo se transfieren los archivos nuevos, los que cambiaron
+localmente y los que cambiaron o faltan en el destino.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import calcular_sha256, escribir_atomico
+
+ARCHIVO_MANIFIESTO = Path(__file__).resolve().parent / '.sync_manifiesto.json'
+
+
+class ManifiestoSync:
+    """Estado de la última transferencia de cada archivo hacia un destino"""
+
+    def __init__(self, destino: str, ruta: Path = ARCHIVO_MANIFIESTO):
+        self.destino = destino
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                self._todos = json.load(f)
+        except (OSError, ValueError):
+            self._todos = {}
+        self.archivos: Dict[str, Dict] = self._todos.setdefault(destino, {})
+
+    def estado_local(self, ruta: Path) -> Dict:
+        """Tamaño, mtime y SHA-256; el hash se reutiliza si tamaño y mtime no cambiaron"""
+        ruta = Path(ruta)
+        stat = ruta.stat()
+        previo = self.archivos.get(ruta.name, {})
+        if previo.get('tamano') == stat.st_size and previo.get('mtime_ns') == stat.st_mtime_ns:
+            sha256 = previo['sha256']
+        else:
+            sha256 = calcular_sha256(ruta)
+        return {'tamano': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+    def motivo(self, ruta: Path, remoto: Optional[Dict] = None, verificar_remoto: bool = False) -> Optional[str]:
+        """
+        Motivo para transferir el archivo, o None si el destino ya lo tiene.
+        Con verificar_remoto=True, remoto es el estado actual en el destino
+        (None si allí no existe) y se compara con el registrado.
+        """
+        previo = self.archivos.get(Path(ruta).name)
+        if previo is None:
+            return 'nuevo'
+        if self.estado_local(ruta)['sha256'] != previo['sha256']:
+            return 'modificado'
+        if verificar_remoto:
+            if remoto is None:
+                return 'falta en destino'
+            registrado = previo.get('remoto') or {}
+            comunes = [k for k in remoto if registrado.get(k) is not None and remoto[k] is not None]
+            # Si hay hash de contenido (quickXorHash) se compara solo eso: el eTag cambia también con los metadatos
+            hashes = [k for k in comunes if k.lower().endswith('hash')]
+            if any(remoto[k] != registrado[k] for k in (hashes or comunes)):
+                return 'cambiado en destino'
+        return None
+
+    def registrar(self, ruta: Path, remoto: Optional[Dict] = None):
+        """Anota una transferencia exitosa (se puede llamar desde varios hilos)"""
+        entrada = self.estado_local(ruta)
+        entrada['remoto'] = remoto or {}
+        with self._lock:
+            self.archivos[Path(ruta).name] = entrada
+
+    def guardar(self):
+        with self._lock:
+            datos = json.dumps(self._todos, indent=2, ensure_ascii=False).encode('utf-8')
+        escribir_atomico(self.ruta, datos)
@@ -0,0 +1,304 @@
+"""
+Ejecución incremental del flujo de datos 2025
+Cada paso declara su comando, sus entradas (datos y código), sus salidas y
+los pasos de los que depende. Antes de ejecutar un paso se calcula su huella
+(SHA-256 del comando, del contenido de las entradas y de las huellas de sus
+dependencias); si coincide con la de la última ejecución exitosa y sus
+salidas existen, el paso se omite. Los pasos independientes corren en
+paralelo.
+
+Los scrapers (pasos de fuente) consultan sitios web, así que solo se
+ejecutan con --fuentes, si cambió su código o si faltan sus salidas.
+
+Uso:
+    python pipeline_2025.py                 # reconstruye lo que cambió
+    python pipeline_2025.py --fuentes       # vuelve a scrapear
+    python pipeline_2025.py --simular       # muestra qué se ejecutaría
+    python pipeline_2025.py --omitir subida refresco --paralelo 4
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_descargas import calcular_sha256, escribir_atomico
+from cubo_conteos import ARCHIVO_CUBO, ARCHIVO_CUBO_CSV
+from dataset_consolidado import ARCHIVO_PARQUET, parquet_disponible
+
+DIR_2025 = Path(__file__).resolve().parent
+ARCHIVO_ESTADO = DIR_2025 / '.pipeline_2025_estado.json'
+
+# Módulos propios que importan los scripts del consolidado en adelante
+MODULOS_DATASET = ['dataset_consolidado.py', 'cubo_conteos.py']
+
+# El consolidado en Parquet y el cubo dependen de pyarrow (opcional); sin él el cubo se guarda en CSV
+SALIDAS_COLUMNARES = [ARCHIVO_PARQUET, ARCHIVO_CUBO] if parquet_disponible() else [ARCHIVO_CUBO_CSV]
+
+
+class Paso:
+    """Un script del flujo con sus entradas, salidas y dependencias (rutas relativas a scrapeo_2025)"""
+
+    def __init__(self, nombre: str, comando: Sequence[str], entradas: Sequence[str] = (),
+                 salidas: Sequence[str] = (), depende_de: Sequence[str] = (), fuente: bool = False):
+        self.nombre = nombre
+        self.comando = list(comando)
+        # El script forma parte de las entradas: si cambia el código, el paso se vuelve a ejecutar
+        self.entradas = [self.comando[0]] + list(entradas)
+        self.salidas = list(salidas)
+        self.depende_de = list(depende_de)
+        self.fuente = fuente
+
+
+INSTITUCIONES_POR_BECA = ['instituciones_beca_18.csv', 'instituciones_beca_tec.csv',
+                          'instituciones_beca_peru.csv', 'instituciones_chevening.csv',
+                          'instituciones_fulbright.csv']
+
+PASOS_2025 = [
+    Paso('beca18', ['beca18_scraper.py'], fuente=True,
+         salidas=['beca18_datos.json', 'beca18_universidades.csv', 'beca18_datos_expandido.csv']),
+    Paso('becas_integrales', ['becas_integrales_scraper.py'], fuente=True,
+         salidas=['becas_integrales_completo.csv', 'becas_integrales_completo.json',
+                  'becas_por_categorias.csv', 'becas_estadisticas.csv']),
+    Paso('becas_instituciones', ['becas_instituciones_scraper.py'], fuente=True,
+         salidas=['becas_instituciones_completo.csv', 'becas_instituciones_completo.json',
+                  'estadisticas_instituciones.json']),
+    # Reescribe las salidas del scraper de instituciones, por eso corre después
+    Paso('instituciones', ['generar_instituciones_becas.py'],
+         entradas=['beca18_universidades.csv'],
+         salidas=['becas_instituciones_completo.csv', 'becas_instituciones_completo.json',
+                  'estadisticas_instituciones.json'] + INSTITUCIONES_POR_BECA,
+         depende_de=['beca18', 'becas_instituciones']),
+    Paso('consolidado', ['extraer_datos_dashboard_2025.py'],
+         entradas=MODULOS_DATASET + ['beca18_datos_expandido.csv', 'becas_integrales_completo.csv']
+                  + INSTITUCIONES_POR_BECA,
+         salidas=['dashboard_becas_2025_consolidado.csv', 'dashboard_becas_2025_consolidado.json',
+                  'estadisticas_dashboard_2025.json'] + SALIDAS_COLUMNARES,
+         depende_de=['beca18', 'becas_integrales', 'instituciones']),
+    Paso('reportes', ['analizar_datos_dashboard.py'],
+         entradas=MODULOS_DATASET + ['dashboard_becas_2025_consolidado.csv'],
+         salidas=['reporte_detallado_por_beca.json', 'reporte_por_departamento.json',
+                  'resumen_ejecutivo_2025.txt', 'dashboard_becas_2025_simplificado.csv'],
+         depende_de=['consolidado']),
+    Paso('excel', ['generar_excel_powerbi_2025.py'],
+         entradas=MODULOS_DATASET + ['escritor_excel.py', 'agregaciones.py',
+                                     'dashboard_becas_2025_consolidado.csv',
+                                     'beca18_datos_expandido.csv', 'instituciones_beca_tec.csv'],
+         salidas=['Dashboard_Becas_PowerBI_2025.xlsx'],
+         depende_de=['consolidado']),
+    # Pasos remotos: sin salidas locales, se repiten solo si cambió lo que suben
+    Paso('subida', ['graph_upload.py'], entradas=['*.csv', '*.json'],
+         depende_de=['reportes', 'excel']),
+    Paso('refresco', ['powerbi_refresh.py', '--workspace', 'My Workspace', '--dataset', 'scraping'],
+         depende_de=['subida']),
+]
+
+
+class HuellasArchivos:
+    """SHA-256 de archivos, reutilizado mientras no cambien tamaño ni fecha de modificación"""
+
+    def __init__(self, guardadas: Optional[Dict] = None):
+        self.guardadas = guardadas or {}
+
+    def huella(self, ruta: Path) -> str:
+        estado = ruta.stat()
+        clave = str(ruta.relative_to(DIR_2025))
+        previa = self.guardadas.get(clave)
+        if previa and previa[0] == estado.st_size and previa[1] == estado.st_mtime_ns:
+            return previa[2]
+        sha256 = calcular_sha256(ruta)
+        self.guardadas[clave] = [estado.st_size, estado.st_mtime_ns, sha256]
+        return sha256
+
+
+def expandir_rutas(patrones: Sequence[str]) -> List[Path]:
+    """Rutas de los patrones (admite comodines) que existen, en orden estable"""
+    rutas = []
+    for patron in patrones:
+        if glob.has_magic(patron):
+            rutas.extend(sorted(Path(p) for p in glob.glob(str(DIR_2025 / patron))))
+        elif (DIR_2025 / patron).exists():
+            rutas.append(DIR_2025 / patron)
+    return rutas
+
+
+def calcular_huella(paso: Paso, huellas: HuellasArchivos, huellas_pasos: Dict[str, str]) -> str:
+    """Huella del paso: comando, contenido de las entradas y huellas de sus dependencias"""
+    h = hashlib.sha256(json.dumps(paso.comando).encode('utf-8'))
+    for ruta in expandir_rutas(paso.entradas):
+        h.update(f"{ruta.name}:{huellas.huella(ruta)}\n".encode('utf-8'))
+    for dependencia in paso.depende_de:
+        h.update(f"{dependencia}:{huellas_pasos.get(dependencia, '')}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def salidas_faltantes(paso: Paso) -> List[str]:
+    return [s for s in paso.salidas if not (DIR_2025 / s).exists()]
+
+
+def cargar_estado(ruta: Path = ARCHIVO_ESTADO) -> Dict:
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'pasos': {}, 'archivos': {}}
+
+
+def guardar_estado(estado: Dict, ruta: Path = ARCHIVO_ESTADO):
+    escribir_atomico(ruta, json.dumps(estado, indent=2, ensure_ascii=False).encode('utf-8'))
+
+
+def ejecutar_paso(paso: Paso) -> Dict:
+    """Corre el script del paso; su salida queda en pipeline_<paso>.log"""
+    inicio = time.perf_counter()
+    with open(DIR_2025 / f"pipeline_{paso.nombre}.log", 'w', encoding='utf-8') as log:
+        proceso = subprocess.run([sys.executable] + paso.comando, cwd=DIR_2025,
+                                 stdout=log, stderr=subprocess.STDOUT,
+                                 env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+    return {'codigo': proceso.returncode, 'segundos': time.perf_counter() - inicio}
+
+
+def ordenar_pasos(pasos: Sequence[Paso]) -> List[Paso]:
+    """Orden topológico; falla si hay dependencias desconocidas o ciclos"""
+    por_nombre = {p.nombre: p for p in pasos}
+    for paso in pasos:
+        for dependencia in paso.depende_de:
+            if dependencia not in por_nombre:
+                raise ValueError(f"El paso '{paso.nombre}' depende de '{dependencia}', que no existe")
+    ordenados, visitados, en_curso = [], set(), set()
+
+    def visitar(paso):
+        if paso.nombre in visitados:
+            return
+        if paso.nombre in en_curso:
+            raise ValueError(f"Ciclo de dependencias en '{paso.nombre}'")
+        en_curso.add(paso.nombre)
+        for dependencia in paso.depende_de:
+            visitar(por_nombre[dependencia])
+        en_curso.discard(paso.nombre)
+        visitados.add(paso.nombre)
+        ordenados.append(paso)
+
+    for paso in pasos:
+        visitar(paso)
+    return ordenados
+
+
+def ejecutar_pipeline(pasos: Sequence[Paso] = PASOS_2025, fuentes: bool = False, forzar: bool = False,
+                      omitir: Sequence[str] = (), paralelo: int = 2, simular: bool = False) -> Dict[str, str]:
+    """
+    Ejecuta los pasos que lo necesitan respetando las dependencias.
+    Devuelve {paso: 'ejecutado' | 'al día' | 'omitido' | 'fallido' | 'bloqueado' | 'pendiente'}.
+    """
+    pasos = ordenar_pasos(pasos)
+    estado = cargar_estado()
+    huellas = HuellasArchivos(estado.get('archivos'))
+    huellas_pasos: Dict[str, str] = {}
+    resultado: Dict[str, str] = {}
+    pendientes = list(pasos)
+    en_ejecucion = {}
+
+    def decidir(paso: Paso) -> Optional[str]:
+        """Resultado si el paso no se ejecuta; None si hay que ejecutarlo"""
+        if paso.nombre in omitir:
+            previa = estado['pasos'].get(paso.nombre, {}).get('huella', '')
+            huellas_pasos[paso.nombre] = previa
+            return 'omitido'
+        if any(resultado.get(d) in ('fallido', 'bloqueado') for d in paso.depende_de):
+            return 'bloqueado'
+        huella = calcular_huella(paso, huellas, huellas_pasos)
+        huellas_pasos[paso.nombre] = huella
+        previa = estado['pasos'].get(paso.nombre, {}).get('huella')
+        if forzar or (paso.fuente and fuentes) or salidas_faltantes(paso):
+            return None
+        if paso.fuente and previa is None:
+            # Primera vez con datos ya scrapeados: se toman como punto de partida
+            estado['pasos'][paso.nombre] = {'huella': huella, 'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            return 'al día'
+        return None if huella != previa else 'al día'
+
+    with ThreadPoolExecutor(max_workers=max(1, paralelo)) as pool:
+        while pendientes or en_ejecucion:
+            # Lanzar los pasos cuyas dependencias ya terminaron
+            for paso in list(pendientes):
+                if any(d not in resultado for d in paso.depende_de):
+                    continue
+                pendientes.remove(paso)
+                decision = decidir(paso)
+                if decision is not None:
+                    resultado[paso.nombre] = decision
+                    print(f"  · {paso.nombre}: {decision}")
+                elif simular:
+                    resultado[paso.nombre] = 'pendiente'
+                    print(f"  → {paso.nombre}: se ejecutaría ({' '.join(paso.comando)})")
+                else:
+                    print(f"  ▶ {paso.nombre}: {' '.join(paso.comando)}")
+                    en_ejecucion[pool.submit(ejecutar_paso, paso)] = paso
+
+            if not en_ejecucion:
+                if pendientes and all(any(d not in resultado for d in p.depende_de) for p in pendientes):
+                    raise RuntimeError("Pasos sin poder ejecutarse: " + ', '.join(p.nombre for p in pendientes))
+                continue
+
+            terminados, _ = wait(en_ejecucion, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                paso = en_ejecucion.pop(futuro)
+                salida = futuro.result()
+                if salida['codigo'] == 0:
+                    resultado[paso.nombre] = 'ejecutado'
+                    estado['pasos'][paso.nombre] = {
+                        'huella': huellas_pasos[paso.nombre],
+                        'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'segundos': round(salida['segundos'], 2),
+                    }
+                    print(f"  ✓ {paso.nombre}: {salida['segundos']:.1f} s")
+                else:
+                    resultado[paso.nombre] = 'fallido'
+                    print(f"  ✗ {paso.nombre}: código {salida['codigo']} (ver pipeline_{paso.nombre}.log)")
+                estado['archivos'] = huellas.guardadas
+                guardar_estado(estado)
+
+    if not simular:
+        estado['archivos'] = huellas.guardadas
+        guardar_estado(estado)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flujo incremental de datos 2025")
+    parser.add_argument("--fuentes", action="store_true", help="Volver a ejecutar los scrapers")
+    parser.add_argument("--forzar", action="store_true", help="Ejecutar todos los pasos aunque estén al día")
+    parser.add_argument("--omitir", nargs="*", default=[], metavar="PASO",
+                        help="Pasos a omitir (p. ej. subida refresco sin credenciales)")
+    parser.add_argument("--paralelo", type=int, default=2, help="Pasos simultáneos como máximo")
+    parser.add_argument("--simular", action="store_true", help="Solo mostrar qué pasos se ejecutarían")
+    args = parser.parse_args()
+
+    nombres = {p.nombre for p in PASOS_2025}
+    desconocidos = [n for n in args.omitir if n not in nombres]
+    if desconocidos:
+        parser.error(f"pasos desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(sorted(nombres))})")
+
+    print("Flujo de datos 2025")
+    inicio = time.perf_counter()
+    resultado = ejecutar_pipeline(fuentes=args.fuentes, forzar=args.forzar, omitir=args.omitir,
+                                  paralelo=args.paralelo, simular=args.simular)
+    ejecutados = sum(1 for r in resultado.values() if r == 'ejecutado')
+    print(f"\n✓ {ejecutados} paso(s) ejecutado(s), "
+          f"{sum(1 for r in resultado.values() if r == 'al día')} al día, "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    if any(r in ('fallido', 'bloqueado') for r in resultado.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
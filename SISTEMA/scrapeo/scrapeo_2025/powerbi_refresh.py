@@ -1,19 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Refresca automáticamente un dataset de Power BI después del scraping.
-- Busca el dataset por nombre (ej.: "Proyecto - Mapas ya incluidos ACTUAL").
+Refresca automáticamente uno o varios datasets de Power BI después del scraping.
+- Busca cada dataset por nombre (ej.: "Proyecto - Mapas ya incluidos ACTUAL").
 - Si se indica WORKSPACE_ID, opera en ese workspace; sino, usa "My Workspace".
+- Los refresh se lanzan y se esperan en paralelo (asyncio) con una sola
+  sesión HTTP; la consulta de estado espera cada vez más (5 s, 7.5 s,
+  11 s... hasta 30 s) y respeta Retry-After cuando el servicio lo envía.
 
 Requisitos de entorno (variables):
   TENANT_ID         -> ID del tenant Azure AD
   CLIENT_ID         -> ID de la App Registration (confidential client)
   CLIENT_SECRET     -> Secreto de la App Registration
   WORKSPACE_ID      -> (opcional) ID del workspace de Power BI
+  POWERBI_API_ROOT  -> (opcional) URL base de la API; permite apuntar a un servidor de prueba
+  MSAL_CACHE_DIR, MSAL_CACHE_KEY -> (opcional) caché cifrada de tokens, ver cache_tokens.py
 
 Uso:
   python powerbi_refresh.py --dataset "Proyecto - Mapas ya incluidos ACTUAL"
   python powerbi_refresh.py --workspace "<name>" --dataset "<dataset name>"  # si quieres resolver por nombre
+  python powerbi_refresh.py --dataset "A" --dataset "Otro workspace::B"      # varios a la vez
 
 Permisos necesarios en la App:
   - API Microsoft Power BI: Dataset.ReadWrite.All
@@ -23,106 +29,260 @@ Permisos necesarios en la App:
 import os
 import sys
 import time
+import asyncio
 import argparse
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 from dotenv import load_dotenv
 load_dotenv()
 
 try:
-    from msal import ConfidentialClientApplication
-except Exception as e:
-    print("Falta dependencia 'msal'. Ejecuta: pip install msal")
+    from cache_tokens import token_aplicacion
+except ImportError as e:
+    print(f"Falta dependencia '{e.name}'. Ejecuta: pip install -r requirements.txt")
     raise
 
-API_ROOT = "https://api.powerbi.com/v1.0/myorg"
+API_ROOT = os.getenv("POWERBI_API_ROOT", "https://api.powerbi.com/v1.0/myorg").rstrip("/")
 SCOPE = ["https://analysis.windows.net/powerbi/api/.default"]
 
+# "Unknown" indica que el refresh sigue en curso
+FINAL_STATUSES = ("Completed", "Failed", "Disabled", "Cancelled")
+POLL_INITIAL = 5
+POLL_MAX = 30
+POLL_FACTOR = 1.5
+MAX_RETRIES = 5
+# Métodos que se pueden repetir ante 5xx sin riesgo de lanzar dos veces la misma acción
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+TIMEOUT = (10, 60)
+WORKSPACE_SEPARATOR = "::"
+MY_WORKSPACE_NAMES = ("my workspace", "mi área de trabajo", "mi area de trabajo")
+
 
 def get_token(tenant_id: str, client_id: str, client_secret: str) -> str:
-    app = ConfidentialClientApplication(
-        client_id,
-        authority=f"https://login.microsoftonline.com/{tenant_id}",
-        client_credential=client_secret,
-    )
-    result = app.acquire_token_for_client(scopes=SCOPE)
+    # Token desde la caché cifrada compartida con graph_upload.py mientras siga vigente
+    result = token_aplicacion(tenant_id, client_id, client_secret, SCOPE)
     if "access_token" not in result:
         raise RuntimeError(f"No se pudo obtener token: {result}")
     return result["access_token"]
 
 
-def resolve_workspace_id(token: str, workspace_name: str | None) -> str | None:
-    if not workspace_name:
-        return None  # usar My Workspace
-    # Permite especificar explícitamente 'My Workspace' / 'Mi área de trabajo'
-    if workspace_name.strip().lower() in ("my workspace", "mi área de trabajo", "mi area de trabajo"):
+def retry_after(r: requests.Response) -> Optional[float]:
+    """Segundos indicados en Retry-After (número o fecha HTTP), o None si no viene"""
+    value = r.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
         return None
-    headers = {"Authorization": f"Bearer {token}"}
-    r = requests.get(f"{API_ROOT}/groups", headers=headers)
-    r.raise_for_status()
-    groups = r.json().get("value", [])
-    for g in groups:
-        if g.get("name") == workspace_name:
-            return g.get("id")
-    raise RuntimeError(f"Workspace '{workspace_name}' no encontrado.")
-
-
-def find_dataset(token: str, dataset_name: str, workspace_id: str | None) -> str:
-    headers = {"Authorization": f"Bearer {token}"}
-    if workspace_id:
-        url = f"{API_ROOT}/groups/{workspace_id}/datasets"
-    else:
-        url = f"{API_ROOT}/datasets"  # My Workspace
-    r = requests.get(url, headers=headers)
-    r.raise_for_status()
-    datasets = r.json().get("value", [])
-    for d in datasets:
-        if d.get("name") == dataset_name:
-            return d.get("id")
-    raise RuntimeError(f"Dataset '{dataset_name}' no encontrado en {'workspace '+workspace_id if workspace_id else 'My Workspace'}.")
-
-
-def trigger_refresh(token: str, dataset_id: str, workspace_id: str | None) -> None:
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-    body = {"notifyOption": "MailOnFailure"}
-    if workspace_id:
-        url = f"{API_ROOT}/groups/{workspace_id}/datasets/{dataset_id}/refreshes"
-    else:
-        url = f"{API_ROOT}/datasets/{dataset_id}/refreshes"
-    r = requests.post(url, headers=headers, json=body)
+
+
+def request_not_sent(e: requests.RequestException) -> bool:
+    """True si el error ocurrió antes de enviar la petición (no se pudo abrir la conexión)"""
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(e, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+class PowerBIClient:
+    """Cliente asíncrono de la API REST: una sesión HTTP (pool de conexiones) para todas las tareas"""
+
+    def __init__(self, token: str, pool_size: int = 4, api_root: str = API_ROOT):
+        self.api_root = api_root
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    async def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Petición con reintentos, esperando lo que indique Retry-After. Todas se
+        reintentan ante 429; ante 5xx o errores de conexión solo las idempotentes
+        (GET...). Un POST que falla con 5xx pudo haberse aceptado: repetirlo
+        lanzaría un segundo refresh, así que solo se repite si no llegó a enviarse.
+        """
+        url = f"{self.api_root}{path}"
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(MAX_RETRIES + 1):
+            r = None
+            try:
+                r = await asyncio.to_thread(self.session.request, method, url, timeout=TIMEOUT, **kwargs)
+                if r.status_code != 429 and (r.status_code < 500 or not idempotent):
+                    return r
+            except requests.RequestException as e:
+                if attempt == MAX_RETRIES or not (idempotent or request_not_sent(e)):
+                    raise
+            if attempt == MAX_RETRIES:
+                return r
+            wait = retry_after(r) if r is not None else None
+            await asyncio.sleep(wait if wait is not None else min(POLL_MAX, 2 ** attempt))
+        return r
+
+    async def get_json(self, path: str) -> dict:
+        r = await self.request("GET", path)
+        r.raise_for_status()
+        return r.json()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RefreshTarget:
+    """Un dataset a refrescar y el resultado de su refresh"""
+
+    def __init__(self, dataset_name: str, workspace_name: Optional[str] = None,
+                 workspace_id: Optional[str] = None):
+        self.dataset_name = dataset_name
+        self.workspace_name = workspace_name
+        self.workspace_id = workspace_id
+        self.dataset_id: Optional[str] = None
+        self.status = "NotStarted"
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @classmethod
+    def parse(cls, value: str, workspace_name: Optional[str] = None,
+              workspace_id: Optional[str] = None) -> "RefreshTarget":
+        """'Dataset' o 'Workspace::Dataset'"""
+        if WORKSPACE_SEPARATOR in value:
+            workspace_name, value = value.split(WORKSPACE_SEPARATOR, 1)
+            workspace_id = None
+        return cls(value, workspace_name, workspace_id)
+
+    @property
+    def label(self) -> str:
+        return f"{self.workspace_name or self.workspace_id or 'My Workspace'} / {self.dataset_name}"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def refreshes_path(self) -> str:
+        if self.workspace_id:
+            return f"/groups/{self.workspace_id}/datasets/{self.dataset_id}/refreshes"
+        return f"/datasets/{self.dataset_id}/refreshes"
+
+
+async def resolve_workspace_ids(client: PowerBIClient, targets: List[RefreshTarget]) -> None:
+    """Asigna el ID de workspace de cada objetivo (una sola consulta de /groups)"""
+    pending = [t for t in targets if t.workspace_name and not t.workspace_id
+               and t.workspace_name.strip().lower() not in MY_WORKSPACE_NAMES]
+    if not pending:
+        return
+    groups = (await client.get_json("/groups")).get("value", [])
+    ids = {g.get("name"): g.get("id") for g in groups}
+    for target in pending:
+        if target.workspace_name not in ids:
+            raise RuntimeError(f"Workspace '{target.workspace_name}' no encontrado.")
+        target.workspace_id = ids[target.workspace_name]
+
+
+async def find_datasets(client: PowerBIClient, targets: List[RefreshTarget]) -> None:
+    """Asigna el ID de dataset de cada objetivo (una consulta por workspace, en paralelo)"""
+    workspaces = sorted({t.workspace_id for t in targets}, key=lambda w: w or "")
+
+    async def list_datasets(workspace_id: Optional[str]) -> Dict[str, str]:
+        path = f"/groups/{workspace_id}/datasets" if workspace_id else "/datasets"  # My Workspace
+        datasets = (await client.get_json(path)).get("value", [])
+        return {d.get("name"): d.get("id") for d in datasets}
+
+    listings = dict(zip(workspaces, await asyncio.gather(*(list_datasets(w) for w in workspaces))))
+    for target in targets:
+        dataset_id = listings[target.workspace_id].get(target.dataset_name)
+        if dataset_id is None:
+            where = f"workspace {target.workspace_id}" if target.workspace_id else "My Workspace"
+            raise RuntimeError(f"Dataset '{target.dataset_name}' no encontrado en {where}.")
+        target.dataset_id = dataset_id
+
+
+async def trigger_refresh(client: PowerBIClient, target: RefreshTarget) -> Optional[str]:
+    """Lanza el refresh; devuelve su RequestId para seguir ese refresh y no uno anterior"""
+    r = await client.request("POST", target.refreshes_path(), json={"notifyOption": "MailOnFailure"})
     if r.status_code not in (200, 202):
         raise RuntimeError(f"Error al lanzar refresh ({r.status_code}): {r.text}")
-    print("✓ Refresh lanzado correctamente")
-
-
-def wait_for_refresh(token: str, dataset_id: str, workspace_id: str | None, timeout_sec: int = 600) -> str:
-    headers = {"Authorization": f"Bearer {token}"}
-    if workspace_id:
-        url = f"{API_ROOT}/groups/{workspace_id}/datasets/{dataset_id}/refreshes"
-    else:
-        url = f"{API_ROOT}/datasets/{dataset_id}/refreshes"
-    start = time.time()
-    last_status = "unknown"
-    while time.time() - start < timeout_sec:
-        r = requests.get(url, headers=headers)
+    print(f"✓ Refresh lanzado correctamente: {target.label}")
+    return r.headers.get("RequestId")
+
+
+async def wait_for_refresh(client: PowerBIClient, target: RefreshTarget, request_id: Optional[str] = None,
+                           timeout_sec: int = 600) -> str:
+    """Consulta el estado con espera creciente hasta que el refresh termina o vence el plazo"""
+    start = time.monotonic()
+    delay = POLL_INITIAL
+    last_status = "Unknown"
+    while True:
+        r = await client.request("GET", f"{target.refreshes_path()}?$top=5")
         r.raise_for_status()
         items = r.json().get("value", [])
+        if request_id:
+            items = [i for i in items if i.get("requestId") == request_id]
         if items:
             status = items[0].get("status")
+            if status != last_status:
+                print(f"  {target.label}: {status}")
             last_status = status
-            print(f"  Estado último refresh: {status}")
-            if status in ("Completed", "Failed", "Unknown"):
+            if status in FINAL_STATUSES:
                 return status
-        time.sleep(5)
-    return last_status
+        remaining = timeout_sec - (time.monotonic() - start)
+        if remaining <= 0:
+            return last_status
+        wait = max(delay, retry_after(r) or 0)
+        await asyncio.sleep(min(wait, remaining))
+        delay = min(POLL_MAX, delay * POLL_FACTOR)
+
+
+async def refresh_dataset(client: PowerBIClient, target: RefreshTarget, timeout_sec: int = 600) -> RefreshTarget:
+    target.started = time.monotonic()
+    try:
+        request_id = await trigger_refresh(client, target)
+        target.status = await wait_for_refresh(client, target, request_id, timeout_sec)
+    except Exception as e:
+        target.status = "Error"
+        target.error = str(e)
+    target.finished = time.monotonic()
+    return target
+
+
+async def refresh_all(token: str, targets: List[RefreshTarget], timeout_sec: int = 600,
+                      api_root: str = API_ROOT) -> List[RefreshTarget]:
+    """Resuelve workspaces y datasets, y refresca todos los objetivos en paralelo"""
+    client = PowerBIClient(token, pool_size=len(targets), api_root=api_root)
+    try:
+        await resolve_workspace_ids(client, targets)
+        await find_datasets(client, targets)
+        for target in targets:
+            print(f"Workspace: {target.workspace_id or 'My Workspace'} | Dataset: {target.dataset_name} ({target.dataset_id})")
+        return list(await asyncio.gather(*(refresh_dataset(client, t, timeout_sec) for t in targets)))
+    finally:
+        client.close()
+
+
+def print_summary(targets: List[RefreshTarget]) -> None:
+    print("\nResultado del refresh:")
+    for target in targets:
+        duration = f"{target.duration:.1f} s" if target.duration is not None else "-"
+        print(f"  {target.label}: {target.status} ({duration})" + (f" - {target.error}" if target.error else ""))
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Refrescar dataset de Power BI")
-    parser.add_argument("--dataset", required=True, help="Nombre del dataset publicado")
-    parser.add_argument("--workspace", help="Nombre del workspace (opcional)")
+    parser = argparse.ArgumentParser(description="Refrescar datasets de Power BI")
+    parser.add_argument("--dataset", required=True, action="append",
+                        help="Nombre del dataset publicado; se puede repetir y usar 'Workspace::Dataset'")
+    parser.add_argument("--workspace", help="Nombre del workspace por defecto (opcional)")
+    parser.add_argument("--timeout", type=int, default=600, help="Segundos máximos de espera por dataset")
     args = parser.parse_args()
 
     tenant_id = os.getenv("TENANT_ID")
@@ -136,16 +296,17 @@ def main():
 
     token = get_token(tenant_id, client_id, client_secret)
     # Priorizar el workspace pasado por argumento (si se especifica)
-    ws_id = resolve_workspace_id(token, args.workspace) if args.workspace else workspace_id_env
-    ds_id = find_dataset(token, args.dataset, ws_id)
-
-    print(f"Workspace: {ws_id or 'My Workspace'} | Dataset: {args.dataset} ({ds_id})")
-    trigger_refresh(token, ds_id, ws_id)
-    status = wait_for_refresh(token, ds_id, ws_id, timeout_sec=600)
-    print(f"Resultado del refresh: {status}")
-    if status != "Completed":
+    workspace_id = None if args.workspace else workspace_id_env
+    targets = [RefreshTarget.parse(d, args.workspace, workspace_id) for d in args.dataset]
+    try:
+        results = asyncio.run(refresh_all(token, targets, timeout_sec=args.timeout))
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    print_summary(results)
+    if any(t.status != "Completed" for t in results):
         sys.exit(2)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
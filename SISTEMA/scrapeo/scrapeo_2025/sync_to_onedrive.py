@@ -1,8 +1,11 @@
+import argparse
 import os
 import shutil
 from pathlib import Path
 from dotenv import load_dotenv
 
+from manifiesto_sync import ManifiestoSync
+
 load_dotenv()
 
 # Carpeta local sincronizada con OneDrive/SharePoint
@@ -23,21 +26,46 @@ def ensure_target():
     TARGET_PATH.mkdir(parents=True, exist_ok=True)
 
 
-def copy_matches():
+def dest_state(dest: Path):
+    """Tamaño y mtime de la copia en destino (None si no existe)"""
+    if not dest.exists():
+        return None
+    stat = dest.stat()
+    return {"tamano": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def copy_matches(dry_run: bool = False):
+    """Copia solo lo nuevo o cambiado (local o en destino); devuelve (copiados, sin cambios)"""
+    manifest = ManifiestoSync(f"carpeta:{TARGET_PATH}")
     copied = []
+    unchanged = 0
     for pattern in FILE_GLOBS:
         for src in REPO_DIR.glob(pattern):
-            if src.suffix.lower() in EXCLUDE_SUFFIXES:
+            if src.suffix.lower() in EXCLUDE_SUFFIXES or src.name.startswith("."):
                 continue
             dest = TARGET_PATH / src.name
-            shutil.copy2(src, dest)
-            copied.append((src.name, str(dest)))
-    return copied
+            reason = manifest.motivo(src, dest_state(dest), verificar_remoto=True)
+            if reason is None:
+                unchanged += 1
+                continue
+            if not dry_run:
+                shutil.copy2(src, dest)
+                manifest.registrar(src, dest_state(dest))
+            copied.append((src.name, str(dest), reason))
+    if not dry_run:
+        manifest.guardar()
+    return copied, unchanged
 
 
 if __name__ == "__main__":
-    ensure_target()
-    results = copy_matches()
-    print(f"Archivos copiados: {len(results)} → {TARGET_PATH}")
-    for name, dest in results:
-        print(f" - {name} -> {dest}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Copiar resultados a la carpeta sincronizada con OneDrive")
+    parser.add_argument("--simular", action="store_true", help="Solo mostrar qué archivos se copiarían")
+    args = parser.parse_args()
+
+    if not args.simular:
+        ensure_target()
+    results, unchanged = copy_matches(dry_run=args.simular)
+    verbo = "Se copiarían" if args.simular else "Archivos copiados"
+    print(f"{verbo}: {len(results)} → {TARGET_PATH} ({unchanged} sin cambios)")
+    for name, dest, reason in results:
+        print(f" - {name} -> {dest} [{reason}]")
\ No newline at end of file
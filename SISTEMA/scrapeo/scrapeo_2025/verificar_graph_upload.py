@@ -0,0 +1,291 @@
+"""
+Verificación local de graph_upload.py contra un Microsoft Graph falso
+Levanta un http.server en localhost que imita carpetas ($batch, children),
+la subida simple (PUT /content) y las sesiones de carga
+(createUploadSession, PUT por fragmentos y GET de nextExpectedRanges),
+apunta GRAPH_BASE_URL a él y comprueba que:
+  - varios archivos se suben en paralelo por fragmentos y llegan íntegros
+  - si un fragmento falla (el servidor lo guardó pero la respuesta se
+    perdió), la subida continúa desde el byte que falta y no desde cero
+  - si la sesión de carga expira (404), se crea otra y el archivo se completa
+  - la sincronización sube solo lo nuevo o cambiado: nada en la segunda
+    pasada, y después exactamente el archivo modificado localmente, el
+    editado en la nube y el borrado en la nube
+No usa credenciales ni red externa; los archivos se generan en un
+directorio temporal.
+
+Uso:
+    python verificar_graph_upload.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+FRAGMENTO = 320 * 1024
+CARPETA = 'Becas/verificacion'
+
+
+class GraphFalso:
+    """Estado del servidor falso: archivos, sesiones de carga y fallos programados"""
+
+    def __init__(self):
+        self.archivos = {}   # ruta en el drive -> bytes
+        self.carpetas = {'': 'root'}  # ruta en el drive -> id
+        self.sesiones = {}   # id -> {'ruta', 'datos'}
+        # nombre de archivo -> (número de PUT de fragmento, 'perdida' | 'expira')
+        self.fallos = {}
+        self.sesiones_creadas = defaultdict(int)
+        self.bytes_recibidos = defaultdict(int)
+        self._puts = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def item(self, ruta: str) -> dict:
+        sha1 = hashlib.sha1(self.archivos[ruta]).hexdigest()
+        return {'id': sha1[:12], 'name': ruta.rsplit('/', 1)[-1], 'size': len(self.archivos[ruta]),
+                'webUrl': f"https://graph.falso/{ruta}", 'eTag': f'"{sha1[:8]},1"',
+                'file': {'hashes': {'quickXorHash': sha1}}}
+
+    def atender(self, metodo: str, ruta: str, cuerpo: bytes, cabeceras, host: str):
+        """(código, cuerpo JSON) de la respuesta"""
+        ruta = unquote(ruta.split('?')[0])
+        if ruta == '/$batch':
+            return 200, {'responses': self._batch(json.loads(cuerpo)['requests'])}
+        m = re.fullmatch(r'/subida/(\w+)', ruta)
+        if m:
+            return self._fragmento(metodo, m.group(1), cuerpo, cabeceras)
+        m = re.fullmatch(r'.*/drive/root:/(.+):/createUploadSession', ruta)
+        if m and metodo == 'POST':
+            with self.lock:
+                id_sesion = uuid.uuid4().hex
+                self.sesiones[id_sesion] = {'ruta': m.group(1), 'datos': bytearray()}
+                self.sesiones_creadas[m.group(1).rsplit('/', 1)[-1]] += 1
+            return 200, {'uploadUrl': f"http://{host}/subida/{id_sesion}"}
+        m = re.fullmatch(r'.*/drive/root:/(.+):/content', ruta)
+        if m and metodo == 'PUT':
+            with self.lock:
+                self.archivos[m.group(1)] = cuerpo
+                return 201, self.item(m.group(1))
+        m = re.fullmatch(r'.*/drive/items/(\w+)/children', ruta)
+        if m and metodo == 'GET':
+            return self._listar(m.group(1))
+        return self._carpeta(metodo, ruta, json.loads(cuerpo) if cuerpo else None)
+
+    def _carpeta(self, metodo: str, ruta: str, cuerpo):
+        """GET de una carpeta por ruta y POST .../children para crearla"""
+        m = re.fullmatch(r'.*/drive/root(?::/(.+?))?(?::)?(/children)?', ruta)
+        if not m:
+            return 400, {'error': {'message': f"ruta no soportada: {metodo} {ruta}"}}
+        carpeta = m.group(1) or ''
+        with self.lock:
+            if metodo == 'GET' and not m.group(2):
+                if carpeta in self.carpetas:
+                    return 200, {'id': self.carpetas[carpeta]}
+                return 404, {'error': {'code': 'itemNotFound'}}
+            if metodo == 'POST' and m.group(2):
+                if carpeta not in self.carpetas:
+                    return 404, {'error': {'code': 'itemNotFound'}}
+                nueva = f"{carpeta}/{cuerpo['name']}" if carpeta else cuerpo['name']
+                if nueva in self.carpetas:
+                    return 409, {'error': {'code': 'nameAlreadyExists'}}
+                self.carpetas[nueva] = uuid.uuid4().hex[:12]
+                return 201, {'id': self.carpetas[nueva]}
+        return 400, {'error': {'message': f"ruta no soportada: {metodo} {ruta}"}}
+
+    def _listar(self, id_carpeta: str):
+        with self.lock:
+            carpeta = next((ruta for ruta, i in self.carpetas.items() if i == id_carpeta), None)
+            if carpeta is None:
+                return 404, {'error': {'code': 'itemNotFound'}}
+            prefijo = f"{carpeta}/" if carpeta else ''
+            return 200, {'value': [self.item(r) for r in self.archivos
+                                   if r.startswith(prefijo) and '/' not in r[len(prefijo):]]}
+
+    def _batch(self, peticiones: list) -> list:
+        """Ejecuta las peticiones en orden; las que dependen de una fallida devuelven 424"""
+        estados, respuestas = {}, []
+        for peticion in peticiones:
+            if any(estados.get(d, 200) >= 300 for d in peticion.get('dependsOn', [])):
+                codigo, cuerpo = 424, {'error': {'code': 'failedDependency'}}
+            else:
+                codigo, cuerpo = self._carpeta(peticion['method'], unquote(peticion['url'].split('?')[0]),
+                                               peticion.get('body'))
+            estados[peticion['id']] = codigo
+            respuestas.append({'id': peticion['id'], 'status': codigo, 'body': cuerpo})
+        return respuestas
+
+    def _fragmento(self, metodo: str, id_sesion: str, cuerpo: bytes, cabeceras):
+        with self.lock:
+            sesion = self.sesiones.get(id_sesion)
+            if sesion is None:
+                return 404, {'error': {'code': 'itemNotFound'}}
+            if metodo == 'GET':
+                return 200, {'nextExpectedRanges': [f"{len(sesion['datos'])}-"]}
+            nombre = sesion['ruta'].rsplit('/', 1)[-1]
+            self.bytes_recibidos[nombre] += len(cuerpo)
+            self._puts[nombre] += 1
+            inicio, _, total = map(int, re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', cabeceras['Content-Range']).groups())
+            if inicio != len(sesion['datos']):
+                return 416, {'error': {'code': 'invalidRange'}}
+            numero, tipo = self.fallos.get(nombre, (None, None))
+            if self._puts[nombre] == numero:
+                if tipo == 'expira':
+                    del self.sesiones[id_sesion]
+                    return 404, {'error': {'code': 'itemNotFound'}}
+                # El fragmento se guardó pero la respuesta se pierde
+                sesion['datos'] += cuerpo
+                return 503, {'error': {'code': 'serviceNotAvailable'}}
+            sesion['datos'] += cuerpo
+            if len(sesion['datos']) < total:
+                return 202, {'nextExpectedRanges': [f"{len(sesion['datos'])}-"]}
+            self.archivos[sesion['ruta']] = bytes(sesion['datos'])
+            del self.sesiones[id_sesion]
+            return 201, self.item(sesion['ruta'])
+
+
+class Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, metodo: str):
+        cuerpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        codigo, respuesta = self.server.graph.atender(metodo, self.path, cuerpo, self.headers,
+                                                      self.headers['Host'])
+        datos = json.dumps(respuesta).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        if codigo == 503:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        self._responder('GET')
+
+    def do_POST(self):
+        self._responder('POST')
+
+    def do_PUT(self):
+        self._responder('PUT')
+
+
+def iniciar_servidor() -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manejador)
+    servidor.graph = GraphFalso()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def crear_archivos(directorio: str, tamanos: dict) -> dict:
+    """nombre -> ruta de archivos con contenido pseudoaleatorio del tamaño pedido"""
+    rutas = {}
+    for nombre, tamano in tamanos.items():
+        ruta = os.path.join(directorio, nombre)
+        with open(ruta, 'wb') as f:
+            f.write(os.urandom(tamano))
+        rutas[nombre] = ruta
+    return rutas
+
+
+def sincronizar(g, rutas: list, directorio: str, subir: bool = True) -> dict:
+    """Una pasada como la de graph_upload.main(): nombre -> motivo de los archivos pendientes"""
+    from manifiesto_sync import ManifiestoSync
+
+    carpetas = g.FolderCache(os.path.join(directorio, '.graph_carpetas.json'))
+    remoto = g.open_folder('token-de-prueba', CARPETA, carpetas)
+    carpetas.save()
+    manifiesto = ManifiestoSync('graph:verificacion', os.path.join(directorio, '.sync_manifiesto.json'))
+    pendientes = g.pending_uploads(rutas, remoto, manifiesto)
+    if subir and pendientes:
+        g.upload_files('token-de-prueba', [ruta for ruta, _ in pendientes], CARPETA, manifest=manifiesto)
+        manifiesto.guardar()
+    return {os.path.basename(ruta): motivo for ruta, motivo in pendientes}
+
+
+def main():
+    servidor = iniciar_servidor()
+    graph = servidor.graph
+    os.environ.update(GRAPH_BASE_URL=f"http://127.0.0.1:{servidor.server_address[1]}", GRAPH_TARGET='onedrive',
+                      GRAPH_USER_UPN='verificacion@falso', GRAPH_CHUNK_SIZE=str(FRAGMENTO))
+    import graph_upload as g
+
+    # Con archivos de ~1 MB se prueba la subida por fragmentos sin generar archivos grandes
+    g.SIMPLE_UPLOAD_LIMIT = 64 * 1024
+    comprobaciones = []
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = crear_archivos(directorio, {
+            'normal_1.csv': 3 * FRAGMENTO + 1000, 'normal_2.csv': 2 * FRAGMENTO,
+            'perdida.csv': 4 * FRAGMENTO + 5, 'expira.csv': 3 * FRAGMENTO + 7, 'chico.json': 2000,
+        })
+        tamanos = {nombre: os.path.getsize(ruta) for nombre, ruta in rutas.items()}
+        graph.fallos = {'perdida.csv': (2, 'perdida'), 'expira.csv': (2, 'expira')}
+
+        errores = g.upload_files('token-de-prueba', list(rutas.values()), CARPETA)
+
+        def integro(nombre):
+            with open(rutas[nombre], 'rb') as f:
+                return graph.archivos.get(f"{CARPETA}/{nombre}") == f.read()
+
+        comprobaciones += [
+            ("subida en paralelo sin errores", not errores and all(integro(n) for n in rutas)),
+            ("reanuda tras fragmento fallido", integro('perdida.csv') and graph.sesiones_creadas['perdida.csv'] == 1
+             and graph.bytes_recibidos['perdida.csv'] <= tamanos['perdida.csv'] + FRAGMENTO),
+            ("nueva sesión tras expirar (404)", integro('expira.csv') and graph.sesiones_creadas['expira.csv'] == 2),
+        ]
+        print(f"\nFragmentos de {FRAGMENTO // 1024} KiB; bytes recibidos por el servidor:")
+        for nombre in rutas:
+            print(f"  {nombre:<14} {tamanos[nombre]:>9} B archivo, {graph.bytes_recibidos[nombre]:>9} B recibidos, "
+                  f"{graph.sesiones_creadas[nombre]} sesión(es)")
+
+    # Sincronización incremental (manifiesto + estado remoto)
+    with tempfile.TemporaryDirectory() as directorio:
+        datos = os.path.join(directorio, 'datos')
+        os.mkdir(datos)
+        rutas = crear_archivos(datos, {f"sync_{i}.csv": 5000 for i in range(6)})
+        graph.archivos.clear()
+        pasadas = [sincronizar(g, list(rutas.values()), directorio)]
+        pasadas.append(sincronizar(g, list(rutas.values()), directorio))
+        with open(rutas['sync_0.csv'], 'ab') as f:
+            f.write(b'cambio local')
+        graph.archivos[f"{CARPETA}/sync_1.csv"] = b'editado en la nube'
+        del graph.archivos[f"{CARPETA}/sync_2.csv"]
+        pasadas.append(sincronizar(g, list(rutas.values()), directorio))
+        pasadas.append(sincronizar(g, list(rutas.values()), directorio))
+        esperado = {'sync_0.csv': 'modificado', 'sync_1.csv': 'cambiado en destino', 'sync_2.csv': 'falta en destino'}
+
+        def integro(nombre):
+            with open(rutas[nombre], 'rb') as f:
+                return graph.archivos.get(f"{CARPETA}/{nombre}") == f.read()
+
+        print("\nSincronización (archivos pendientes por pasada):")
+        for i, pasada in enumerate(pasadas, 1):
+            print(f"  pasada {i}: {len(pasada)} {sorted(pasada.items())}")
+        comprobaciones += [
+            ("primera sincronización sube todo", len(pasadas[0]) == len(rutas)
+             and set(pasadas[0].values()) == {'nuevo'}),
+            ("segunda sincronización no sube nada", pasadas[1] == {}),
+            ("solo cambios locales, remotos y borrados", pasadas[2] == esperado
+             and all(integro(n) for n in rutas)),
+            ("tras resincronizar no queda nada", pasadas[3] == {}),
+        ]
+
+    print("\nVerificación:")
+    for nombre, ok in comprobaciones:
+        print(f"  {'✓' if ok else '✗'} {nombre}")
+    servidor.shutdown()
+    sys.exit(0 if all(ok for _, ok in comprobaciones) else 1)
+
+
+if __name__ == "__main__":
+    main()
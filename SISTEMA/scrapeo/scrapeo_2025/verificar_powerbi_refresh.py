@@ -0,0 +1,151 @@
+"""
+Verificación local de powerbi_refresh.py contra una API de Power BI falsa
+Levanta un http.server en localhost que imita /groups, /datasets y
+/refreshes (cada refresh queda en "Unknown" un momento y luego termina),
+apunta POWERBI_API_ROOT a él y comprueba que:
+  - la consulta de estado pasa por "Unknown" hasta "Completed" o "Failed"
+  - un 429 en la consulta se reintenta esperando lo que indica Retry-After
+  - un 503 en la consulta (GET) se reintenta
+  - un 503 en POST /refreshes no se reintenta: no se lanza un segundo refresh
+No usa credenciales ni red externa; tarda unos segundos.
+
+Uso:
+    python verificar_powerbi_refresh.py
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# workspace id -> (nombre, {dataset: dataset id}); None es My Workspace
+WORKSPACES = {
+    'ws1': ('Ventas WS', {'scraping': 'd1', 'Mapas': 'd2'}),
+    'ws2': ('Otro WS', {'Mapas': 'd3'}),
+    None: ('My Workspace', {'scraping': 'd0'}),
+}
+# dataset id -> (segundos en "Unknown", estado final)
+REFRESHES = {'d0': (2.5, 'Completed'), 'd1': (1.5, 'Completed'), 'd2': (1.0, 'Completed'), 'd3': (0.5, 'Failed')}
+RETRY_AFTER = 1
+
+
+class ApiPowerBIFalsa:
+    """Estado del servidor falso: refreshes lanzados, fallos programados y registro de peticiones"""
+
+    def __init__(self):
+        self.refreshes = {dataset_id: [] for dataset_id in REFRESHES}
+        # (método, dataset id) -> códigos a devolver antes de responder normalmente
+        self.fallos = {('GET', 'd0'): [429], ('GET', 'd1'): [503], ('POST', 'd2'): [503]}
+        self.registro = defaultdict(list)  # (método, dataset id) -> [(instante, código, estado)]
+        self.lock = threading.Lock()
+
+    def atender(self, metodo: str, ruta: str):
+        """(código, cuerpo, cabeceras) de la respuesta"""
+        ruta = ruta.split('?')[0]
+        if metodo == 'GET' and ruta == '/groups':
+            return 200, {'value': [{'id': ws, 'name': nombre} for ws, (nombre, _) in WORKSPACES.items() if ws]}, {}
+        m = re.fullmatch(r'(?:/groups/(\w+))?/datasets', ruta)
+        if metodo == 'GET' and m:
+            datasets = WORKSPACES[m.group(1)][1]
+            return 200, {'value': [{'id': i, 'name': n} for n, i in datasets.items()]}, {}
+        m = re.fullmatch(r'(?:/groups/\w+)?/datasets/(\w+)/refreshes', ruta)
+        if not m:
+            return 404, {'error': ruta}, {}
+        dataset_id = m.group(1)
+        with self.lock:
+            pendientes = self.fallos.get((metodo, dataset_id))
+            codigo = pendientes.pop(0) if pendientes else None
+            if metodo == 'POST' and codigo != 429:
+                # Un 503 tras aceptar el refresh es el caso peligroso: el refresh sí quedó en curso
+                request_id = uuid.uuid4().hex
+                self.refreshes[dataset_id].insert(0, {'requestId': request_id, 'inicio': time.monotonic()})
+            if codigo:
+                self.registro[(metodo, dataset_id)].append((time.monotonic(), codigo, None))
+                return codigo, {'error': 'fallo simulado'}, {'Retry-After': str(RETRY_AFTER)}
+            if metodo == 'POST':
+                self.registro[(metodo, dataset_id)].append((time.monotonic(), 202, None))
+                return 202, {}, {'RequestId': request_id}
+            duracion, final = REFRESHES[dataset_id]
+            valor = [{'requestId': r['requestId'],
+                      'status': final if time.monotonic() - r['inicio'] >= duracion else 'Unknown'}
+                     for r in self.refreshes[dataset_id][:5]]
+            self.registro[(metodo, dataset_id)].append((time.monotonic(), 200, valor[0]['status'] if valor else None))
+            return 200, {'value': valor}, {}
+
+
+class Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, metodo: str):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        codigo, cuerpo, cabeceras = self.server.api.atender(metodo, self.path)
+        datos = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        for clave, valor in cabeceras.items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        self._responder('GET')
+
+    def do_POST(self):
+        self._responder('POST')
+
+
+def iniciar_servidor() -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manejador)
+    servidor.api = ApiPowerBIFalsa()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def main():
+    servidor = iniciar_servidor()
+    api = servidor.api
+    os.environ['POWERBI_API_ROOT'] = f"http://127.0.0.1:{servidor.server_address[1]}"
+    import powerbi_refresh as pr
+
+    # Esperas cortas para que la verificación tarde segundos y no minutos
+    pr.POLL_INITIAL, pr.POLL_MAX = 0.2, 1.0
+    objetivos = [pr.RefreshTarget.parse(d) for d in
+                 ('scraping', 'Ventas WS::scraping', 'Ventas WS::Mapas', 'Otro WS::Mapas')]
+    inicio = time.perf_counter()
+    resultados = asyncio.run(pr.refresh_all('token-de-prueba', objetivos, timeout_sec=30))
+    pr.print_summary(resultados)
+    estados = {t.dataset_id: t.status for t in resultados}
+
+    def estados_consultados(dataset_id):
+        return [estado for _, codigo, estado in api.registro[('GET', dataset_id)] if codigo == 200]
+
+    get_d0 = api.registro[('GET', 'd0')]
+    tras_429 = [t for t, _, _ in get_d0 if t > get_d0[0][0]]
+    comprobaciones = [
+        ("Unknown -> Completed", estados['d0'] == 'Completed' and 'Unknown' in estados_consultados('d0')),
+        ("Unknown -> Failed", estados['d3'] == 'Failed' and 'Unknown' in estados_consultados('d3')),
+        ("429 reintentado tras Retry-After",
+         get_d0[0][1] == 429 and bool(tras_429) and tras_429[0] - get_d0[0][0] >= RETRY_AFTER * 0.9),
+        ("503 en GET reintentado", estados['d1'] == 'Completed' and api.registro[('GET', 'd1')][0][1] == 503),
+        ("503 en POST sin reintento", estados['d2'] == 'Error' and len(api.registro[('POST', 'd2')]) == 1
+         and len(api.refreshes['d2']) == 1),
+    ]
+    print(f"\nVerificación ({time.perf_counter() - inicio:.1f} s):")
+    for nombre, ok in comprobaciones:
+        print(f"  {'✓' if ok else '✗'} {nombre}")
+    servidor.shutdown()
+    sys.exit(0 if all(ok for _, ok in comprobaciones) else 1)
+
+
+if __name__ == "__main__":
+    main()